@@ -0,0 +1,16 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_management.snapshots import construir_snapshots, snapshots_disponibles
+
+if __name__ == "__main__":
+    if not snapshots_disponibles():
+        print("Se necesita pyarrow para generar los snapshots (pip install pyarrow).")
+        sys.exit(1)
+
+    print("Generando snapshots columnares de las estadísticas...")
+    for ruta in construir_snapshots():
+        print(f"  {ruta}")
+    print("Snapshots generados. El cargador los usará mientras los CSV no cambien.")
@@ -1,13 +1,19 @@
 import os
 import sys
+import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.data_management.migracion_db import run_migration
+from src.data_management.migracion_db import ejecutar_migracion
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra las estadísticas de los CSV a MongoDB.")
+    parser.add_argument("--completa", action="store_true",
+                        help="Recarga todas las temporadas en lugar de actualizar solo las filas modificadas")
+    args = parser.parse_args()
+
     print("Empezando la migración desde CSV a MongoDB...")
-    success = run_migration()
+    success = ejecutar_migracion(completa=args.completa)
     
     if success:
         print("CSV importado a MongoDB exitosamente!")
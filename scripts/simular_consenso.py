@@ -0,0 +1,38 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.simulacion_consenso import simular_consenso
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula procesos de consenso con expertos sintéticos.")
+    parser.add_argument("--simulaciones", type=int, default=100000)
+    parser.add_argument("--expertos", type=int, default=4)
+    parser.add_argument("--jugadores", type=int, default=10)
+    parser.add_argument("--criterios", type=int, default=4)
+    parser.add_argument("--umbrales", type=float, nargs="+", default=[0.75, 0.8, 0.85, 0.9])
+    parser.add_argument("--max-rondas", type=int, default=5)
+    parser.add_argument("--tasa-revision", type=float, default=0.3)
+    parser.add_argument("--bloque", type=int, default=1000)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--granularidad", type=int, default=None)
+    args = parser.parse_args()
+
+    resultado = simular_consenso(args.simulaciones, args.expertos, args.jugadores, args.criterios, args.umbrales,
+                                 args.max_rondas, args.tasa_revision, args.bloque, args.procesos, args.semilla,
+                                 args.granularidad)
+
+    print(f"\n=== Simulación de consenso ({resultado['simulaciones']} procesos) ===")
+    print(f"{'Ronda':<8}{'CR medio':<12}{'P5':<10}{'P50':<10}{'P95':<10}")
+    for fila in resultado["cr_por_ronda"]:
+        print(f"{fila['ronda']:<8}{fila['cr_medio']:<12}{fila['p5']:<10}{fila['p50']:<10}{fila['p95']:<10}")
+
+    print("\n=== Convergencia por consenso mínimo ===")
+    for umbral, datos in resultado["convergencia"].items():
+        tasas = ", ".join(f"{ronda}: {tasa:.1%}" for ronda, tasa in enumerate(datos["tasa_por_max_rondas"]))
+        print(f"Consenso mínimo {umbral}: rondas medias {datos['rondas_medias']}, "
+              f"sin converger {datos['sin_converger']:.1%}")
+        print(f"  Tasa de convergencia según max_rondas -> {tasas}")
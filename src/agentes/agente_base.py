@@ -9,25 +9,29 @@ from typing import List, Any, Dict, Type
 
 
 @tool
-def analizador_jugador(jugador: str):
+def analizador_jugador(jugador: str, criterios: list = None, temporada: str = None):
     """
     Obtiene las estadísticas de un solo jugador.
 
     :param jugador: Nombre del único jugador a buscar.
+    :param criterios: Estadísticas a incluir (opcional). Por defecto, las relevantes para su posición.
+    :param temporada: Temporada en la que buscar (opcional, p. ej. "2023-2024"). Por defecto, todas.
     :return: Un JSON con la información del jugador.
     """
-    return obtener_info_jugador(jugador)
+    return obtener_info_jugador(jugador, criterios, temporada)
 
 
 @tool
-def analizador_jugadores(jugadores: list):
+def analizador_jugadores(jugadores: list, criterios: list = None, temporada: str = None):
     """
     Obtiene las estadísticas de múltiples jugadores con una sola llamada.
 
     :param jugadores: Lista de nombres de jugadores a buscar.
+    :param criterios: Estadísticas a incluir (opcional). Por defecto, las relevantes para la posición de cada jugador.
+    :param temporada: Temporada en la que buscar (opcional, p. ej. "2023-2024"). Por defecto, todas.
     :return: Un JSON con la información de todos los jugadores solicitados.
     """
-    return obtener_info_jugadores(jugadores)
+    return obtener_info_jugadores(jugadores, criterios, temporada)
 
 
 @tool()
@@ -37,18 +41,54 @@ def comparador_jugadores(jugador1: str, jugador2: str):
 
 
 @tool()
-def encontrar_jugadores_precio(posicion: str, precio_max: int) -> str:
+def comparador_jugadores_lote(jugadores: list, estadisticas: list = None, temporada: str = None):
     """
-    Encuentra los jugadores para la posición dada en el rango de precio_max.
+    Compara varios jugadores en una sola llamada.
+
+    :param jugadores: Lista de nombres de jugadores a comparar.
+    :param estadisticas: Lista de estadísticas a comparar (opcional). Por defecto, las relevantes para sus posiciones.
+    :param temporada: Temporada a consultar (opcional, p. ej. "2023-2024"). Por defecto, la actual.
+    :return: Un JSON con el valor y el percentil (0-100 dentro de su posición) de cada jugador en cada estadística.
+    """
+    return comparar_jugadores_lote(jugadores, estadisticas, temporada)
+
+
+@tool()
+def encontrar_jugadores_precio(posicion: str, precio_max: float, precio_min: float = 0, k: int = 5,
+                               ordenar_por: str = "puntuacion", pagina: int = 1) -> str:
+    """
+    Encuentra los jugadores para la posición dada en el rango de precio, en una sola llamada.
+
+    Parámetros:
+    - posicion (str): La posición a buscar (ej. "Delantero", "Centrocampista", "Forwards").
+    - precio_max (float): Precio máximo permitido para el fichaje, en millones de euros.
+    - precio_min (float): Precio mínimo, en millones de euros (opcional).
+    - k (int): Número de jugadores a devolver (opcional, 5 por defecto).
+    - ordenar_por (str): "puntuacion" (mejores estadísticas primero) o "valor" (más caros primero).
+    - pagina (int): Página de resultados, para ver los siguientes k jugadores (opcional).
+
+    Return:
+    - Un JSON con el total de jugadores en el rango y la información de los jugadores encontrados.
+    """
+    return listar_jugadores_por_posicion_y_precio(posicion, precio_max, precio_min, k, ordenar_por, pagina)
+
+
+@tool()
+def encontrar_jugadores_similares(jugador: str, k: int = 5, precio_max: float = None, edad_max: int = None) -> str:
+    """
+    Encuentra los jugadores que juegan como el jugador dado (mismo perfil estadístico por 90 minutos
+    en su posición), en todas las temporadas, opcionalmente más baratos o más jóvenes.
 
     Parámetros:
-    - posicion (str): La posición a buscar (ej. "Delantero", "Centrocampista").
-    - precio_max (int): Precio máximo permitido para el fichaje.
+    - jugador (str): Nombre del jugador de referencia.
+    - k (int): Número de jugadores similares a devolver (opcional, 5 por defecto).
+    - precio_max (float): Precio máximo en millones de euros (opcional).
+    - edad_max (int): Edad máxima (opcional).
 
     Return:
-    - Un JSON con la información de los jugadores encontrados.
+    - Un JSON con los jugadores más parecidos y su similitud (0-1).
     """
-    return listar_jugadores_por_posicion_y_precio(posicion, precio_max)
+    return listar_jugadores_similares(jugador, k, precio_max, edad_max)
 
 
 @tool()
@@ -0,0 +1,168 @@
+import numpy as np
+
+from src.core.logica_ranking import puntuaciones_estadisticas_jugadores, TEMPORADA_POR_DEFECTO
+from src.core.normalizacion import METODO_PERCENTIL
+
+# Cuantificadores lingüísticos relativos Q(r) definidos por los parámetros (a, b)
+CUANTIFICADORES = {
+    "mayoria": (0.3, 0.8),
+    "al_menos_la_mitad": (0.0, 0.5),
+    "tantos_como_sea_posible": (0.5, 1.0),
+}
+CUANTIFICADOR_POR_DEFECTO = "mayoria"
+
+PESOS_POR_DEFECTO = {"qgdd": 0.35, "qgndd": 0.15, "estadisticas": 0.5}
+
+
+def _parametros_cuantificador(cuantificador):
+    if isinstance(cuantificador, str):
+        if cuantificador not in CUANTIFICADORES:
+            raise ValueError(f"Cuantificador no válido: {cuantificador}. Opciones: {', '.join(CUANTIFICADORES)}")
+        return CUANTIFICADORES[cuantificador]
+
+    a, b = cuantificador
+    if not 0 <= a < b <= 1:
+        raise ValueError(f"Parámetros de cuantificador no válidos: {cuantificador}")
+    return a, b
+
+
+def pesos_owa(m, cuantificador=CUANTIFICADOR_POR_DEFECTO):
+    """
+    Pesos OWA de dimensión m guiados por un cuantificador lingüístico: w_k = Q(k/m) - Q((k-1)/m).
+    """
+    a, b = _parametros_cuantificador(cuantificador)
+    q = np.clip((np.arange(m + 1) / m - a) / (b - a), 0, 1)
+    return np.diff(q)
+
+
+def _owa_filas(valores, pesos):
+    """Aplica el operador OWA a cada fila: valores ordenados de mayor a menor por los pesos."""
+    return -np.sort(-valores, axis=-1) @ pesos
+
+
+def _fuera_de_diagonal(matriz):
+    n = matriz.shape[0]
+    return matriz[~np.eye(n, dtype=bool)].reshape(n, n - 1)
+
+
+def calcular_qgdd(flpr, cuantificador=CUANTIFICADOR_POR_DEFECTO):
+    """
+    Grado de dominancia guiado por cuantificador de cada alternativa:
+    QGDD_i = OWA_Q(p_ij, j != i).
+    """
+    flpr = np.asarray(flpr, dtype=float)
+    n = flpr.shape[0]
+    if n < 2:
+        return np.ones(n)
+    return _owa_filas(_fuera_de_diagonal(flpr), pesos_owa(n - 1, cuantificador))
+
+
+def calcular_qgndd(flpr, cuantificador=CUANTIFICADOR_POR_DEFECTO):
+    """
+    Grado de no dominancia guiado por cuantificador de cada alternativa:
+    QGNDD_i = OWA_Q(1 - max(p_ji - p_ij, 0), j != i).
+    """
+    flpr = np.asarray(flpr, dtype=float)
+    n = flpr.shape[0]
+    if n < 2:
+        return np.ones(n)
+    no_dominancia = 1 - np.maximum(flpr.T - flpr, 0)
+    return _owa_filas(_fuera_de_diagonal(no_dominancia), pesos_owa(n - 1, cuantificador))
+
+
+def _normalizar_pesos_ranking(pesos):
+    pesos = {**PESOS_POR_DEFECTO, **(pesos or {})}
+    desconocidos = set(pesos) - set(PESOS_POR_DEFECTO)
+    if desconocidos:
+        raise ValueError(f"Componentes de ranking desconocidos: {', '.join(sorted(desconocidos))}")
+    if any(peso < 0 for peso in pesos.values()) or sum(pesos.values()) <= 0:
+        raise ValueError("Los pesos del ranking deben ser no negativos y sumar más de 0")
+
+    total = sum(pesos.values())
+    return {componente: peso / total for componente, peso in pesos.items()}
+
+
+def indices_top_k(puntuaciones, k=None):
+    """
+    Índices de las k mayores puntuaciones, de mayor a menor. Con k menor que el número de
+    candidatos se usa una selección parcial (argpartition) y solo se ordenan los k elegidos.
+    Los empates se resuelven a favor del índice menor.
+    """
+    puntuaciones = np.asarray(puntuaciones, dtype=float)
+    n = len(puntuaciones)
+    if k is None or k >= n:
+        return np.lexsort((np.arange(n), -puntuaciones))
+    if k <= 0:
+        return np.array([], dtype=int)
+
+    candidatos = np.argpartition(-puntuaciones, k - 1)[:k]
+    # Incluir todos los empatados con el k-ésimo para que el desempate por índice sea estable
+    umbral = puntuaciones[candidatos].min()
+    candidatos = np.flatnonzero(puntuaciones >= umbral)
+    return candidatos[np.lexsort((candidatos, -puntuaciones[candidatos]))][:k]
+
+
+def calcular_ranking_agregado(flpr_colectiva, jugadores, pesos=None, k=None, cuantificador=CUANTIFICADOR_POR_DEFECTO,
+                              temporada=None, metodo=METODO_PERCENTIL, puntuaciones_estadisticas=None):
+    """
+    Ranking de jugadores que combina la dominancia en la FLPR colectiva con las estadísticas.
+
+    La puntuación final es la media ponderada de QGDD, QGNDD (ambos en [0, 1]) y la puntuación
+    estadística normalizada por grupo de posición (llevada de [0, 10] a [0, 1]).
+
+    Args:
+        flpr_colectiva (np.ndarray): FLPR colectiva (n x n)
+        jugadores (list): Nombres de los jugadores, en el orden de la FLPR
+        pesos (dict, optional): Pesos de los componentes "qgdd", "qgndd" y "estadisticas".
+                                Los que falten toman el valor de PESOS_POR_DEFECTO; se normalizan a suma 1.
+        k (int, optional): Devolver solo los k mejores jugadores
+        cuantificador (str | tuple, optional): Cuantificador lingüístico o parámetros (a, b)
+        temporada (str, optional): Temporada de las estadísticas
+        metodo (str, optional): Método de normalización de las estadísticas (ver NormalizadorGrupos)
+        puntuaciones_estadisticas (array, optional): Puntuaciones estadísticas ya calculadas (0-10).
+                                                     Si no se indican, se consultan en la tabla de la temporada.
+
+    Returns:
+        list[dict]: Un diccionario por jugador, de mejor a peor, con las claves posicion, jugador,
+        qgdd, qgndd, puntuacion_estadisticas y puntuacion_final.
+    """
+    flpr_colectiva = np.asarray(flpr_colectiva, dtype=float)
+    n = len(jugadores)
+    if flpr_colectiva.shape != (n, n):
+        raise ValueError(f"La FLPR colectiva debe ser de {n}x{n} para {n} jugadores")
+
+    pesos = _normalizar_pesos_ranking(pesos)
+    qgdd = calcular_qgdd(flpr_colectiva, cuantificador)
+    qgndd = calcular_qgndd(flpr_colectiva, cuantificador)
+
+    if puntuaciones_estadisticas is None:
+        if pesos["estadisticas"] > 0:
+            puntuaciones_estadisticas = puntuaciones_estadisticas_jugadores(jugadores, temporada or TEMPORADA_POR_DEFECTO,
+                                                                            metodo)
+        else:
+            puntuaciones_estadisticas = np.zeros(n)
+    puntuaciones_estadisticas = np.asarray(puntuaciones_estadisticas, dtype=float)
+    if puntuaciones_estadisticas.shape != (n,):
+        raise ValueError("Debe haber una puntuación estadística por jugador")
+
+    finales = (pesos["qgdd"] * qgdd + pesos["qgndd"] * qgndd
+               + pesos["estadisticas"] * puntuaciones_estadisticas / 10)
+
+    return [
+        {
+            "posicion": posicion,
+            "jugador": jugadores[i],
+            "qgdd": float(qgdd[i]),
+            "qgndd": float(qgndd[i]),
+            "puntuacion_estadisticas": float(puntuaciones_estadisticas[i]),
+            "puntuacion_final": float(finales[i]),
+        }
+        for posicion, i in enumerate(indices_top_k(finales, k), 1)
+    ]
+
+
+def formatear_posicion_ranking(fila):
+    """Línea de texto con la posición, el jugador y los componentes de una fila del ranking."""
+    return (f"{fila['posicion']}. {fila['jugador']} - Puntuación: {fila['puntuacion_final']:.3f} "
+            f"(QGDD: {fila['qgdd']:.3f}, QGNDD: {fila['qgndd']:.3f}, "
+            f"estadísticas: {fila['puntuacion_estadisticas']:.2f}/10)")
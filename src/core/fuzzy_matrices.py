@@ -1,52 +1,376 @@
+import json
+import os
+from functools import lru_cache
+
 import numpy as np
 import skfuzzy as fuzz
+from dotenv import load_dotenv
+
+
+class TermSet:
+    """
+    Conjunto de términos lingüísticos con granularidad configurable.
+
+    Cada término es un trapecio sobre el intervalo [0, 1] muestreado en una rejilla de paso
+    `resolucion`. Las funciones de pertenencia y los centroides se calculan una sola vez por
+    conjunto y se guardan en caché, de modo que evaluar con escalas más finas cuesta lo mismo
+    por llamada que con la escala de 5 términos.
+    """
+
+    def __init__(self, etiquetas, trapecios, alias=None, resolucion=0.1, nombre=None):
+        """
+        Inicializa un conjunto de términos.
+
+        Args:
+            etiquetas: Etiquetas de los términos ordenadas de menor a mayor valor
+            trapecios: Parámetros [a, b, c, d] del trapecio de cada etiqueta
+            alias: Diccionario alias -> etiqueta (p. ej. los nombres en inglés)
+            resolucion: Paso de la rejilla sobre la que se muestrean los trapecios
+            nombre: Nombre descriptivo del conjunto
+        """
+        if len(etiquetas) != len(trapecios):
+            raise ValueError("Debe haber un trapecio por cada etiqueta")
+        if len(set(etiquetas)) != len(etiquetas):
+            raise ValueError("Las etiquetas del conjunto de términos deben ser únicas")
+        if not 0 < resolucion <= 0.5:
+            raise ValueError(f"Resolución no válida: {resolucion}")
+
+        self.etiquetas = list(etiquetas)
+        self.trapecios = [list(map(float, trapecio)) for trapecio in trapecios]
+        self.alias = dict(alias or {})
+        self.resolucion = resolucion
+        self.nombre = nombre or f"{len(self.etiquetas)} términos"
+
+        self.codigos = {etiqueta: codigo for codigo, etiqueta in enumerate(self.etiquetas)}
+        for alias_termino, etiqueta in self.alias.items():
+            if etiqueta not in self.codigos:
+                raise ValueError(f"El alias '{alias_termino}' apunta a un término desconocido: {etiqueta}")
+            self.codigos[alias_termino] = self.codigos[etiqueta]
+
+        self._rangos = None
+        self._pertenencias = None
+        self._valores = None
+
+    @classmethod
+    def uniforme(cls, etiquetas, alias=None, resolucion=0.1, nombre=None):
+        """
+        Crea un conjunto de trapecios equiespaciados sobre [0, 1], con el mismo solapamiento
+        relativo que la escala original de 5 términos.
+        """
+        granularidad = len(etiquetas)
+        if granularidad < 2:
+            raise ValueError("Un conjunto de términos necesita al menos 2 etiquetas")
+
+        paso = 1 / (granularidad - 1)
+        trapecios = []
+        for k in range(granularidad):
+            centro = k * paso
+            trapecios.append([
+                max(centro - 0.6 * paso, 0.0),
+                max(centro - 0.2 * paso, 0.0),
+                min(centro + 0.2 * paso, 1.0),
+                min(centro + 0.6 * paso, 1.0),
+            ])
+
+        return cls(etiquetas, trapecios, alias=alias, resolucion=resolucion, nombre=nombre)
+
+    @classmethod
+    def desde_config(cls, config):
+        """
+        Crea un conjunto de términos a partir de un diccionario de configuración.
+
+        Claves admitidas: "granularidad" (usa un conjunto predefinido), "etiquetas", "trapecios",
+        "alias", "resolucion" y "nombre". Si hay etiquetas pero no trapecios, los trapecios se
+        reparten de forma uniforme.
+        """
+        if "etiquetas" not in config:
+            base = obtener_conjunto_terminos(int(config.get("granularidad", 5)))
+            if "resolucion" not in config:
+                return base
+            return cls(base.etiquetas, base.trapecios, alias=base.alias,
+                       resolucion=float(config["resolucion"]), nombre=config.get("nombre"))
+
+        resolucion = float(config.get("resolucion", 0.1))
+        if config.get("trapecios"):
+            return cls(config["etiquetas"], config["trapecios"], alias=config.get("alias"),
+                       resolucion=resolucion, nombre=config.get("nombre"))
+        return cls.uniforme(config["etiquetas"], alias=config.get("alias"),
+                            resolucion=resolucion, nombre=config.get("nombre"))
+
+    @classmethod
+    def desde_json(cls, ruta):
+        """Crea un conjunto de términos a partir de un fichero JSON de configuración."""
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return cls.desde_config(json.load(f))
+
+    @property
+    def granularidad(self):
+        """Número de términos del conjunto."""
+        return len(self.etiquetas)
+
+    @property
+    def rangos(self):
+        """Rejilla sobre [0, 1] en la que se muestrean las funciones de pertenencia."""
+        if self._rangos is None:
+            puntos = int(round(1 / self.resolucion))
+            self._rangos = np.arange(puntos + 1) * self.resolucion
+        return self._rangos
+
+    @property
+    def pertenencias(self):
+        """Funciones de pertenencia de cada etiqueta (se calculan una sola vez)."""
+        if self._pertenencias is None:
+            self._pertenencias = {
+                etiqueta: fuzz.trapmf(self.rangos, trapecio)
+                for etiqueta, trapecio in zip(self.etiquetas, self.trapecios)
+            }
+        return self._pertenencias
+
+    @property
+    def valores(self):
+        """Centroide de cada código en un array contiguo (se calcula una sola vez)."""
+        if self._valores is None:
+            valores = np.empty(self.granularidad)
+            for codigo, etiqueta in enumerate(self.etiquetas):
+                pertenencia = self.pertenencias[etiqueta]
+                if not pertenencia.any():
+                    raise ValueError(f"El término '{etiqueta}' no tiene soporte en la rejilla; "
+                                     f"usa una resolución más fina que {self.resolucion}")
+                valores[codigo] = fuzz.defuzz(self.rangos, pertenencia, 'centroid')
+            self._valores = np.ascontiguousarray(valores)
+        return self._valores
+
+    def __contains__(self, termino):
+        return termino in self.codigos
+
+    def opciones_numericas(self):
+        """Devuelve el diccionario {1: etiqueta más baja, ..., n: etiqueta más alta} usado en la CLI."""
+        return {posicion: etiqueta for posicion, etiqueta in enumerate(self.etiquetas, 1)}
+
+    def descripcion(self):
+        """Devuelve las etiquetas separadas por comas, para mensajes y prompts."""
+        return ", ".join(self.etiquetas)
+
+    def codificar(self, calificaciones):
+        """
+        Codifica una matriz de términos lingüísticos como códigos enteros.
+
+        Parámetros:
+        - calificaciones (array-like): Términos lingüísticos con cualquier forma.
+
+        Return:
+        - np.ndarray: Array int8 con el código de cada término y la misma forma que la entrada.
+        """
+        calificaciones = np.asarray(calificaciones, dtype=object)
+        unicos, inversa = np.unique(calificaciones.ravel().astype(str), return_inverse=True)
+
+        codigos_unicos = np.empty(len(unicos), dtype=np.int8)
+        for k, termino in enumerate(unicos):
+            if termino not in self.codigos:
+                raise ValueError(f"Término lingüístico desconocido: {termino}")
+            codigos_unicos[k] = self.codigos[termino]
+
+        return codigos_unicos[inversa].reshape(calificaciones.shape)
 
-rangos = np.arange(0, 1.1, 0.1)
+    def decodificar(self, codigos):
+        """
+        Convierte códigos de términos en sus valores defuzzificados con un único indexado.
+
+        Parámetros:
+        - codigos (np.ndarray): Array de códigos enteros devuelto por codificar.
+
+        Return:
+        - np.ndarray: Valores defuzzificados con la misma forma que los códigos.
+        """
+        return self.valores[codigos]
+
+
+CONJUNTOS_PREDEFINIDOS = {
+    3: {
+        "etiquetas": ["Bajo", "Medio", "Alto"],
+        "alias": {"Low": "Bajo", "Medium": "Medio", "High": "Alto"},
+        "resolucion": 0.1,
+    },
+    5: {
+        "etiquetas": ["Muy Bajo", "Bajo", "Medio", "Alto", "Muy Alto"],
+        "trapecios": [
+            [0, 0, 0.05, 0.15],
+            [0.1, 0.2, 0.3, 0.4],
+            [0.35, 0.45, 0.55, 0.65],
+            [0.6, 0.7, 0.8, 0.9],
+            [0.85, 0.95, 1, 1],
+        ],
+        "alias": {"Very Low": "Muy Bajo", "Low": "Bajo", "Medium": "Medio", "High": "Alto", "Very High": "Muy Alto"},
+        "resolucion": 0.1,
+    },
+    7: {
+        "etiquetas": ["Muy Bajo", "Bajo", "Algo Bajo", "Medio", "Algo Alto", "Alto", "Muy Alto"],
+        "alias": {"Very Low": "Muy Bajo", "Low": "Bajo", "Slightly Low": "Algo Bajo", "Medium": "Medio",
+                  "Slightly High": "Algo Alto", "High": "Alto", "Very High": "Muy Alto"},
+        "resolucion": 0.01,
+    },
+    9: {
+        "etiquetas": ["Extremadamente Bajo", "Muy Bajo", "Bajo", "Algo Bajo", "Medio",
+                      "Algo Alto", "Alto", "Muy Alto", "Extremadamente Alto"],
+        "alias": {"Extremely Low": "Extremadamente Bajo", "Very Low": "Muy Bajo", "Low": "Bajo",
+                  "Slightly Low": "Algo Bajo", "Medium": "Medio", "Slightly High": "Algo Alto",
+                  "High": "Alto", "Very High": "Muy Alto", "Extremely High": "Extremadamente Alto"},
+        "resolucion": 0.01,
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def obtener_conjunto_terminos(granularidad=5):
+    """
+    Devuelve el conjunto de términos predefinido para una granularidad (3, 5, 7 o 9).
+    Cada conjunto se crea una sola vez, así que su caché de centroides se comparte.
+    """
+    if granularidad not in CONJUNTOS_PREDEFINIDOS:
+        raise ValueError(f"Granularidad no soportada: {granularidad}. Opciones: {sorted(CONJUNTOS_PREDEFINIDOS)}")
+
+    config = CONJUNTOS_PREDEFINIDOS[granularidad]
+    if config.get("trapecios"):
+        return TermSet(config["etiquetas"], config["trapecios"], alias=config["alias"],
+                       resolucion=config["resolucion"])
+    return TermSet.uniforme(config["etiquetas"], alias=config["alias"], resolucion=config["resolucion"])
+
+
+@lru_cache(maxsize=None)
+def conjunto_terminos_activo():
+    """
+    Devuelve el conjunto de términos configurado para la aplicación.
+
+    Se lee de las variables de entorno (o del .env):
+    - TERMINOS_LINGUISTICOS_CONFIG: ruta a un JSON con la definición del conjunto.
+    - GRANULARIDAD_TERMINOS: granularidad de un conjunto predefinido (por defecto 5).
+    """
+    load_dotenv()
+
+    ruta_config = os.getenv("TERMINOS_LINGUISTICOS_CONFIG")
+    if ruta_config:
+        return TermSet.desde_json(ruta_config)
+
+    return obtener_conjunto_terminos(int(os.getenv("GRANULARIDAD_TERMINOS", 5)))
+
+
+def _resolver_conjunto(conjunto):
+    return conjunto if conjunto is not None else conjunto_terminos_activo()
+
+
+_conjunto_por_defecto = obtener_conjunto_terminos(5)
+
+rangos = _conjunto_por_defecto.rangos
 
 terminos_linguisticos = {
-    "Muy Bajo": fuzz.trapmf(rangos, [0, 0, 0.05, 0.15]),
-    "Bajo": fuzz.trapmf(rangos, [0.1, 0.2, 0.3, 0.4]),
-    "Medio": fuzz.trapmf(rangos, [0.35, 0.45, 0.55, 0.65]),
-    "Alto": fuzz.trapmf(rangos, [0.6, 0.7, 0.8, 0.9]),
-    "Muy Alto": fuzz.trapmf(rangos, [0.85, 0.95, 1, 1]),
-
-    "Very Low": fuzz.trapmf(rangos, [0, 0, 0.05, 0.15]),
-    "Low": fuzz.trapmf(rangos, [0.1, 0.2, 0.3, 0.4]),
-    "Medium": fuzz.trapmf(rangos, [0.35, 0.45, 0.55, 0.65]),
-    "High": fuzz.trapmf(rangos, [0.6, 0.7, 0.8, 0.9]),
-    "Very High": fuzz.trapmf(rangos, [0.85, 0.95, 1, 1])
+    **_conjunto_por_defecto.pertenencias,
+    **{alias: _conjunto_por_defecto.pertenencias[etiqueta] for alias, etiqueta in _conjunto_por_defecto.alias.items()},
 }
 
+alias_terminos = _conjunto_por_defecto.alias
 
-def generar_flpr(terminos):
+
+def codificar_calificaciones(calificaciones, conjunto=None):
+    """
+    Codifica una matriz de términos lingüísticos como códigos enteros del conjunto de términos.
+
+    Parámetros:
+    - calificaciones (array-like): Términos lingüísticos con cualquier forma.
+    - conjunto (TermSet, opcional): Conjunto de términos. Por defecto, el configurado.
+
+    Return:
+    - np.ndarray: Array int8 con el código de cada término y la misma forma que la entrada.
+    """
+    return _resolver_conjunto(conjunto).codificar(calificaciones)
+
+
+def decodificar_calificaciones(codigos, conjunto=None):
+    """
+    Convierte códigos de términos lingüísticos en sus valores defuzzificados con un único indexado.
+
+    Parámetros:
+    - codigos (np.ndarray): Array de códigos enteros devuelto por codificar_calificaciones.
+    - conjunto (TermSet, opcional): Conjunto de términos. Por defecto, el configurado.
+
+    Return:
+    - np.ndarray: Valores defuzzificados con la misma forma que los códigos.
+    """
+    return _resolver_conjunto(conjunto).decodificar(codigos)
+
+
+MODO_AGREGACION_PONDERADO = "ponderado"
+MODO_AGREGACION_SECUENCIAL = "secuencial"
+MODOS_AGREGACION = (MODO_AGREGACION_PONDERADO, MODO_AGREGACION_SECUENCIAL)
+
+
+def _flpr_desde_valores(valores, decimales=3):
+    """
+    Construye matrices FLPR a partir de los valores defuzzificados de las alternativas.
+
+    Parámetros:
+    - valores (np.ndarray): Array (..., n) con el valor de cada alternativa. Las dimensiones
+      iniciales se tratan como lote.
+    - decimales (int | None): Decimales a los que se redondea cada celda. None para no redondear.
+
+    Return:
+    - np.ndarray: Array (..., n, n) con las matrices FLPR.
+    """
+    valores = np.asarray(valores, dtype=float)
+    v_i = valores[..., :, None]
+    v_j = valores[..., None, :]
+
+    # Proporción del valor de la alternativa i respecto a la suma de los valores de ambas alternativas.
+    flpr = v_i / (v_i + v_j)
+    if decimales is not None:
+        flpr = np.round(flpr, decimales)
+
+    n = valores.shape[-1]
+    diagonal = np.arange(n)
+    flpr[..., diagonal, diagonal] = 0.5
+
+    return flpr
+
+
+def generar_flpr(terminos, conjunto=None):
     """
     Genera una matriz FLPR a partir de los términos lingüísticos dados.
 
     Parámetros:
     - terminos (list): Lista de términos lingüísticos de los jugadores para un criterio.
+    - conjunto (TermSet, opcional): Conjunto de términos. Por defecto, el configurado.
 
     Return:
     - np.ndarray: Matriz FLPR.
     """
-    valores = []
-    for termino in terminos:
-        if termino in terminos_linguisticos:
-            valores.append(fuzz.defuzz(rangos, terminos_linguisticos[termino], 'centroid'))
-        else:
-            raise ValueError(f"Término lingüístico desconocido: {termino}")
+    conjunto = _resolver_conjunto(conjunto)
+    return _flpr_desde_valores(conjunto.decodificar(conjunto.codificar(list(terminos))))
 
-    n = len(valores)
-    flpr = np.zeros((n, n))
 
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                flpr[i][j] = 0.5
-            else:
-                #Proporción del valor de la alternativa i respecto a la suma de los valores de ambas alternativas.
-                flpr[i][j] = round(valores[i] / (valores[i] + valores[j]), 3)
+def generar_flpr_lote(calificaciones, conjunto=None, decimales=3):
+    """
+    Genera de una sola vez las matrices FLPR de todos los agentes y criterios.
 
-    return flpr
+    Parámetros:
+    - calificaciones (array-like): Tensor (agentes x jugadores x criterios) de términos lingüísticos,
+      o de sus códigos enteros si ya se han codificado con codificar_calificaciones.
+    - conjunto (TermSet, opcional): Conjunto de términos. Por defecto, el configurado.
+    - decimales (int | None): Decimales de cada celda. None para conservar la precisión completa.
+
+    Return:
+    - np.ndarray: Tensor (agentes x criterios x jugadores x jugadores) con las matrices FLPR,
+      idénticas a las que devuelve generar_flpr para cada agente y criterio.
+    """
+    calificaciones = np.asarray(calificaciones)
+    if calificaciones.ndim != 3:
+        raise ValueError("Las calificaciones deben tener forma (agentes x jugadores x criterios)")
+
+    conjunto = _resolver_conjunto(conjunto)
+    if not np.issubdtype(calificaciones.dtype, np.integer):
+        calificaciones = conjunto.codificar(calificaciones)
+
+    valores = conjunto.decodificar(calificaciones)
+
+    return _flpr_desde_valores(np.swapaxes(valores, 1, 2), decimales)
 
 
 def calcular_flpr_comun(flpr_agente, flpr_usuario):
@@ -62,30 +386,120 @@ def calcular_flpr_comun(flpr_agente, flpr_usuario):
     """
     return np.round((flpr_agente + flpr_usuario) / 2, 3)
 
-def calcular_matrices_flpr(matrices, criterios):
+def _normalizar_pesos(pesos, criterios):
+    """
+    Convierte los pesos por criterio en un vector normalizado que suma 1.
+
+    Parámetros:
+    - pesos (dict | list | None): Pesos por nombre de criterio o en el orden de `criterios`.
+      Los criterios que no aparezcan en el diccionario pesan 0. None para pesos iguales.
+    - criterios (list): Lista de criterios.
+
+    Return:
+    - np.ndarray: Vector de pesos de longitud len(criterios).
+    """
+    if pesos is None:
+        return np.full(len(criterios), 1 / len(criterios))
+
+    if isinstance(pesos, dict):
+        desconocidos = set(pesos) - set(criterios)
+        if desconocidos:
+            raise ValueError(f"Criterios con peso que no se están evaluando: {sorted(desconocidos)}")
+        pesos = [pesos.get(criterio, 0.0) for criterio in criterios]
+
+    pesos = np.asarray(pesos, dtype=float)
+    if pesos.shape != (len(criterios),):
+        raise ValueError(f"Se esperaban {len(criterios)} pesos y se recibieron {pesos.size}")
+    if np.any(pesos < 0) or not np.isfinite(pesos).all():
+        raise ValueError("Los pesos de los criterios deben ser números no negativos")
+    if pesos.sum() == 0:
+        raise ValueError("Al menos un criterio debe tener peso mayor que 0")
+
+    return pesos / pesos.sum()
+
+
+def agregar_flpr_criterios(flprs, pesos=None, modo=MODO_AGREGACION_PONDERADO):
+    """
+    Agrega las matrices FLPR de varios criterios en una sola.
+
+    Parámetros:
+    - flprs (np.ndarray): Tensor (..., criterios, n, n). Las dimensiones iniciales se tratan como lote.
+    - pesos (np.ndarray, opcional): Vector de pesos normalizado (ver _normalizar_pesos). Solo modo ponderado.
+    - modo (str): "ponderado" reduce todos los criterios en una única media ponderada sin redondeos
+      intermedios. "secuencial" reproduce el plegado original con calcular_flpr_comun, que redondea
+      en cada paso y da al último criterio la mitad del peso.
+
+    Return:
+    - np.ndarray: Tensor (..., n, n) con la FLPR agregada.
+    """
+    flprs = np.asarray(flprs, dtype=float)
+
+    if modo == MODO_AGREGACION_PONDERADO:
+        if pesos is None:
+            pesos = np.full(flprs.shape[-3], 1 / flprs.shape[-3])
+        # Suma celda a celda en el orden de los criterios: el resultado de cada celda no depende
+        # del resto de la matriz, así que recalcular solo una fila da exactamente los mismos valores.
+        return np.add.reduce(np.asarray(pesos)[:, None, None] * flprs, axis=-3)
+
+    if modo == MODO_AGREGACION_SECUENCIAL:
+        if pesos is not None:
+            raise ValueError("Los pesos por criterio solo se aplican en modo 'ponderado'")
+        flpr_agregada = flprs[..., 0, :, :]
+        for indice in range(1, flprs.shape[-3]):
+            flpr_agregada = calcular_flpr_comun(flpr_agregada, flprs[..., indice, :, :])
+        return flpr_agregada
+
+    raise ValueError(f"Modo de agregación desconocido: '{modo}'. Opciones: {MODOS_AGREGACION}")
+
+
+def calcular_matrices_flpr(matrices, criterios, conjunto=None, pesos=None, modo=MODO_AGREGACION_PONDERADO):
     """
     Calcula las matrices FLPR para cada matriz de calificaciones.
 
+    En modo ponderado las FLPR por criterio se apilan y se reducen en una sola operación,
+    sin redondear: el redondeo a 3 decimales se deja para cuando se muestran los resultados.
+
     Args:
         matrices (dict): Diccionario con las matrices de calificaciones
         criterios (list): Lista de criterios
+        conjunto (TermSet, optional): Conjunto de términos. Por defecto, el configurado.
+        pesos (dict | list, optional): Peso de cada criterio (por nombre o en orden). Por defecto, iguales.
+        modo (str, optional): "ponderado" (por defecto) o "secuencial" para reproducir el cálculo original.
 
     Returns:
         dict: Diccionario con las matrices FLPR calculadas
     """
+    if modo not in MODOS_AGREGACION:
+        raise ValueError(f"Modo de agregación desconocido: '{modo}'. Opciones: {MODOS_AGREGACION}")
+
     flpr_matrices = {}
+    if not matrices:
+        return flpr_matrices
+
+    nombres = list(matrices.keys())
+    n_criterios = len(criterios)
+    pesos_normalizados = _normalizar_pesos(pesos, criterios) if pesos is not None else None
+    decimales = None if modo == MODO_AGREGACION_PONDERADO else 3
+    try:
+        calificaciones = np.asarray([matrices[nombre] for nombre in nombres], dtype=object)
+    except ValueError:
+        calificaciones = None
 
-    for nombre, matriz in matrices.items():
-        flpr_matriz = None
-        for idx, criterio in enumerate(criterios):
-            calificaciones = [fila[idx] for fila in matriz]
-            flpr_criterio = generar_flpr(calificaciones)
+    if calificaciones is not None and calificaciones.ndim == 3 and calificaciones.shape[2] >= n_criterios:
+        flprs_por_agente = generar_flpr_lote(calificaciones[:, :, :n_criterios], conjunto, decimales)
+    else:
+        # Matrices con formas distintas o vacías: se calcula el lote de cada agente por separado
+        flprs_por_agente = [
+            generar_flpr_lote([[fila[:n_criterios] for fila in matrices[nombre]]], conjunto, decimales)[0]
+            if matrices[nombre] else []
+            for nombre in nombres
+        ]
 
-            if flpr_matriz is None:
-                flpr_matriz = flpr_criterio
-            else:
-                flpr_matriz = calcular_flpr_comun(flpr_matriz, flpr_criterio)
+    for nombre, flprs_criterios in zip(nombres, flprs_por_agente):
+        if len(flprs_criterios) == 0:
+            flpr_matrices[nombre] = None
+            continue
 
-        flpr_matrices[nombre] = flpr_matriz
+        flpr_matrices[nombre] = agregar_flpr_criterios(flprs_criterios, pesos_normalizados, modo)
 
-    return flpr_matrices
\ No newline at end of file
+    return flpr_matrices
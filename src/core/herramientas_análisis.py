@@ -1,86 +1,220 @@
 from src.data_management.data_loader import *
-from rapidfuzz import process, fuzz
+from src.data_management.indice_nombres import (obtener_indice_nombres, describir_resolucion, UMBRAL_SIMILITUD,
+                                                RESOLUCION_AMBIGUA, RESOLUCION_NO_ENCONTRADA)
+from src.core.resumen_jugadores import (resumir_jugador, componer_respuesta, mensaje_json, columnas_relevantes,
+                                       valor_compacto)
+from src.core.normalizacion import percentiles_por_grupo
+from src.core.indice_mercado import obtener_indice_mercado, grupo_posicion, ORDENES_MERCADO, ORDEN_PUNTUACION
+from src.core.similitud_jugadores import buscar_jugadores_similares
 import json
+import numpy as np
+import pandas as pd
 
-UMBRAL_SIMILITUD = 85
+def obtener_info_jugador(jugador: str, criterios: list = None, temporada: str = None) -> str:
+    """
+    Obtiene las estadísticas de un jugador en JSON compacto.
+
+    :param jugador: Nombre del jugador a buscar.
+    :param criterios: Estadísticas a incluir. Por defecto, las relevantes para su posición.
+    :param temporada: Temporada en la que buscar (p. ej. "2023-2024"). Por defecto, todas.
+    :return: Un JSON con la información del jugador.
+    """
+    try:
+        temporada = clave_temporada(temporada)
+    except ValueError as e:
+        return str(e)
 
-def obtener_info_jugador(jugador: str) -> str:
-    df = cargar_estadisticas_jugadores()
+    df = cargar_estadisticas_jugadores(temporada)
 
     if isinstance(df, str):
         return f"Error al cargar los datos: {df}"
 
-    jugador_normalizado = normalizar_nombre(jugador.strip())
-
-    if 'normalized_name' not in df.columns:
-        df['normalized_name'] = df['Player'].apply(normalizar_nombre)
-
-    mejor_match, score, index = process.extractOne(jugador_normalizado, df['normalized_name'].tolist(), scorer=fuzz.ratio)
-
-    if score < UMBRAL_SIMILITUD:
-        return f"{jugador}: Datos no disponibles"
+    resultado = obtener_indice_nombres(df).resolver(jugador)
 
-    jugador_data = df.iloc[index]
+    if resultado["estado"] in (RESOLUCION_AMBIGUA, RESOLUCION_NO_ENCONTRADA):
+        return describir_resolucion(jugador, resultado)
 
-    return json.dumps(jugador_data.to_dict(), indent=2)
+    return resumir_jugador(df.iloc[resultado["posicion"]], temporada, criterios)
 
 
-def obtener_info_jugadores(jugadores: list) -> str:
+def obtener_info_jugadores(jugadores: list, criterios: list = None, temporada: str = None) -> str:
     """
     Obtiene las estadísticas de múltiples jugadores con una sola carga de datos.
 
     :param jugadores: Lista de nombres de jugadores a buscar.
-    :return: Un JSON con la información de todos los jugadores solicitados.
+    :param criterios: Estadísticas a incluir. Por defecto, las relevantes para la posición de cada jugador.
+    :param temporada: Temporada en la que buscar (p. ej. "2023-2024"). Por defecto, todas.
+    :return: Un JSON compacto con la información de todos los jugadores solicitados.
     """
-    df = cargar_estadisticas_jugadores()
+    try:
+        temporada = clave_temporada(temporada)
+    except ValueError as e:
+        return str(e)
+
+    df = cargar_estadisticas_jugadores(temporada)
 
     if isinstance(df, str):
         return f"Error al cargar los datos: {df}"
 
-    if 'normalized_name' not in df.columns:
-        df['normalized_name'] = df['Player'].apply(normalizar_nombre)
-
     resultados = {}
 
-    for jugador in jugadores:
-        jugador_normalizado = normalizar_nombre(jugador.strip())
-        mejor_match, score, index = process.extractOne(jugador_normalizado, df['normalized_name'].tolist(), scorer=fuzz.ratio)
-
-        if score < UMBRAL_SIMILITUD:
-            resultados[jugador] = "Datos no disponibles"
+    # Una sola resolución por lote: los nombres que requieren búsqueda difusa se comparan juntos
+    for jugador, resultado in zip(jugadores, obtener_indice_nombres(df).resolver_lote(jugadores)):
+        if resultado["estado"] == RESOLUCION_AMBIGUA:
+            resultados[jugador] = mensaje_json(describir_resolucion(jugador, resultado))
+        elif resultado["estado"] == RESOLUCION_NO_ENCONTRADA:
+            resultados[jugador] = mensaje_json("Datos no disponibles")
         else:
-            jugador_data = df.iloc[index]
-            resultados[jugador] = jugador_data.to_dict()
+            resultados[jugador] = resumir_jugador(df.iloc[resultado["posicion"]], temporada, criterios)
 
-    return json.dumps(resultados, indent=2)
+    return componer_respuesta(resultados)
 
 
 def comparar_jugadores(jugador1: str, jugador2: str) -> str:
-    info_jugador1 = obtener_info_jugador(jugador1)
-    info_jugador2 = obtener_info_jugador(jugador2)
+    return comparar_jugadores_lote([jugador1, jugador2])
+
+
+def comparar_jugadores_lote(jugadores: list, estadisticas: list = None, temporada: str = TEMPORADA_ACTUAL) -> str:
+    """
+    Compara varios jugadores con una sola carga de datos y una sola resolución de nombres.
 
-    return f"{info_jugador1}\n\n{info_jugador2}"
+    Para cada estadística se da el valor de cada jugador y su percentil (0-100) respecto a los
+    jugadores de su grupo de posición en la temporada.
 
+    :param jugadores: Lista de nombres de jugadores a comparar.
+    :param estadisticas: Estadísticas a comparar. Por defecto, las relevantes para las posiciones de los jugadores.
+    :param temporada: Temporada de los datos (p. ej. "2023-2024"). Por defecto, la actual.
+    :return: Un JSON compacto con la tabla jugadores x estadísticas.
+    """
+    try:
+        temporada = clave_temporada(temporada) or TEMPORADA_ACTUAL
+    except ValueError as e:
+        return str(e)
 
-def listar_jugadores_por_posicion_y_precio(posicion: str, precio_max: int) -> str:
-    df = cargar_estadisticas_jugadores()
+    df = cargar_estadisticas_jugadores(temporada)
 
     if isinstance(df, str):
-        return "Error al cargar los datos."
+        return f"Error al cargar los datos: {df}"
 
-    df_filtrado = df[df['position_group'].str.lower() == posicion.lower()]
+    posiciones = []
+    avisos = []
+    for jugador, resultado in zip(jugadores, obtener_indice_nombres(df).resolver_lote(jugadores)):
+        if resultado["estado"] in (RESOLUCION_AMBIGUA, RESOLUCION_NO_ENCONTRADA):
+            avisos.append(describir_resolucion(jugador, resultado))
+        else:
+            posiciones.append(resultado["posicion"])
+
+    if not posiciones:
+        return "\n".join(avisos)
+
+    grupos_temporada = df["position_group"].astype(object).to_numpy()
+    grupos = grupos_temporada[posiciones]
+    if estadisticas:
+        columnas = columnas_relevantes(df.columns, criterios=estadisticas)
+    else:
+        columnas = tuple(dict.fromkeys(columna for grupo in pd.unique(grupos)
+                                       for columna in columnas_relevantes(df.columns, grupo)))
+    if not columnas:
+        return f"No se encontraron las estadísticas pedidas: {', '.join(map(str, estadisticas))}"
+
+    referencia = df[list(columnas)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    valores = referencia[posiciones]
+    percentiles = percentiles_por_grupo(referencia, grupos_temporada, valores, grupos)
+
+    tabla = {
+        "temporada": temporada,
+        "estadisticas": list(columnas),
+        "jugadores": [
+            {
+                "jugador": valor_compacto(df["Player"].iat[posicion]),
+                "equipo": valor_compacto(df["Squad"].iat[posicion]) if "Squad" in df.columns else None,
+                "grupo": valor_compacto(grupo),
+                "valores": [valor_compacto(valor) for valor in fila_valores],
+                "percentiles": [None if np.isnan(p) else int(round(p)) for p in fila_percentiles],
+            }
+            for posicion, grupo, fila_valores, fila_percentiles in zip(posiciones, grupos, valores, percentiles)
+        ],
+    }
+    if avisos:
+        tabla["avisos"] = avisos
+
+    return json.dumps(tabla, ensure_ascii=False, separators=(",", ":"))
+
+
+def listar_jugadores_por_posicion_y_precio(posicion: str, precio_max: float, precio_min: float = 0, k: int = 5,
+                                           ordenar_por: str = ORDEN_PUNTUACION, pagina: int = 1) -> str:
+    """
+    Lista los jugadores de una posición con valor de mercado entre precio_min y precio_max millones.
+
+    :param posicion: Grupo de posición (p. ej. "Forwards") o su nombre en español (p. ej. "Delantero").
+    :param precio_max: Precio máximo en millones de euros.
+    :param precio_min: Precio mínimo en millones de euros.
+    :param k: Número de jugadores a devolver.
+    :param ordenar_por: "puntuacion" (mejores estadísticas primero) o "valor" (más caros primero).
+    :param pagina: Página de resultados, para ver los siguientes k jugadores.
+    :return: Un JSON compacto con el total de jugadores en el rango y los de la página pedida.
+    """
+    grupo = grupo_posicion(posicion)
+    if grupo is None:
+        return f"Posición no reconocida: {posicion}. Opciones: {', '.join(GRUPOS_POSICION)}."
+    if ordenar_por not in ORDENES_MERCADO or k <= 0 or pagina <= 0:
+        return (f"Parámetros no válidos: ordenar_por debe ser {' o '.join(ORDENES_MERCADO)} "
+                f"y k y pagina deben ser positivos.")
+
+    indice = obtener_indice_mercado()
+    if isinstance(indice, str):
+        return "Error al cargar los datos."
 
-    if df_filtrado.empty:
-        return f"No se encontraron jugadores para la posición {posicion}."
+    if not indice.con_valores:
+        return f"Los datos no incluyen el valor de mercado de los jugadores; no se puede buscar {posicion} por precio."
 
     tope_precio = precio_max * 1000000
-    df_filtrado = df_filtrado[df_filtrado['market_value_in_eur'] <= precio_max]
+    resultado = indice.buscar(grupo, precio_min * 1000000, tope_precio, k, ordenar_por, pagina)
 
-    if df_filtrado.empty:
+    if not resultado["total"]:
         return f"No hay jugadores disponibles en {posicion} por menos de {precio_max} millones."
 
-    df_filtrado = df_filtrado.sort_values(by='market_value_in_eur', ascending=False)
+    jugadores = [{"puntuacion": valor_compacto(indice.puntuaciones[fila]),
+                  **json.loads(resumir_jugador(indice.df.iloc[fila], TEMPORADA_ACTUAL))}
+                 for fila in resultado["filas"]]
+
+    return json.dumps({
+        "grupo": grupo,
+        "total": resultado["total"],
+        "pagina": pagina,
+        "paginas": -(-resultado["total"] // k),
+        "jugadores": jugadores,
+    }, ensure_ascii=False, separators=(",", ":"))
 
-    mejor_jugador = df_filtrado.iloc[0].to_dict()
 
-    return json.dumps(mejor_jugador, indent=2)
+def listar_jugadores_similares(jugador: str, k: int = 5, precio_max: float = None, edad_max: int = None,
+                               temporada: str = None) -> str:
+    """
+    Busca, en todas las temporadas, los jugadores de la misma posición con un perfil estadístico
+    más parecido al de un jugador.
+
+    :param jugador: Nombre del jugador de referencia.
+    :param k: Número de jugadores similares a devolver.
+    :param precio_max: Precio máximo en millones de euros (opcional).
+    :param edad_max: Edad máxima (opcional).
+    :param temporada: Temporada del jugador de referencia (p. ej. "2023-2024"). Por defecto, la actual.
+    :return: Un JSON compacto con el jugador de referencia y los similares, con su similitud (0-1).
+    """
+    if k <= 0:
+        return "El número de jugadores similares debe ser positivo."
+    try:
+        resultado = buscar_jugadores_similares(jugador, temporada, k,
+                                               precio_max * 1000000 if precio_max is not None else None, edad_max)
+    except ValueError as e:
+        return str(e)
+
+    if isinstance(resultado, str):
+        return resultado
+
+    def compactar(datos):
+        compactos = {clave: valor_compacto(valor) for clave, valor in datos.items()}
+        return {clave: valor for clave, valor in compactos.items() if valor is not None}
+
+    respuesta = {**compactar({clave: valor for clave, valor in resultado.items() if clave != "similares"}),
+                 "similares": [compactar(similar) for similar in resultado["similares"]]}
+    return json.dumps(respuesta, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,142 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data_management.data_loader import (cargar_estadisticas_jugadores, normalizar_nombre, clave_temporada,
+                                             TEMPORADA_ACTUAL, COLUMNA_VALOR_MERCADO, GRUPOS_POSICION)
+from src.core.logica_ranking import calcular_puntuaciones_estadisticas
+from src.core.normalizacion import NormalizadorGrupos
+from src.core.agregacion_ranking import indices_top_k
+
+logger = logging.getLogger(__name__)
+
+ORDEN_VALOR = "valor"
+ORDEN_PUNTUACION = "puntuacion"
+ORDENES_MERCADO = (ORDEN_VALOR, ORDEN_PUNTUACION)
+
+# Nombres en español con los que los agentes suelen pedir cada grupo de posición
+ALIAS_POSICION = {
+    "portero": "GK",
+    "defensa": "Defender",
+    "central": "Defender",
+    "defensa central": "Defender",
+    "lateral": "Wing-Back",
+    "carrilero": "Wing-Back",
+    "pivote": "Defensive-Midfielders",
+    "mediocentro defensivo": "Defensive-Midfielders",
+    "centrocampista": "Central Midfielders",
+    "mediocentro": "Central Midfielders",
+    "mediapunta": "Attacking Midfielders",
+    "centrocampista ofensivo": "Attacking Midfielders",
+    "delantero": "Forwards",
+}
+
+
+def grupo_posicion(posicion):
+    """Grupo de posición canónico (GRUPOS_POSICION) de un nombre de grupo o alias, o None si no se reconoce."""
+    clave = normalizar_nombre(str(posicion)).strip()
+    grupos = {grupo.lower(): grupo for grupo in GRUPOS_POSICION}
+    return grupos.get(clave) or ALIAS_POSICION.get(clave) or ALIAS_POSICION.get(clave.rstrip("s"))
+
+
+class IndiceMercado:
+    """
+    Índice de los jugadores de una temporada por grupo de posición y valor de mercado.
+
+    Para cada grupo guarda los valores de mercado ordenados de menor a mayor y las filas
+    correspondientes, de modo que un rango de precios se localiza con dos búsquedas binarias
+    (O(log n)) y los k más caros del rango son los k últimos (O(k)). También guarda la puntuación
+    estadística de cada jugador, normalizada a [0, 10] por percentil dentro de su grupo, para
+    devolver los mejores del rango. Los jugadores sin valor de mercado no se indexan.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pd.DataFrame): Estadísticas de todos los jugadores de la temporada
+        """
+        self.df = df.reset_index(drop=True)
+        self.con_valores = COLUMNA_VALOR_MERCADO in self.df.columns
+
+        grupos = (self.df["position_group"].astype(object).to_numpy() if "position_group" in self.df.columns
+                  else np.full(len(self.df), None, dtype=object))
+        brutas = calcular_puntuaciones_estadisticas(self.df).to_numpy()
+        self.puntuaciones = (NormalizadorGrupos(brutas, grupos).normalizar_lote(brutas, grupos)
+                             if len(self.df) else np.zeros(0))
+
+        valores = (pd.to_numeric(self.df[COLUMNA_VALOR_MERCADO], errors="coerce").to_numpy(dtype=float)
+                   if self.con_valores else np.full(len(self.df), np.nan))
+
+        self.grupos = {}
+        for grupo in GRUPOS_POSICION:
+            filas = np.flatnonzero((grupos == grupo) & ~np.isnan(valores))
+            orden = np.argsort(valores[filas], kind="stable")
+            self.grupos[grupo] = (valores[filas][orden], filas[orden])
+
+    def buscar(self, grupo, precio_min=None, precio_max=None, k=5, ordenar_por=ORDEN_PUNTUACION, pagina=1):
+        """
+        Jugadores de un grupo de posición con valor de mercado en [precio_min, precio_max].
+
+        Args:
+            grupo (str): Grupo de posición (GRUPOS_POSICION)
+            precio_min (float, optional): Valor mínimo en euros
+            precio_max (float, optional): Valor máximo en euros
+            k (int): Jugadores por página
+            ordenar_por (str): "valor" (de más caro a más barato) o "puntuacion" (de mejor a peor)
+            pagina (int): Página de resultados, empezando en 1
+
+        Returns:
+            dict: `total` (jugadores en el rango) y `filas` (posiciones en `df` de los jugadores de la página)
+        """
+        if ordenar_por not in ORDENES_MERCADO:
+            raise ValueError(f"Orden no válido: {ordenar_por}. Opciones: {', '.join(ORDENES_MERCADO)}")
+        if k <= 0 or pagina <= 0:
+            raise ValueError("El número de jugadores por página y la página deben ser positivos")
+
+        valores, filas = self.grupos.get(grupo, (np.zeros(0), np.zeros(0, dtype=int)))
+        inicio = np.searchsorted(valores, precio_min, side="left") if precio_min is not None else 0
+        fin = np.searchsorted(valores, precio_max, side="right") if precio_max is not None else len(valores)
+        saltar = (pagina - 1) * k
+
+        if ordenar_por == ORDEN_VALOR:
+            desde = fin - saltar
+            seleccion = filas[max(desde - k, inicio):max(desde, inicio)][::-1]
+        else:
+            en_rango = filas[inicio:fin]
+            seleccion = en_rango[indices_top_k(self.puntuaciones[en_rango], saltar + k)[saltar:]]
+
+        return {"total": int(max(fin - inicio, 0)), "filas": seleccion}
+
+
+_indices_mercado = {}
+
+
+def obtener_indice_mercado(temporada=None):
+    """
+    Devuelve el índice de mercado de una temporada, construyéndolo solo la primera vez.
+
+    Returns:
+        IndiceMercado | str: Índice, o el mensaje de error si no se pudieron cargar los datos.
+    """
+    temporada = clave_temporada(temporada) or TEMPORADA_ACTUAL
+    if temporada in _indices_mercado:
+        return _indices_mercado[temporada]
+
+    df = cargar_estadisticas_jugadores(temporada)
+    if isinstance(df, str):
+        return df
+    if COLUMNA_VALOR_MERCADO not in df.columns:
+        logger.warning(f"Los datos de la temporada {temporada} no incluyen la columna {COLUMNA_VALOR_MERCADO}")
+
+    _indices_mercado[temporada] = IndiceMercado(df)
+    return _indices_mercado[temporada]
+
+
+def invalidar_indice_mercado(temporada=None):
+    """Descarta los índices de mercado (de una temporada o de todas), por ejemplo después de migrar nuevos datos."""
+    temporada = clave_temporada(temporada)
+    if temporada is None:
+        _indices_mercado.clear()
+    else:
+        _indices_mercado.pop(temporada, None)
@@ -1,9 +1,15 @@
 import numpy as np
 
+from src.core.fuzzy_matrices import (generar_flpr_lote, agregar_flpr_criterios, conjunto_terminos_activo,
+                                     _normalizar_pesos, MODO_AGREGACION_PONDERADO, MODOS_AGREGACION)
+
 def calcular_matriz_similitud(flpr1, flpr2):
     """
     Calcula la matriz de similitud entre dos matrices FLPR.
 
+    Admite también tensores apilados (..., n, n): la similitud se calcula celda a celda
+    para cada par de matrices del lote.
+
     Parámetros:
     - flpr1 (np.ndarray): Primera matriz FLPR.
     - flpr2 (np.ndarray): Segunda matriz FLPR.
@@ -11,14 +17,61 @@ def calcular_matriz_similitud(flpr1, flpr2):
     Return:
     - np.ndarray: Matriz de similitud.
     """
-    n = flpr1.shape[0]
-    matriz_similitud = np.zeros((n, n))
+    flpr1 = np.asarray(flpr1, dtype=float)
+    flpr2 = np.asarray(flpr2, dtype=float)
+
+    return np.round(1 - np.abs(flpr1 - flpr2), 3)
 
-    for i in range(n):
-        for j in range(n):
-            matriz_similitud[i][j] = 1 - abs(flpr1[i][j] - flpr2[i][j])
 
-    return np.round(matriz_similitud, 3)
+def indices_pares_validos(validos):
+    """
+    Enumera los pares (i, j), con i < j, de expertos válidos.
+
+    Parámetros:
+    - validos (array-like): Máscara booleana (E,) con los expertos que tienen FLPR.
+
+    Return:
+    - tuple: (indices_i, indices_j) con los índices originales de cada par, en el mismo orden
+      en que se recorren las parejas a mano: (0, 1), (0, 2), ..., (1, 2), ...
+    """
+    indices = np.flatnonzero(np.asarray(validos, dtype=bool))
+    pares_i, pares_j = np.triu_indices(len(indices), 1)
+
+    return indices[pares_i], indices[pares_j]
+
+
+def calcular_similitudes_por_pares(flprs, validos=None):
+    """
+    Calcula de una vez las matrices de similitud de todos los pares de expertos.
+
+    Parámetros:
+    - flprs (np.ndarray | list): Tensor (E x n x n) con las FLPR de los expertos, o lista de FLPR
+      en la que los expertos sin evaluación aparecen como None.
+    - validos (array-like, opcional): Máscara booleana (E,) de expertos a incluir. Por defecto,
+      los que no son None.
+
+    Return:
+    - np.ndarray: Tensor (pares x n x n) con la similitud de cada par (i < j) de expertos válidos,
+      en el orden de indices_pares_validos. Vacío si hay menos de dos expertos válidos.
+    """
+    if validos is None:
+        validos = [flpr is not None for flpr in flprs]
+    validos = np.asarray(validos, dtype=bool)
+    if len(validos) != len(flprs):
+        raise ValueError("La máscara de expertos válidos no coincide con el número de FLPR")
+
+    if isinstance(flprs, np.ndarray):
+        tensor = flprs[validos]
+    else:
+        tensor = np.asarray([flpr for flpr, valido in zip(flprs, validos) if valido], dtype=float)
+
+    if len(tensor) < 2:
+        n = tensor.shape[-1] if tensor.ndim == 3 else 0
+        return np.empty((0, n, n))
+
+    pares_i, pares_j = np.triu_indices(len(tensor), 1)
+
+    return calcular_matriz_similitud(tensor[pares_i], tensor[pares_j])
 
 
 def calcular_consenso_nivel1(matrices_similitud):
@@ -27,20 +80,19 @@ def calcular_consenso_nivel1(matrices_similitud):
     usando la media aritmética.
 
     Parámetros:
-    - matrices_similitud (list): Lista de matrices de similitud.
+    - matrices_similitud (list | np.ndarray): Lista de matrices de similitud o tensor
+      apilado (pares x n x n).
 
     Return:
     - np.ndarray: Matriz de consenso.
     """
-    if not matrices_similitud:
+    if len(matrices_similitud) == 0:
         raise ValueError("La lista de matrices de similitud está vacía")
 
-    matriz_consenso = np.zeros_like(matrices_similitud[0])
-
-    for matriz in matrices_similitud:
-        matriz_consenso += matriz
+    similitudes = np.asarray(matrices_similitud)
 
-    matriz_consenso = matriz_consenso / len(matrices_similitud)
+    # La reducción sobre el primer eje suma las matrices en orden, igual que el acumulador original
+    matriz_consenso = np.add.reduce(similitudes, axis=0) / similitudes.shape[0]
 
     return np.round(matriz_consenso, 3)
 
@@ -50,22 +102,21 @@ def calcular_consenso_nivel2(matriz_consenso):
     Calcula el consenso de nivel 2 (consenso por alternativas).
 
     Parámetros:
-    - matriz_consenso (np.ndarray): Matriz de consenso.
+    - matriz_consenso (np.ndarray): Matriz de consenso (o lote de matrices (..., n, n)).
 
     Return:
     - np.ndarray: Vector de consenso de nivel 2.
     """
-    n = matriz_consenso.shape[0]
-    consenso_nivel2 = np.zeros(n)
+    matriz_consenso = np.asarray(matriz_consenso, dtype=float)
+    n = matriz_consenso.shape[-1]
+    if n < 2:
+        raise ValueError("Se necesitan al menos dos alternativas para calcular el consenso")
 
-    for i in range(n):
-        # Para cada alternativa, calculamos la media de sus similitudes con todas las demás
-        suma = 0
-        for j in range(n):
-            if i != j:  # Excluimos la diagonal
-                suma += matriz_consenso[i][j]
-
-        consenso_nivel2[i] = suma / (n - 1)
+    # Para cada alternativa, la media de sus similitudes con todas las demás (se excluye la diagonal).
+    # La suma acumulada recorre cada fila en orden, de modo que el resultado coincide bit a bit
+    # con la suma elemento a elemento.
+    fuera_diagonal = np.where(np.eye(n, dtype=bool), 0.0, matriz_consenso)
+    consenso_nivel2 = np.cumsum(fuera_diagonal, axis=-1)[..., -1] / (n - 1)
 
     return np.round(consenso_nivel2, 3)
 
@@ -75,13 +126,16 @@ def calcular_consenso_nivel3(matriz_consenso):
     Calcula el consenso de nivel 3 (consenso global).
 
     Parámetros:
-    - matriz_consenso (np.ndarray): Matriz de consenso.
+    - matriz_consenso (np.ndarray): Matriz de consenso (o lote de matrices (..., n, n)).
 
     Return:
-    - float: Valor de consenso global.
+    - float: Valor de consenso global (array con un valor por matriz si se pasa un lote).
     """
     consenso_nivel2 = calcular_consenso_nivel2(matriz_consenso)
-    return round(np.mean(consenso_nivel2), 3)
+    if consenso_nivel2.ndim == 1:
+        return round(np.mean(consenso_nivel2), 3)
+
+    return np.round(np.mean(consenso_nivel2, axis=-1), 3)
 
 
 def calcular_cr(matrices_similitud, consenso_minimo=0.9):
@@ -89,7 +143,8 @@ def calcular_cr(matrices_similitud, consenso_minimo=0.9):
     Calcula el nivel medio de consenso (CR) y verifica si se alcanza el consenso mínimo.
 
     Parámetros:
-    - matrices_similitud (list): Lista de matrices de similitud.
+    - matrices_similitud (list | np.ndarray): Lista de matrices de similitud o tensor
+      apilado (pares x n x n).
     - consenso_minimo (float): Valor mínimo de consenso requerido (entre 0 y 1).
 
     Return:
@@ -101,4 +156,398 @@ def calcular_cr(matrices_similitud, consenso_minimo=0.9):
     cr = calcular_consenso_nivel3(matriz_consenso)
     consenso_alcanzado = cr >= consenso_minimo
 
-    return cr, consenso_alcanzado
\ No newline at end of file
+    return cr, consenso_alcanzado
+
+
+def calcular_cr_lote(flprs, consenso_minimo=0.9):
+    """
+    Calcula el CR de muchos procesos de consenso independientes a la vez.
+
+    Parámetros:
+    - flprs (np.ndarray): Tensor (E x S x n x n) con las FLPR de los E expertos en cada uno
+      de los S procesos.
+    - consenso_minimo (float): Valor mínimo de consenso requerido (entre 0 y 1).
+
+    Return:
+    - tuple: (CR, consenso_alcanzado), arrays (S,) con los mismos valores que devolvería
+      calcular_cr para cada proceso por separado.
+    """
+    flprs = np.asarray(flprs, dtype=float)
+    matrices_similitud = calcular_similitudes_por_pares(flprs, np.ones(len(flprs), dtype=bool))
+    cr = calcular_consenso_nivel3(calcular_consenso_nivel1(matrices_similitud))
+
+    return cr, cr >= consenso_minimo
+
+
+def calcular_proximidad_expertos(flprs, flpr_colectiva):
+    """
+    Calcula la proximidad de cada experto a la FLPR colectiva en los tres niveles de consenso.
+
+    Parámetros:
+    - flprs (np.ndarray | list): Tensor (E x n x n) con las FLPR de los expertos.
+    - flpr_colectiva (np.ndarray): FLPR colectiva (n x n).
+
+    Return:
+    - dict: Con las claves:
+        - "pares" (np.ndarray): (E x n x n) similitud de cada celda con la colectiva.
+        - "alternativas" (np.ndarray): (E x n) proximidad media de cada experto en cada alternativa.
+        - "global" (np.ndarray): (E,) proximidad global de cada experto.
+    """
+    proximidad_pares = calcular_matriz_similitud(flprs, np.asarray(flpr_colectiva, dtype=float)[None])
+    proximidad_alternativas = calcular_consenso_nivel2(proximidad_pares)
+
+    return {
+        "pares": proximidad_pares,
+        "alternativas": proximidad_alternativas,
+        "global": np.round(np.mean(proximidad_alternativas, axis=-1), 3),
+    }
+
+
+def validar_matriz_calificaciones(matriz, n_jugadores, criterios, conjunto=None):
+    """
+    Comprueba que una matriz de calificaciones se puede incorporar a EstadoConsenso.
+
+    Parámetros:
+    - matriz (list): Matriz de calificaciones (jugadores x criterios) de un experto.
+    - n_jugadores (int): Número de jugadores evaluados.
+    - criterios (list): Lista de criterios.
+    - conjunto (TermSet, opcional): Conjunto de términos. Por defecto, el configurado.
+
+    Return:
+    - str | None: Motivo por el que la matriz no es válida, o None si lo es.
+    """
+    if matriz is None or len(matriz) == 0:
+        return "la matriz está vacía"
+    if len(matriz) != n_jugadores:
+        return f"tiene {len(matriz)} jugadores en lugar de {n_jugadores}"
+    try:
+        if any(len(fila) < len(criterios) for fila in matriz):
+            return "algún jugador no tiene una calificación por criterio"
+        conjunto = conjunto if conjunto is not None else conjunto_terminos_activo()
+        conjunto.codificar([list(fila)[:len(criterios)] for fila in matriz])
+    except TypeError:
+        return "algún jugador no tiene una calificación por criterio"
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def _similitud_milesimas(flpr1, flpr2):
+    """
+    Similitud celda a celda expresada en milésimas enteras.
+
+    np.round(x, 3) calcula rint(x * 1000) / 1000, así que este entero es exactamente el numerador
+    de la similitud redondeada que devuelve calcular_matriz_similitud.
+    """
+    return np.rint((1 - np.abs(flpr1 - flpr2)) * 1000).astype(np.int64)
+
+
+class EstadoConsenso:
+    """
+    Estado incremental del consenso entre expertos a lo largo de las rondas de discusión.
+
+    Guarda las calificaciones codificadas de cada experto, su FLPR agregada y la similitud de cada
+    par de expertos en milésimas enteras. Cuando un experto cambia algunas calificaciones solo se
+    recalculan las similitudes y el consenso de las filas y columnas de los jugadores afectados
+    (O(E²·n) por jugador); si cambia la mayor parte de la matriz, se sustituye su FLPR entera
+    (O(E²·n²)). Los niveles 2 y 3 se recalculan en O(n²) por actualización.
+
+    Cada nivel se obtiene con calcular_consenso_nivel1/2/3 sobre los mismos valores y en el mismo
+    orden de suma que calcular_cr, así que el CR coincide exactamente con el de calcular_cr también
+    en las celdas que quedan justo en el punto medio del redondeo.
+    """
+
+    def __init__(self, matrices, criterios, conjunto=None, pesos=None, modo=MODO_AGREGACION_PONDERADO):
+        """
+        Args:
+            matrices (dict): Matrices de calificaciones (jugadores x criterios) por nombre de experto.
+                Los expertos sin matriz se ignoran.
+            criterios (list): Lista de criterios
+            conjunto (TermSet, optional): Conjunto de términos. Por defecto, el configurado.
+            pesos (dict | list, optional): Peso de cada criterio. Solo en modo ponderado.
+            modo (str, optional): Modo de agregación de los criterios (ver calcular_matrices_flpr).
+        """
+        if modo not in MODOS_AGREGACION:
+            raise ValueError(f"Modo de agregación desconocido: '{modo}'. Opciones: {MODOS_AGREGACION}")
+        if pesos is not None and modo != MODO_AGREGACION_PONDERADO:
+            raise ValueError("Los pesos por criterio solo se aplican en modo 'ponderado'")
+
+        self.criterios = list(criterios)
+        self.conjunto = conjunto if conjunto is not None else conjunto_terminos_activo()
+        self.modo = modo
+        self.pesos = _normalizar_pesos(pesos, self.criterios) if pesos is not None else None
+        self._decimales = None if modo == MODO_AGREGACION_PONDERADO else 3
+
+        self.nombres = [nombre for nombre, matriz in matrices.items() if matriz is not None and len(matriz) > 0]
+        if len(self.nombres) < 2:
+            raise ValueError("Se necesitan al menos dos expertos con calificaciones para calcular el consenso")
+
+        self.codigos = np.stack([self._codificar(matrices[nombre]) for nombre in self.nombres])
+        self.valores = self.conjunto.decodificar(self.codigos)
+        self.flprs = self._agregar(generar_flpr_lote(self.codigos, self.conjunto, self._decimales))
+
+        n_expertos = len(self.nombres)
+        self.n_pares = n_expertos * (n_expertos - 1) // 2
+        self._pares_i, self._pares_j = np.triu_indices(n_expertos, 1)
+        self._similitud = _similitud_milesimas(self.flprs[self._pares_i], self.flprs[self._pares_j])
+        self._recalcular_consenso()
+
+    @property
+    def n_jugadores(self):
+        return self.codigos.shape[1]
+
+    @property
+    def cr(self):
+        """Nivel de consenso global (nivel 3)."""
+        return self._cr
+
+    @property
+    def matriz_consenso(self):
+        """Matriz de consenso (nivel 1)."""
+        return self._consenso.copy()
+
+    @property
+    def consenso_alternativas(self):
+        """Consenso por alternativa (nivel 2)."""
+        return self._nivel2.copy()
+
+    def evaluar(self, consenso_minimo=0.9):
+        """
+        Devuelve (CR, consenso_alcanzado), igual que calcular_cr.
+        """
+        return self.cr, self.cr >= consenso_minimo
+
+    def flpr(self, nombre):
+        """FLPR agregada del experto indicado."""
+        return self.flprs[self._indice(nombre)].copy()
+
+    def calificaciones(self, nombre):
+        """Matriz de términos lingüísticos actual del experto indicado."""
+        etiquetas = np.asarray(self.conjunto.etiquetas, dtype=object)
+        return etiquetas[self.codigos[self._indice(nombre)]].tolist()
+
+    def matrices_similitud(self):
+        """Tensor (pares x n x n) con las similitudes actuales de todos los pares de expertos."""
+        return calcular_similitudes_por_pares(self.flprs)
+
+    def actualizar_calificacion(self, nombre, jugador_idx, criterio_idx, termino):
+        """
+        Cambia una calificación y actualiza el consenso en O(E²·n + n²).
+        """
+        experto = self._indice(nombre)
+        codigo = self.conjunto.codificar([termino])[0]
+        if self.codigos[experto, jugador_idx, criterio_idx] == codigo:
+            return self.cr
+
+        self.codigos[experto, jugador_idx, criterio_idx] = codigo
+        self.valores[experto, jugador_idx, criterio_idx] = self.conjunto.valores[codigo]
+        self._actualizar_jugador(experto, jugador_idx)
+        self._recalcular_niveles()
+
+        return self.cr
+
+    def actualizar_experto(self, nombre, matriz):
+        """
+        Sustituye la matriz de calificaciones de un experto y actualiza el consenso.
+
+        Si solo cambian unos pocos jugadores se actualizan sus filas y columnas; en otro caso se
+        recalcula la FLPR completa del experto.
+
+        Return:
+        - float: CR actualizado.
+        """
+        experto = self._indice(nombre)
+        codigos = self._codificar(matriz)
+        jugadores_cambiados = np.flatnonzero((codigos != self.codigos[experto]).any(axis=1))
+        if len(jugadores_cambiados) == 0:
+            return self.cr
+
+        self.codigos[experto] = codigos
+        self.valores[experto] = self.conjunto.decodificar(codigos)
+
+        # Cada jugador cambiado cuesta O(E²·n); a partir de ~n/4 jugadores sale más barato rehacer la matriz
+        if len(jugadores_cambiados) * 4 <= self.n_jugadores:
+            for jugador_idx in jugadores_cambiados:
+                self._actualizar_jugador(experto, jugador_idx)
+            self._recalcular_niveles()
+        else:
+            self._reemplazar_flpr(experto)
+
+        return self.cr
+
+    def _indice(self, nombre):
+        try:
+            return self.nombres.index(nombre)
+        except ValueError:
+            raise ValueError(f"El experto '{nombre}' no forma parte del consenso") from None
+
+    def _codificar(self, matriz):
+        codigos = self.conjunto.codificar([list(fila)[:len(self.criterios)] for fila in matriz])
+        if codigos.ndim != 2 or codigos.shape[1] != len(self.criterios):
+            raise ValueError("Cada jugador debe tener una calificación por criterio")
+        if hasattr(self, "codigos") and codigos.shape[0] != self.n_jugadores:
+            raise ValueError("La matriz de calificaciones no tiene el mismo número de jugadores")
+        return codigos
+
+    def _agregar(self, flprs_criterios):
+        return agregar_flpr_criterios(flprs_criterios, self.pesos, self.modo)
+
+    def _filas_flpr(self, valores, jugador_idx):
+        """
+        Fila y columna del jugador en la FLPR agregada, calculadas con las mismas operaciones
+        celda a celda que generar_flpr_lote para obtener exactamente los mismos valores.
+        """
+        # valores: (n x criterios) -> (criterios x 1 x n) para la fila y (criterios x n x 1) para la columna
+        v_jugador = valores[jugador_idx][:, None, None]
+        v_todos = valores.T[:, None, :]
+        fila = v_jugador / (v_jugador + v_todos)
+        columna = np.swapaxes(v_todos, 1, 2) / (np.swapaxes(v_todos, 1, 2) + v_jugador)
+        if self._decimales is not None:
+            fila = np.round(fila, self._decimales)
+            columna = np.round(columna, self._decimales)
+        fila[:, 0, jugador_idx] = 0.5
+        columna[:, jugador_idx, 0] = 0.5
+
+        return self._agregar(fila)[0], self._agregar(columna)[:, 0]
+
+    def _pares_de(self, experto):
+        """Índices de los pares en los que participa el experto y del otro experto de cada par."""
+        pares = np.flatnonzero((self._pares_i == experto) | (self._pares_j == experto))
+        otros = np.where(self._pares_i[pares] == experto, self._pares_j[pares], self._pares_i[pares])
+        return pares, otros
+
+    def _actualizar_jugador(self, experto, jugador_idx):
+        fila, columna = self._filas_flpr(self.valores[experto], jugador_idx)
+        pares, otros = self._pares_de(experto)
+
+        self._similitud[pares, jugador_idx, :] = _similitud_milesimas(fila, self.flprs[otros, jugador_idx, :])
+        self._similitud[pares, :, jugador_idx] = _similitud_milesimas(columna, self.flprs[otros, :, jugador_idx])
+        self.flprs[experto, jugador_idx, :] = fila
+        self.flprs[experto, :, jugador_idx] = columna
+
+        self._consenso[jugador_idx, :] = calcular_consenso_nivel1(self._similitud[:, jugador_idx, :] / 1000)
+        self._consenso[:, jugador_idx] = calcular_consenso_nivel1(self._similitud[:, :, jugador_idx] / 1000)
+
+    def _reemplazar_flpr(self, experto):
+        flpr_nueva = self._agregar(generar_flpr_lote(self.codigos[experto:experto + 1], self.conjunto, self._decimales))[0]
+        pares, otros = self._pares_de(experto)
+
+        self._similitud[pares] = _similitud_milesimas(flpr_nueva, self.flprs[otros])
+        self.flprs[experto] = flpr_nueva
+        self._recalcular_consenso()
+
+    def _recalcular_consenso(self):
+        if self.n_jugadores < 2:
+            raise ValueError("Se necesitan al menos dos alternativas para calcular el consenso")
+
+        self._consenso = calcular_consenso_nivel1(self._similitud / 1000)
+        self._recalcular_niveles()
+
+    def _recalcular_niveles(self):
+        self._nivel2 = calcular_consenso_nivel2(self._consenso)
+        self._cr = calcular_consenso_nivel3(self._consenso)
+
+
+def _pesos_efectivos(estado):
+    """
+    Peso con el que cada criterio entra en la FLPR agregada de un experto.
+
+    En modo secuencial cada plegado con calcular_flpr_comun divide a la mitad el peso de lo ya
+    acumulado, así que el último criterio pesa 1/2, el penúltimo 1/4, etc. (sin contar redondeos).
+    """
+    n_criterios = len(estado.criterios)
+    if estado.modo == MODO_AGREGACION_PONDERADO:
+        return estado.pesos if estado.pesos is not None else np.full(n_criterios, 1 / n_criterios)
+
+    exponentes = np.minimum(n_criterios - np.arange(n_criterios), n_criterios - 1)
+    return 0.5 ** exponentes
+
+
+def identificar_celdas_retroalimentacion(estado, k=10):
+    """
+    Identifica las calificaciones cuyo cambio más subiría el CR.
+
+    Para cada experto, jugador y criterio se propone el término más cercano a la media de las
+    valoraciones del resto de expertos, y se estima de forma vectorizada cuánto cambiaría el CR
+    (sin los redondeos intermedios) si el experto adoptara ese término. Cada candidato solo afecta
+    a la fila y la columna de su jugador, así que el coste es O(E·n) por celda candidata.
+
+    Parámetros:
+    - estado (EstadoConsenso): Estado actual del consenso.
+    - k (int): Número máximo de celdas a devolver.
+
+    Return:
+    - list: Diccionarios ordenados de mayor a menor mejora, con las claves "experto", "jugador_idx",
+      "criterio_idx", "criterio", "actual", "sugerido" y "mejora_cr". Solo se incluyen celdas
+      cuyo cambio mejora el consenso.
+    """
+    n_expertos, n_jugadores, _ = estado.valores.shape
+    valores_terminos = estado.conjunto.valores
+
+    # Término propuesto: el más próximo a la media del resto de expertos en cada celda
+    media_resto = (estado.valores.sum(axis=0, keepdims=True) - estado.valores) / (n_expertos - 1)
+    propuestos = np.abs(media_resto[..., None] - valores_terminos).argmin(axis=-1)
+
+    expertos, jugadores, criterios = np.nonzero(propuestos != estado.codigos)
+    if len(expertos) == 0:
+        return []
+
+    pesos = _pesos_efectivos(estado)
+    v_actual = estado.valores[expertos, jugadores, criterios][:, None]
+    v_nuevo = valores_terminos[propuestos[expertos, jugadores, criterios]][:, None]
+    v_otros = estado.valores[expertos, :, criterios]
+
+    # Cambio en la fila del jugador de la FLPR agregada del experto (candidatos x n).
+    # Por reciprocidad, la columna cambia en sentido contrario.
+    delta_fila = pesos[criterios][:, None] * (v_nuevo / (v_nuevo + v_otros) - v_actual / (v_actual + v_otros))
+    delta_fila[np.arange(len(expertos)), jugadores] = 0
+
+    fila = estado.flprs[expertos, jugadores, :]
+    columna = estado.flprs[expertos, :, jugadores]
+    filas_resto = np.swapaxes(estado.flprs[:, jugadores, :], 0, 1)
+    columnas_resto = np.transpose(estado.flprs[:, :, jugadores], (2, 0, 1))
+
+    mejora = (np.abs(fila[:, None, :] - filas_resto) - np.abs((fila + delta_fila)[:, None, :] - filas_resto)
+              + np.abs(columna[:, None, :] - columnas_resto) - np.abs((columna - delta_fila)[:, None, :] - columnas_resto))
+    # El propio experto aparece en el resto con diferencia nula antes del cambio: se descuenta
+    mejora[np.arange(len(expertos)), expertos, :] = 0
+    mejora_cr = mejora.sum(axis=(1, 2)) / (n_jugadores * (n_jugadores - 1) * estado.n_pares)
+
+    orden = np.argsort(-mejora_cr, kind="stable")[:k]
+    etiquetas = estado.conjunto.etiquetas
+
+    return [
+        {
+            "experto": estado.nombres[expertos[i]],
+            "jugador_idx": int(jugadores[i]),
+            "criterio_idx": int(criterios[i]),
+            "criterio": estado.criterios[criterios[i]],
+            "actual": etiquetas[estado.codigos[expertos[i], jugadores[i], criterios[i]]],
+            "sugerido": etiquetas[propuestos[expertos[i], jugadores[i], criterios[i]]],
+            "mejora_cr": float(mejora_cr[i]),
+        }
+        for i in orden if mejora_cr[i] > 0
+    ]
+
+
+def formatear_celdas_revision(celdas, jugadores, experto):
+    """
+    Texto para el prompt de re-evaluación de un experto con las celdas que debe revisar.
+
+    Parámetros:
+    - celdas (list): Celdas devueltas por identificar_celdas_retroalimentacion.
+    - jugadores (list): Nombres de los jugadores, en el orden de las matrices.
+    - experto (str): Nombre del experto en el estado del consenso.
+
+    Return:
+    - str: Las calificaciones del experto que más alejan el consenso, o "" si no tiene ninguna.
+    """
+    celdas_experto = [celda for celda in celdas if celda["experto"] == experto]
+    if not celdas_experto:
+        return ""
+
+    texto = "Revisa especialmente estas calificaciones tuyas, que son las que más alejan al grupo del consenso:\n"
+    for celda in celdas_experto:
+        texto += (f"- {jugadores[celda['jugador_idx']]} ({celda['criterio']}): diste {celda['actual']}, "
+                  f"el resto del grupo está más cerca de {celda['sugerido']}\n")
+    return texto
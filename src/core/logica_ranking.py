@@ -1,98 +1,168 @@
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
 import pandas as pd
-from src.data_management.data_loader import cargar_estadisticas_jugadores
+from src.data_management.data_loader import (cargar_estadisticas_jugadores, normalizar_nombre, huella_datos, DATA_FOLDER,
+                                             TEMPORADA_ACTUAL, clave_temporada)
+from src.data_management.indice_nombres import (IndiceNombres, describir_resolucion, RESOLUCION_AMBIGUA,
+                                                RESOLUCION_NO_ENCONTRADA)
+from src.core.normalizacion import NormalizadorGrupos, METODO_PERCENTIL
 
-def calcular_ponderacion_estadisticas(jugador_data):
+logger = logging.getLogger(__name__)
+
+CARPETA_CACHE = os.path.join(DATA_FOLDER, "cache")
+TEMPORADA_POR_DEFECTO = TEMPORADA_ACTUAL
+COLUMNAS_TABLA_PUNTUACIONES = ["Player", "Squad", "position_group", "puntuacion_bruta", "puntuacion_normalizada"]
+
+# Estadísticas de ratio que se reescalan a porcentaje entre un mínimo y un máximo esperados
+ESCALAS_RATIO = {
+    "G/Sh": {"max_expected": 0.35, "min_expected": 0.05},      # Goles por disparo
+    "G/SoT": {"max_expected": 0.6, "min_expected": 0.1},       # Goles por tiro a puerta
+    "npxG/Sh": {"max_expected": 0.35, "min_expected": 0.05},   # xG sin penaltis por disparo
+    "SoT%": {"max_expected": 70, "min_expected": 20},          # % de tiros a puerta
+    "Succ%": {"max_expected": 80, "min_expected": 20},         # % regates exitosos
+    "Won%": {"max_expected": 80, "min_expected": 20},          # % duelos aéreos ganados
+    "Tkl%": {"max_expected": 80, "min_expected": 20},          # % entradas exitosas
+    "Total - Cmp%": {"max_expected": 95, "min_expected": 60},  # % pases completados
+}
+
+# Peso de cada estadística según el grupo de posición del jugador
+PESOS_POSICION = {
+    "GK": {
+        "Save%": 1.5, "PSxG-GA": 1.5, "Stp%": 0.8,
+        "Total - Cmp%": 0.6, "Long - Cmp%": 0.7,
+        "Saves": 0.8, "CS": 0.9, "Err": -1.0,
+    },
+    "Defender": {
+        "TklW": 1.0, "Tkl%": 0.6, "Tkl+Int": 1.0, "Blocks": 0.9,
+        "Clr": 0.7, "Won%": 0.8, "Total - Cmp%": 0.7, "PrgP": 0.7, "Err": -1.0,
+    },
+    "Defensive-Midfielders": {
+        "Tkl+Int": 1.2, "Recov": 1.0, "TklW": 0.8,
+        "Total - Cmp%": 1.0, "PrgP": 0.9, "KP": 0.6, "PrgC": 0.6, "Blocks": 0.5, "Err": -0.8,
+    },
+    "Central Midfielders": {
+        "Total - Cmp%": 1.1, "PrgP": 1.0, "KP": 1.0, "Ast": 0.9, "Gls": 0.7,
+        "PrgC": 0.8, "SCA": 0.8, "Tkl+Int": 0.6, "Recov": 0.5, "GCA": 0.6,
+    },
+    "Attacking Midfielders": {
+        "KP": 1.2, "Ast": 1.1, "Gls": 1.0, "SCA": 1.0, "GCA": 0.9,
+        "PrgC": 0.7, "PrgP": 0.6, "PrgR": 0.7, "Succ%": 0.7, "Total - Cmp%": 0.5,
+        "Sh": 0.6, "npxG+xA": 0.8,
+    },
+    "Wing-Back": {
+        "Crs_x": 1.0, "PrgC": 0.8, "PrgP": 0.7, "PrgR": 0.6,
+        "Tkl+Int": 0.7, "TklW": 0.6, "KP": 0.7, "Ast": 1.0, "Gls": 0.7,
+        "Total - Cmp%": 0.6, "Succ%": 0.5, "SCA": 0.6,
+    },
+    "Forwards": {
+        "Gls": 1.5, "npxG": 1.3, "Sh": 0.8, "SoT%": 0.8,
+        "G/Sh": 1.2, "npxG/Sh": 1.0, "Ast": 0.6, "KP": 0.5,
+        "PrgR": 0.8, "Succ%": 0.6, "GCA": 0.5,
+    },
+    "Unknown": {
+        "Gls": 0.9, "Ast": 0.9, "npxG": 0.8, "npxG+xA": 0.8,
+        "Total - Cmp%": 0.8, "PrgP": 0.7, "PrgC": 0.7, "PrgR": 0.7,
+        "KP": 0.7, "SCA": 0.7, "GCA": 0.6, "Tkl+Int": 0.7, "Sh": 0.6,
+        "SoT%": 0.5, "G/Sh": 0.7, "Succ%": 0.5,
+    }
+}
+
+POSICION_POR_DEFECTO = "Unknown"
+
+
+def _compilar_pesos(pesos_posicion):
     """
-    Calcula la puntuación bruta de un jugador basada en sus estadísticas y posición.
-    No normaliza la puntuación final, para permitir una normalización posterior respecto al grupo.
+    Compila los pesos por posición en una matriz (posiciones x estadísticas) y precalcula cómo
+    se transforma cada estadística antes de ponderarla.
     """
-    posicion = jugador_data.get('position_group', "Unknown")
-
-    rate_to_percentage_scale = {
-        "G/Sh": {"max_expected": 0.35, "min_expected": 0.05},      # Goles por disparo
-        "G/SoT": {"max_expected": 0.6, "min_expected": 0.1},       # Goles por tiro a puerta
-        "npxG/Sh": {"max_expected": 0.35, "min_expected": 0.05},   # xG sin penaltis por disparo
-        "SoT%": {"max_expected": 70, "min_expected": 20},          # % de tiros a puerta
-        "Succ%": {"max_expected": 80, "min_expected": 20},         # % regates exitosos
-        "Won%": {"max_expected": 80, "min_expected": 20},          # % duelos aéreos ganados
-        "Tkl%": {"max_expected": 80, "min_expected": 20},          # % entradas exitosas
-        "Total - Cmp%": {"max_expected": 95, "min_expected": 60},  # % pases completados
-    }
+    posiciones = list(pesos_posicion)
+    estadisticas = list(dict.fromkeys(stat for pesos in pesos_posicion.values() for stat in pesos))
 
-    pesos = {
-        "GK": {
-            "Save%": 1.5, "PSxG-GA": 1.5, "Stp%": 0.8,
-            "Total - Cmp%": 0.6, "Long - Cmp%": 0.7,
-            "Saves": 0.8, "CS": 0.9, "Err": -1.0,
-        },
-        "Defender": {
-            "TklW": 1.0, "Tkl%": 0.6, "Tkl+Int": 1.0, "Blocks": 0.9,
-            "Clr": 0.7, "Won%": 0.8, "Total - Cmp%": 0.7, "PrgP": 0.7, "Err": -1.0,
-        },
-        "Defensive-Midfielders": {
-            "Tkl+Int": 1.2, "Recov": 1.0, "TklW": 0.8,
-            "Total - Cmp%": 1.0, "PrgP": 0.9, "KP": 0.6, "PrgC": 0.6, "Blocks": 0.5, "Err": -0.8,
-        },
-        "Central Midfielders": {
-            "Total - Cmp%": 1.1, "PrgP": 1.0, "KP": 1.0, "Ast": 0.9, "Gls": 0.7,
-            "PrgC": 0.8, "SCA": 0.8, "Tkl+Int": 0.6, "Recov": 0.5, "GCA": 0.6,
-        },
-        "Attacking Midfielders": {
-            "KP": 1.2, "Ast": 1.1, "Gls": 1.0, "SCA": 1.0, "GCA": 0.9,
-            "PrgC": 0.7, "PrgP": 0.6, "PrgR": 0.7, "Succ%": 0.7, "Total - Cmp%": 0.5,
-            "Sh": 0.6, "npxG+xA": 0.8,
-        },
-        "Wing-Back": {
-            "Crs_x": 1.0, "PrgC": 0.8, "PrgP": 0.7, "PrgR": 0.6,
-            "Tkl+Int": 0.7, "TklW": 0.6, "KP": 0.7, "Ast": 1.0, "Gls": 0.7,
-            "Total - Cmp%": 0.6, "Succ%": 0.5, "SCA": 0.6,
-        },
-        "Forwards": {
-            "Gls": 1.5, "npxG": 1.3, "Sh": 0.8, "SoT%": 0.8,
-            "G/Sh": 1.2, "npxG/Sh": 1.0, "Ast": 0.6, "KP": 0.5,
-            "PrgR": 0.8, "Succ%": 0.6, "GCA": 0.5,
-        },
-        "Unknown": {
-            "Gls": 0.9, "Ast": 0.9, "npxG": 0.8, "npxG+xA": 0.8,
-            "Total - Cmp%": 0.8, "PrgP": 0.7, "PrgC": 0.7, "PrgR": 0.7,
-            "KP": 0.7, "SCA": 0.7, "GCA": 0.6, "Tkl+Int": 0.7, "Sh": 0.6,
-            "SoT%": 0.5, "G/Sh": 0.7, "Succ%": 0.5,
-        }
-    }
+    matriz = np.zeros((len(posiciones), len(estadisticas)))
+    for i, posicion in enumerate(posiciones):
+        for stat, peso in pesos_posicion[posicion].items():
+            matriz[i, estadisticas.index(stat)] = peso
 
-    pesos_posicion = pesos.get(posicion, pesos["Unknown"])
+    es_ratio = np.array([stat in ESCALAS_RATIO for stat in estadisticas])
+    es_porcentaje = np.array([stat not in ESCALAS_RATIO and stat.endswith('%') for stat in estadisticas])
+    minimos = np.array([ESCALAS_RATIO.get(stat, {}).get("min_expected", 0.0) for stat in estadisticas])
+    rangos = np.array([ESCALAS_RATIO[stat]["max_expected"] - ESCALAS_RATIO[stat]["min_expected"]
+                       if stat in ESCALAS_RATIO else 1.0 for stat in estadisticas])
 
-    minutos_90s = 1.0
-    if '90s' in jugador_data and pd.notna(jugador_data['90s']):
-        try:
-            val_90s = float(jugador_data['90s'])
-            minutos_90s = max(val_90s, 0.1)
-        except (ValueError, TypeError):
-            pass
-
-    puntuacion = 0
-    for stat, peso in pesos_posicion.items():
-        if stat in jugador_data and pd.notna(jugador_data[stat]):
-            try:
-                valor_original = float(jugador_data[stat])
-                valor_procesado = 0.0
-
-                if stat in rate_to_percentage_scale:
-                    config = rate_to_percentage_scale[stat]
-                    min_expected = config["min_expected"]
-                    max_expected = config["max_expected"]
-                    valor_procesado = ((valor_original - min_expected) / (max_expected - min_expected)) * 100
-                    valor_procesado = min(max(valor_procesado, 0.0), 100.0)
-                elif stat.endswith('%'):
-                    valor_procesado = min(max(valor_original, 0.0), 100.0)
-                else:
-                    valor_procesado = valor_original / minutos_90s if minutos_90s > 0 else 0.0
-
-                puntuacion += valor_procesado * peso
-            except (ValueError, TypeError):
-                pass
-
-    return puntuacion
+    return posiciones, estadisticas, matriz, es_ratio, es_porcentaje, minimos, rangos
+
+
+(POSICIONES, ESTADISTICAS_PONDERADAS, MATRIZ_PESOS,
+ _ES_RATIO, _ES_PORCENTAJE, _MINIMOS_RATIO, _RANGOS_RATIO) = _compilar_pesos(PESOS_POSICION)
+_INDICE_POSICION = {posicion: i for i, posicion in enumerate(POSICIONES)}
+
+
+def preparar_estadisticas(df_jugadores):
+    """
+    Transforma las estadísticas ponderadas de todos los jugadores en una matriz lista para puntuar.
+
+    Los ratios se reescalan a porcentaje, los porcentajes se recortan a [0, 100] y el resto se
+    divide entre los partidos completos jugados (`90s`, mínimo 0.1). Los valores ausentes o no
+    numéricos cuentan como 0.
+
+    Returns:
+        np.ndarray: Matriz (jugadores x ESTADISTICAS_PONDERADAS).
+    """
+    n = len(df_jugadores)
+    valores = np.full((n, len(ESTADISTICAS_PONDERADAS)), np.nan)
+    for j, stat in enumerate(ESTADISTICAS_PONDERADAS):
+        if stat in df_jugadores.columns:
+            valores[:, j] = pd.to_numeric(df_jugadores[stat], errors='coerce')
+
+    if '90s' in df_jugadores.columns:
+        minutos_90s = pd.to_numeric(df_jugadores['90s'], errors='coerce').to_numpy(dtype=float)
+        minutos_90s = np.where(np.isnan(minutos_90s), 1.0, np.maximum(minutos_90s, 0.1))
+    else:
+        minutos_90s = np.ones(n)
+
+    procesados = np.where(_ES_PORCENTAJE, np.clip(valores, 0.0, 100.0), valores / minutos_90s[:, None])
+    ratios = np.clip(((valores - _MINIMOS_RATIO) / _RANGOS_RATIO) * 100, 0.0, 100.0)
+    procesados = np.where(_ES_RATIO, ratios, procesados)
+
+    return np.nan_to_num(procesados, nan=0.0)
+
+
+def calcular_puntuaciones_estadisticas(df_jugadores):
+    """
+    Calcula en una sola pasada la puntuación bruta de todos los jugadores de un DataFrame.
+
+    Cada grupo de posición se puntúa con un producto matriz-vector entre las estadísticas
+    preparadas y su fila de MATRIZ_PESOS. Las posiciones desconocidas usan los pesos de "Unknown".
+
+    Returns:
+        pd.Series: Puntuación bruta de cada jugador, con el mismo índice que el DataFrame.
+    """
+    estadisticas = preparar_estadisticas(df_jugadores)
+
+    if 'position_group' in df_jugadores.columns:
+        posiciones = df_jugadores['position_group'].astype(object).map(_INDICE_POSICION)
+        indices_posicion = posiciones.fillna(_INDICE_POSICION[POSICION_POR_DEFECTO]).to_numpy(dtype=int)
+    else:
+        indices_posicion = np.full(len(df_jugadores), _INDICE_POSICION[POSICION_POR_DEFECTO])
+
+    puntuaciones = np.zeros(len(df_jugadores))
+    for indice in np.unique(indices_posicion):
+        filas = indices_posicion == indice
+        puntuaciones[filas] = estadisticas[filas] @ MATRIZ_PESOS[indice]
+
+    return pd.Series(puntuaciones, index=df_jugadores.index)
+
+
+def calcular_ponderacion_estadisticas(jugador_data):
+    """
+    Calcula la puntuación bruta de un jugador basada en sus estadísticas y posición.
+    No normaliza la puntuación final, para permitir una normalización posterior respecto al grupo.
+    """
+    return float(calcular_puntuaciones_estadisticas(pd.DataFrame([jugador_data])).iloc[0])
 
 def normalizar_puntuacion_individual(puntuaciones, min_teorico=0, max_teorico=100, escala=10):
     """
@@ -104,43 +174,204 @@ def normalizar_puntuacion_individual(puntuaciones, min_teorico=0, max_teorico=10
         valor = ((puntuaciones - min_teorico) / (max_teorico - min_teorico)) * escala
         return min(max(valor, 0), escala)
 
-def calcular_ranking_jugadores(flpr_colectiva, jugadores):
-    """
-    Calcula el ranking de los jugadores basado en la matriz FLPR colectiva.
-    Normaliza las puntuaciones estadísticas al máximo del grupo.
-    """
-    n = flpr_colectiva.shape[0]
-    puntuaciones_flpr = []
-
-    for i in range(n):
-        puntuacion_flpr = sum(flpr_colectiva[i][j] for j in range(n) if i != j)
-        puntuaciones_flpr.append((jugadores[i], puntuacion_flpr))
-
-    puntuaciones_flpr.sort(key=lambda x: x[1], reverse=True)
-
-    df_jugadores = cargar_estadisticas_jugadores()
-    puntuaciones_stats = []
-
-    for jugador, _ in puntuaciones_flpr:
-        puntuacion = 0.0
-        if not isinstance(df_jugadores, str):
-            if 'normalized_name' not in df_jugadores.columns:
-                df_jugadores['normalized_name'] = df_jugadores['Player'].apply(lambda x: x.lower())
-            jugador_normalizado = jugador.lower()
-            jugador_encontrado = df_jugadores[
-                df_jugadores['normalized_name'].str.contains(jugador_normalizado, case=False,
-                                                             na=False)]
-            if not jugador_encontrado.empty:
-                puntuacion_bruta = calcular_ponderacion_estadisticas(jugador_encontrado.iloc[0])
-                puntuacion = puntuacion_bruta
-        puntuaciones_stats.append((jugador, puntuacion))
-
-    puntuaciones_brutas = [p for _, p in puntuaciones_stats]
-    if puntuaciones_brutas:
-        puntuaciones_normalizadas = normalizar_puntuacion_individual(puntuaciones_brutas, escala=10)
-        puntuaciones_finales = [(jugador, puntuacion) for (jugador, _), puntuacion in
-                                zip(puntuaciones_stats, puntuaciones_normalizadas)]
+def construir_tabla_puntuaciones(df_jugadores):
+    """
+    Construye la tabla de puntuaciones de una temporada a partir de sus estadísticas.
+
+    Returns:
+        pd.DataFrame: Tabla indexada por `normalized_name` con el jugador, su equipo, su grupo de
+        posición y sus puntuaciones bruta y normalizada. Si un jugador aparece varias veces
+        (cambio de equipo a mitad de temporada) se conserva su primera fila, como en la búsqueda original.
+    """
+    tabla = pd.DataFrame(index=df_jugadores.index)
+    tabla["normalized_name"] = (df_jugadores["normalized_name"] if "normalized_name" in df_jugadores.columns
+                                else df_jugadores["Player"].astype(str).apply(normalizar_nombre))
+    for columna in ["Player", "Squad", "position_group"]:
+        tabla[columna] = df_jugadores[columna] if columna in df_jugadores.columns else None
+
+    tabla["puntuacion_bruta"] = calcular_puntuaciones_estadisticas(df_jugadores)
+    tabla["puntuacion_normalizada"] = np.clip(tabla["puntuacion_bruta"] / 100 * 10, 0, 10)
+
+    return tabla.drop_duplicates("normalized_name", keep="first").set_index("normalized_name")
+
+
+def _huella_tabla(df_jugadores):
+    """
+    Huella de los datos de origen y de la configuración de pesos. Si cambian los datos cargados
+    (de MongoDB, del snapshot o del CSV) o los pesos, cambia la huella y la tabla guardada deja de usarse.
+    """
+    contenido = {
+        "datos": huella_datos(df_jugadores),
+        "pesos": PESOS_POSICION,
+        "escalas": ESCALAS_RATIO,
+    }
+    return hashlib.sha1(json.dumps(contenido, sort_keys=True).encode()).hexdigest()[:12]
+
+
+_tablas_puntuaciones = {}
+# Índice de nombres y normalizador de cada tabla en memoria, por temporada
+_indices_tablas = {}
+_normalizadores = {}
+
+
+def obtener_tabla_puntuaciones(temporada=None):
+    """
+    Devuelve la tabla de puntuaciones de una temporada, calculándola solo si no hay una válida.
+
+    La tabla se busca primero en memoria y después en disco (data/cache) por la huella de los datos
+    que devuelve el cargador; si no existe o los datos han cambiado, se calcula una vez con
+    calcular_puntuaciones_estadisticas y se guarda. Consultar la huella no vuelve a leer el origen:
+    el cargador la calcula una vez por lectura y los datos están en su caché en memoria.
+
+    Args:
+        temporada (str, optional): Temporada (e.g., "2324"). Por defecto, la más reciente.
+
+    Returns:
+        pd.DataFrame: Tabla de puntuaciones (ver construir_tabla_puntuaciones). Vacía si no se
+        pudieron cargar los datos.
+    """
+    temporada = clave_temporada(temporada) or TEMPORADA_POR_DEFECTO
+    df_jugadores = cargar_estadisticas_jugadores(temporada)
+    if isinstance(df_jugadores, str) or df_jugadores.empty:
+        logger.error(f"No se pudo construir la tabla de puntuaciones de la temporada {temporada}")
+        return pd.DataFrame(columns=COLUMNAS_TABLA_PUNTUACIONES, index=pd.Index([], name="normalized_name"))
+    huella = _huella_tabla(df_jugadores)
+
+    en_memoria = _tablas_puntuaciones.get(temporada)
+    if en_memoria is not None and en_memoria[0] == huella:
+        return en_memoria[1]
+
+    ruta_tabla = os.path.join(CARPETA_CACHE, f"puntuaciones_{temporada}_{huella}.csv")
+    if os.path.exists(ruta_tabla):
+        tabla = pd.read_csv(ruta_tabla, index_col="normalized_name")
+    else:
+        tabla = construir_tabla_puntuaciones(df_jugadores)
+        try:
+            invalidar_tabla_puntuaciones(temporada)
+            os.makedirs(CARPETA_CACHE, exist_ok=True)
+            tabla.to_csv(ruta_tabla)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar la tabla de puntuaciones en {ruta_tabla}: {e}")
+
+    _tablas_puntuaciones[temporada] = (huella, tabla)
+    _indices_tablas[temporada] = IndiceNombres(tabla.index)
+    _normalizadores[temporada] = NormalizadorGrupos.desde_tabla(tabla)
+    return tabla
+
+
+def invalidar_tabla_puntuaciones(temporada=None):
+    """
+    Descarta las tablas de puntuaciones guardadas (de una temporada o de todas), por ejemplo
+    después de migrar nuevos datos.
+    """
+    temporada = clave_temporada(temporada)
+    if temporada is None:
+        _tablas_puntuaciones.clear()
+        _indices_tablas.clear()
+        _normalizadores.clear()
     else:
-        puntuaciones_finales = []
+        _tablas_puntuaciones.pop(temporada, None)
+        _indices_tablas.pop(temporada, None)
+        _normalizadores.pop(temporada, None)
+
+    if not os.path.isdir(CARPETA_CACHE):
+        return
+    prefijo = f"puntuaciones_{temporada}_" if temporada else "puntuaciones_"
+    for fichero in os.listdir(CARPETA_CACHE):
+        if fichero.startswith(prefijo) and fichero.endswith(".csv"):
+            os.remove(os.path.join(CARPETA_CACHE, fichero))
+
+
+def obtener_normalizador(temporada=None):
+    """
+    Devuelve el normalizador por grupos de posición de una temporada (ver NormalizadorGrupos),
+    o None si no se pudieron cargar sus datos.
+    """
+    temporada = clave_temporada(temporada) or TEMPORADA_POR_DEFECTO
+    obtener_tabla_puntuaciones(temporada)
+    return _normalizadores.get(temporada)
+
+
+def buscar_en_tabla_puntuaciones(tabla, jugador, indice=None):
+    """
+    Busca un jugador en la tabla de puntuaciones con el índice de nombres (exacto, por tokens y
+    difuso). Los nombres ambiguos o no encontrados se registran en el log y no devuelven fila.
+
+    Args:
+        tabla (pd.DataFrame): Tabla de puntuaciones
+        jugador (str): Nombre del jugador
+        indice (IndiceNombres, optional): Índice de la tabla. Si no se indica, se construye.
+
+    Returns:
+        pd.Series | None: Fila del jugador, o None si no se encuentra o es ambiguo.
+    """
+    indice = indice if indice is not None else IndiceNombres(tabla.index)
+    resultado = indice.resolver(jugador)
+
+    if resultado["estado"] in (RESOLUCION_AMBIGUA, RESOLUCION_NO_ENCONTRADA):
+        logger.warning(describir_resolucion(jugador, resultado))
+        return None
+    return tabla.iloc[resultado["posicion"]]
+
+
+def puntuaciones_estadisticas_jugadores(jugadores, temporada=None, metodo=METODO_PERCENTIL):
+    """
+    Puntuación estadística normalizada a [0, 10] de cada jugador, respecto a su grupo de posición.
+    Los jugadores con nombre ambiguo o no encontrado puntúan 0.
+
+    Returns:
+        np.ndarray: Puntuaciones en el mismo orden que `jugadores`
+    """
+    temporada = clave_temporada(temporada) or TEMPORADA_POR_DEFECTO
+    tabla = obtener_tabla_puntuaciones(temporada)
+    indice = _indices_tablas.get(temporada)
+    normalizador = _normalizadores.get(temporada)
+    indice = indice if indice is not None else IndiceNombres(tabla.index)
+
+    filas = []
+    for jugador, resultado in zip(jugadores, indice.resolver_lote(jugadores)):
+        if resultado["estado"] in (RESOLUCION_AMBIGUA, RESOLUCION_NO_ENCONTRADA):
+            logger.warning(describir_resolucion(jugador, resultado))
+            filas.append(None)
+        else:
+            filas.append(tabla.iloc[resultado["posicion"]])
+
+    encontrados = [i for i, fila in enumerate(filas) if fila is not None]
+    puntuaciones = np.zeros(len(jugadores))
+    if encontrados and normalizador is not None:
+        puntuaciones[encontrados] = normalizador.normalizar_lote([filas[i]["puntuacion_bruta"] for i in encontrados],
+                                                                 [filas[i]["position_group"] for i in encontrados],
+                                                                 metodo=metodo, escala=10)
+    return puntuaciones
+
+
+def calcular_ranking_jugadores(flpr_colectiva, jugadores, temporada=None, metodo=METODO_PERCENTIL, pesos=None, k=None,
+                               cuantificador=None):
+    """
+    Calcula el ranking de los jugadores combinando la dominancia en la FLPR colectiva (QGDD y
+    QGNDD) con su puntuación estadística (ver calcular_ranking_agregado).
+
+    Las puntuaciones estadísticas se consultan en la tabla precalculada de la temporada y se
+    normalizan a [0, 10] respecto a todos los jugadores de su grupo de posición (por defecto, por
+    percentil), de modo que son comparables aunque la lista de candidatos sea corta. Los jugadores
+    con nombre ambiguo o no encontrado se registran en el log y puntúan 0.
+
+    Args:
+        flpr_colectiva (np.ndarray): FLPR colectiva (n x n)
+        jugadores (list): Nombres de los jugadores, en el orden de la FLPR
+        temporada (str, optional): Temporada de las estadísticas. Por defecto, la más reciente.
+        metodo (str, optional): Método de normalización de las estadísticas (ver NormalizadorGrupos)
+        pesos (dict, optional): Pesos de los componentes "qgdd", "qgndd" y "estadisticas"
+        k (int, optional): Devolver solo los k mejores jugadores
+        cuantificador (str | tuple, optional): Cuantificador lingüístico de los grados de dominancia
+
+    Returns:
+        list[dict]: Un diccionario por jugador, de mejor a peor, con las claves posicion, jugador,
+        qgdd, qgndd, puntuacion_estadisticas y puntuacion_final.
+    """
+    # Importación diferida: agregacion_ranking usa las puntuaciones de este módulo
+    from src.core.agregacion_ranking import calcular_ranking_agregado, CUANTIFICADOR_POR_DEFECTO
 
-    return puntuaciones_finales
\ No newline at end of file
+    return calcular_ranking_agregado(flpr_colectiva, jugadores, pesos=pesos, k=k,
+                                     cuantificador=cuantificador or CUANTIFICADOR_POR_DEFECTO,
+                                     temporada=temporada, metodo=metodo)
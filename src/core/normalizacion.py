@@ -0,0 +1,156 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+METODO_PERCENTIL = "percentil"
+METODO_MINMAX = "minmax"
+METODO_ZSCORE = "zscore"
+METODO_TEORICO = "teorico"
+METODOS_NORMALIZACION = (METODO_PERCENTIL, METODO_MINMAX, METODO_ZSCORE, METODO_TEORICO)
+
+GRUPO_GLOBAL = "__global__"
+# Grupos con menos jugadores se normalizan con la distribución de toda la temporada
+MINIMO_JUGADORES_GRUPO = 5
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+class NormalizadorGrupos:
+    """
+    Normaliza puntuaciones estadísticas respecto a los jugadores del mismo grupo de posición.
+
+    Al construirse guarda, para cada grupo, las puntuaciones ordenadas (tabla de percentiles), el
+    mínimo y máximo y la media y desviación típica. Normalizar una puntuación es después una
+    búsqueda binaria O(log n) o una operación aritmética, sin volver a recorrer los datos.
+
+    Métodos:
+    - percentil: fracción de jugadores del grupo con puntuación menor o igual.
+    - minmax: posición entre el mínimo y el máximo del grupo.
+    - zscore: puntuación tipificada, llevada a [0, 1] con la función de distribución normal.
+    - teorico: rango fijo [0, 100], como normalizar_puntuacion_individual.
+    """
+
+    def __init__(self, puntuaciones, grupos):
+        """
+        Args:
+            puntuaciones: Puntuaciones brutas de todos los jugadores de la temporada
+            grupos: Grupo de posición de cada jugador
+        """
+        puntuaciones = pd.to_numeric(pd.Series(np.asarray(puntuaciones)), errors="coerce")
+        grupos = pd.Series(np.asarray(grupos, dtype=object)).fillna(GRUPO_GLOBAL)
+        validas = puntuaciones.notna()
+        if not validas.any():
+            raise ValueError("No hay puntuaciones para construir la normalización")
+
+        self.ordenadas = {GRUPO_GLOBAL: np.sort(puntuaciones[validas].to_numpy(dtype=float))}
+        for grupo, valores in puntuaciones[validas].groupby(grupos[validas]):
+            if len(valores) >= MINIMO_JUGADORES_GRUPO:
+                self.ordenadas[grupo] = np.sort(valores.to_numpy(dtype=float))
+
+        self.parametros = {}
+        for grupo, valores in self.ordenadas.items():
+            self.parametros[grupo] = {
+                "n": len(valores),
+                "min": valores[0],
+                "max": valores[-1],
+                "media": valores.mean(),
+                "desviacion": valores.std(),
+            }
+
+    @classmethod
+    def desde_tabla(cls, tabla):
+        """Construye el normalizador a partir de una tabla de puntuaciones (ver construir_tabla_puntuaciones)."""
+        return cls(tabla["puntuacion_bruta"], tabla["position_group"])
+
+    def grupo_efectivo(self, grupo):
+        return grupo if grupo in self.ordenadas else GRUPO_GLOBAL
+
+    def _normalizar_grupo(self, valores, grupo, metodo):
+        ordenadas = self.ordenadas[grupo]
+        parametros = self.parametros[grupo]
+
+        if metodo == METODO_PERCENTIL:
+            return np.searchsorted(ordenadas, valores, side="right") / len(ordenadas)
+        if metodo == METODO_MINMAX:
+            rango = parametros["max"] - parametros["min"]
+            return (valores - parametros["min"]) / rango if rango > 0 else np.full(len(valores), 0.5)
+        if metodo == METODO_ZSCORE:
+            if parametros["desviacion"] <= 0:
+                return np.full(len(valores), 0.5)
+            z = (valores - parametros["media"]) / parametros["desviacion"]
+            return 0.5 * (1 + _erf(z / math.sqrt(2)).astype(float))
+        return valores / 100
+
+    def normalizar_lote(self, puntuaciones, grupos, metodo=METODO_PERCENTIL, escala=10):
+        """
+        Normaliza varias puntuaciones, cada una respecto a su grupo de posición.
+
+        Args:
+            puntuaciones: Puntuaciones brutas
+            grupos: Grupo de posición de cada puntuación. Los grupos desconocidos o con pocos
+                    jugadores usan la distribución global de la temporada.
+            metodo: Uno de METODOS_NORMALIZACION
+            escala: Valor máximo de la escala de salida
+
+        Returns:
+            np.ndarray: Puntuaciones normalizadas en [0, escala]
+        """
+        if metodo not in METODOS_NORMALIZACION:
+            raise ValueError(f"Método de normalización no válido: {metodo}. Opciones: {', '.join(METODOS_NORMALIZACION)}")
+
+        valores = np.asarray(puntuaciones, dtype=float)
+        grupos = np.asarray([self.grupo_efectivo(grupo) for grupo in grupos], dtype=object)
+        if len(valores) != len(grupos):
+            raise ValueError("Debe haber un grupo por cada puntuación")
+
+        normalizadas = np.zeros(len(valores))
+        for grupo in set(grupos):
+            mascara = grupos == grupo
+            normalizadas[mascara] = self._normalizar_grupo(valores[mascara], grupo, metodo)
+
+        return np.clip(normalizadas, 0, 1) * escala
+
+    def normalizar(self, puntuacion, grupo, metodo=METODO_PERCENTIL, escala=10):
+        """Normaliza una sola puntuación respecto a su grupo de posición."""
+        return float(self.normalizar_lote([puntuacion], [grupo], metodo, escala)[0])
+
+
+def percentiles_por_grupo(referencia, grupos_referencia, valores, grupos, escala=100):
+    """
+    Percentil de cada valor de una matriz (jugadores x estadísticas) respecto a los jugadores de
+    referencia de su mismo grupo de posición, para todas las estadísticas a la vez.
+
+    Args:
+        referencia: Matriz (n x m) con las estadísticas de todos los jugadores de la temporada
+        grupos_referencia: Grupo de posición de cada fila de `referencia`
+        valores: Matriz (p x m) con las estadísticas de los jugadores a comparar
+        grupos: Grupo de posición de cada fila de `valores`. Los grupos desconocidos o con pocos
+                jugadores usan toda la referencia.
+        escala: Valor máximo de la escala de salida
+
+    Returns:
+        np.ndarray: Matriz (p x m) con la fracción de jugadores del grupo con un valor menor o igual,
+        en [0, escala]. Los valores ausentes (o sin referencia) dan NaN.
+    """
+    referencia = np.asarray(referencia, dtype=float)
+    valores = np.asarray(valores, dtype=float)
+    grupos_referencia = pd.Series(np.asarray(grupos_referencia, dtype=object)).fillna(GRUPO_GLOBAL)
+    grupos = pd.Series(np.asarray(grupos, dtype=object)).fillna(GRUPO_GLOBAL).to_numpy()
+    conteos = grupos_referencia.value_counts()
+
+    percentiles = np.full(valores.shape, np.nan)
+    for grupo in pd.unique(grupos):
+        filas = grupos == grupo
+        if conteos.get(grupo, 0) >= MINIMO_JUGADORES_GRUPO:
+            filas_referencia = referencia[(grupos_referencia == grupo).to_numpy()]
+        else:
+            filas_referencia = referencia
+
+        # Comparación (referencia x jugadores x estadísticas); los NaN de la referencia no cuentan
+        menores_o_iguales = (filas_referencia[:, None, :] <= valores[filas][None, :, :]).sum(axis=0)
+        validos = (~np.isnan(filas_referencia)).sum(axis=0)
+        percentiles[filas] = np.where(validos > 0, menores_o_iguales / np.maximum(validos, 1), np.nan) * escala
+
+    percentiles[np.isnan(valores)] = np.nan
+    return percentiles
@@ -0,0 +1,141 @@
+import json
+import math
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.data_management.data_loader import TEMPORADA_ACTUAL, COLUMNA_VALOR_MERCADO, CAMPO_TEMPORADA, clave_temporada
+from src.core.logica_ranking import PESOS_POSICION, POSICION_POR_DEFECTO
+
+# Columnas que identifican al jugador y clave corta con la que se envían a los agentes
+CLAVES_IDENTIFICACION = {
+    "Player": "jugador",
+    "Squad": "equipo",
+    "Comp": "liga",
+    "Pos": "pos",
+    "position_group": "grupo",
+    "Age_Years": "edad",
+    "90s": "90s",
+    COLUMNA_VALOR_MERCADO: "valor",
+}
+DECIMALES_RESUMEN = 2
+MAX_RESUMENES_EN_CACHE = 4096
+
+_resumenes = OrderedDict()
+_cerrojo_resumenes = threading.Lock()
+
+
+def columnas_relevantes(columnas, grupo=None, criterios=None):
+    """
+    Estadísticas que se envían de un jugador: las pedidas en `criterios` o, si no se piden, las que
+    puntúan en su grupo de posición (PESOS_POSICION).
+
+    Args:
+        columnas: Columnas disponibles en los datos
+        grupo (str, optional): Grupo de posición del jugador
+        criterios (list, optional): Estadísticas pedidas. Se buscan sin distinguir mayúsculas y las
+                                    que no existen se ignoran.
+
+    Returns:
+        tuple: Columnas de estadísticas, en el orden pedido
+    """
+    por_minusculas = {str(columna).lower(): columna for columna in columnas}
+    if criterios:
+        pedidas = [por_minusculas.get(str(criterio).strip().lower()) for criterio in criterios]
+    else:
+        pedidas = list(PESOS_POSICION.get(grupo, PESOS_POSICION[POSICION_POR_DEFECTO]))
+        pedidas = [columna for columna in pedidas if columna in por_minusculas.values()]
+
+    return tuple(dict.fromkeys(columna for columna in pedidas
+                               if columna is not None and columna not in CLAVES_IDENTIFICACION
+                               and columna not in (CAMPO_TEMPORADA, "Season")))
+
+
+def valor_compacto(valor):
+    """Redondea los decimales y descarta los valores ausentes; los decimales enteros pasan a int."""
+    if valor is None:
+        return None
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    if isinstance(valor, float):
+        if math.isnan(valor):
+            return None
+        valor = round(valor, DECIMALES_RESUMEN)
+        return int(valor) if valor.is_integer() else valor
+    return valor if isinstance(valor, (int, str, bool)) else str(valor)
+
+
+def temporada_fila(fila, temporada=None):
+    """
+    Temporada de la fila de un jugador: la de su campo `temporada` (MongoDB) o `Season` (CSV) y, si
+    no tiene ninguno, la indicada o la actual.
+    """
+    for campo in (CAMPO_TEMPORADA, "Season"):
+        valor = fila.get(campo)
+        if valor is not None and pd.notna(valor):
+            return clave_temporada(valor)
+    return clave_temporada(temporada) or TEMPORADA_ACTUAL
+
+
+def resumir_jugador(fila, temporada=None, criterios=None):
+    """
+    Serializa la fila de un jugador en JSON compacto: identificación con claves cortas y solo las
+    estadísticas relevantes (ver columnas_relevantes), redondeadas y sin sangría.
+
+    La temporada se toma de la propia fila (ver temporada_fila) y se incluye en el resumen. Los
+    resúmenes se guardan por (temporada, jugador, equipo, columnas), así que repetir una consulta no
+    vuelve a recorrer ni a serializar la fila.
+
+    Args:
+        fila (pd.Series): Fila del jugador
+        temporada (str, optional): Temporada de los datos si la fila no la incluye. Por defecto, la actual.
+        criterios (list, optional): Estadísticas pedidas
+
+    Returns:
+        str: Objeto JSON del jugador
+    """
+    temporada = temporada_fila(fila, temporada)
+    columnas = columnas_relevantes(fila.index, fila.get("position_group"), criterios)
+    clave = (temporada, fila.get("Player"), fila.get("Squad"), columnas)
+
+    with _cerrojo_resumenes:
+        if clave in _resumenes:
+            _resumenes.move_to_end(clave)
+            return _resumenes[clave]
+
+    resumen = {"temporada": temporada}
+    for columna, nombre in CLAVES_IDENTIFICACION.items():
+        if columna in fila.index:
+            resumen[nombre] = valor_compacto(fila[columna])
+    estadisticas = {columna: valor_compacto(fila[columna]) for columna in columnas}
+    resumen["stats"] = {columna: valor for columna, valor in estadisticas.items() if valor is not None}
+    resumen = {nombre: valor for nombre, valor in resumen.items() if valor is not None}
+
+    serializado = json.dumps(resumen, ensure_ascii=False, separators=(",", ":"))
+    with _cerrojo_resumenes:
+        _resumenes[clave] = serializado
+        if len(_resumenes) > MAX_RESUMENES_EN_CACHE:
+            _resumenes.popitem(last=False)
+    return serializado
+
+
+def componer_respuesta(partes):
+    """
+    Une en un objeto JSON compacto las respuestas de varios jugadores sin volver a serializarlas.
+
+    Args:
+        partes (dict): Nombre pedido -> texto JSON (un resumen de resumir_jugador o un mensaje
+                       serializado con mensaje_json)
+    """
+    return "{" + ",".join(f"{mensaje_json(str(jugador))}:{parte}" for jugador, parte in partes.items()) + "}"
+
+
+def mensaje_json(mensaje):
+    return json.dumps(mensaje, ensure_ascii=False)
+
+
+def invalidar_cache_resumenes():
+    """Descarta los resúmenes guardados, por ejemplo después de migrar nuevos datos."""
+    with _cerrojo_resumenes:
+        _resumenes.clear()
@@ -0,0 +1,243 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data_management.data_loader import (cargar_estadisticas_jugadores, clave_temporada, TEMPORADAS,
+                                             TEMPORADA_ACTUAL, COLUMNA_VALOR_MERCADO, GRUPOS_POSICION)
+from src.data_management.indice_nombres import (obtener_indice_nombres, describir_resolucion, RESOLUCION_AMBIGUA,
+                                                RESOLUCION_NO_ENCONTRADA)
+from src.core.logica_ranking import preparar_estadisticas, PESOS_POSICION, ESTADISTICAS_PONDERADAS
+from src.core.agregacion_ranking import indices_top_k
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+logger = logging.getLogger(__name__)
+
+# Rasgos con los que se compara a los jugadores de cada grupo: las estadísticas que puntúan en su posición
+ESTADISTICAS_SIMILITUD = {grupo: list(PESOS_POSICION[grupo]) for grupo in GRUPOS_POSICION}
+COLUMNAS_SIMILITUD = list(dict.fromkeys(["Player", "normalized_name", "Squad", "position_group", "90s", "Age_Years",
+                                         COLUMNA_VALOR_MERCADO, *ESTADISTICAS_PONDERADAS]))
+# Con menos partidos completos las estadísticas por 90 minutos son poco fiables: esos jugadores
+# pueden consultarse, pero no se proponen como similares ni cuentan para tipificar
+MINIMO_90S_SIMILITUD = 3.0
+# Si el filtro de precio y edad deja menos de esta fracción del grupo se recorren directamente los
+# candidatos filtrados en lugar de ampliar la búsqueda en el árbol
+FRACCION_MINIMA_ARBOL = 0.25
+
+
+def _columna_numerica(df, columna):
+    if columna not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[columna], errors="coerce").to_numpy(dtype=float)
+
+
+class IndiceSimilitud:
+    """
+    Índice de similitud entre jugadores del mismo grupo de posición, en varias temporadas.
+
+    Cada jugador se representa con las estadísticas de su grupo (ESTADISTICAS_SIMILITUD) por 90
+    minutos, preparadas como en la puntuación (preparar_estadisticas), tipificadas con la media y
+    desviación del grupo en todas las temporadas y normalizadas a norma 1. Con vectores unitarios la
+    distancia euclídea ordena igual que la similitud coseno (coseno = 1 - d² / 2), así que los k
+    más parecidos se obtienen con un KD-tree por grupo (scipy) o, sin scipy, recorriendo el grupo.
+    """
+
+    def __init__(self, datos, minimo_90s=MINIMO_90S_SIMILITUD):
+        """
+        Args:
+            datos (dict): Temporada -> DataFrame con las estadísticas de todos sus jugadores
+            minimo_90s (float): Partidos completos mínimos para proponer a un jugador como similar
+        """
+        self.datos = {temporada: df.reset_index(drop=True) for temporada, df in datos.items()}
+        self.con_valores = any(COLUMNA_VALOR_MERCADO in df.columns for df in self.datos.values())
+        self.grupos = {}
+        # (temporada, fila) -> (grupo, posición en el grupo)
+        self.ubicaciones = {}
+
+        bloques = {grupo: [] for grupo in GRUPOS_POSICION}
+        for temporada, df in self.datos.items():
+            estadisticas = preparar_estadisticas(df)
+            grupos = (df["position_group"].astype(object).to_numpy() if "position_group" in df.columns
+                      else np.full(len(df), None, dtype=object))
+            for grupo in GRUPOS_POSICION:
+                filas = np.flatnonzero(grupos == grupo)
+                columnas = [ESTADISTICAS_PONDERADAS.index(stat) for stat in ESTADISTICAS_SIMILITUD[grupo]]
+                bloques[grupo].append({
+                    "temporadas": np.full(len(filas), temporada, dtype=object),
+                    "filas": filas,
+                    "estadisticas": estadisticas[np.ix_(filas, columnas)],
+                    "minutos": _columna_numerica(df, "90s")[filas],
+                    "valores": _columna_numerica(df, COLUMNA_VALOR_MERCADO)[filas],
+                    "edades": _columna_numerica(df, "Age_Years")[filas],
+                    "nombres": df["normalized_name"].to_numpy()[filas] if "normalized_name" in df.columns
+                    else df["Player"].astype(str).str.lower().to_numpy()[filas],
+                })
+
+        for grupo, partes in bloques.items():
+            datos_grupo = {clave: np.concatenate([parte[clave] for parte in partes]) for clave in partes[0]}
+            if not len(datos_grupo["filas"]):
+                continue
+
+            elegibles = np.nan_to_num(datos_grupo["minutos"]) >= minimo_90s
+            base = datos_grupo["estadisticas"][elegibles] if elegibles.sum() >= 2 else datos_grupo["estadisticas"]
+            desviacion = base.std(axis=0)
+            tipificadas = (datos_grupo["estadisticas"] - base.mean(axis=0)) / np.where(desviacion > 0, desviacion, 1)
+            normas = np.linalg.norm(tipificadas, axis=1, keepdims=True)
+
+            datos_grupo["vectores"] = tipificadas / np.where(normas > 0, normas, 1)
+            datos_grupo["elegibles"] = elegibles
+            datos_grupo["arbol"] = cKDTree(datos_grupo["vectores"]) if cKDTree is not None else None
+            del datos_grupo["estadisticas"]
+            self.grupos[grupo] = datos_grupo
+
+            for i, (temporada, fila) in enumerate(zip(datos_grupo["temporadas"], datos_grupo["filas"])):
+                self.ubicaciones[(temporada, int(fila))] = (grupo, i)
+
+    def _vecinos(self, datos_grupo, vector, k, mascara):
+        """Los k vectores del grupo más cercanos a `vector` entre los permitidos por `mascara`."""
+        n_validos = int(mascara.sum())
+        if not n_validos:
+            return np.array([], dtype=int), np.array([])
+        n = len(mascara)
+
+        if datos_grupo["arbol"] is not None and n_validos >= FRACCION_MINIMA_ARBOL * n:
+            consulta = min(n, 2 * k + 1)
+            while True:
+                distancias, indices = datos_grupo["arbol"].query(vector, k=consulta)
+                distancias, indices = np.atleast_1d(distancias), np.atleast_1d(indices)
+                validos = mascara[indices]
+                if validos.sum() >= k or consulta == n:
+                    return indices[validos][:k], distancias[validos][:k]
+                consulta = min(n, consulta * 2)
+
+        indices = np.flatnonzero(mascara)
+        distancias = np.linalg.norm(datos_grupo["vectores"][indices] - vector, axis=1)
+        orden = indices_top_k(-distancias, k)
+        return indices[orden], distancias[orden]
+
+    def similares(self, temporada, fila, k=5, precio_max=None, edad_max=None, temporadas=None):
+        """
+        Jugadores más parecidos a uno dado, de su mismo grupo de posición.
+
+        Args:
+            temporada (str): Temporada del jugador de referencia
+            fila (int): Fila del jugador en los datos de esa temporada (`datos[temporada]`)
+            k (int): Número de jugadores a devolver
+            precio_max (float, optional): Valor de mercado máximo en euros. Descarta a los jugadores sin valor.
+            edad_max (float, optional): Edad máxima
+            temporadas (list, optional): Temporadas en las que buscar. Por defecto, todas las del índice.
+
+        Returns:
+            list[tuple]: (temporada, fila, similitud coseno) de cada jugador, de más a menos parecido.
+            El propio jugador no se incluye en ninguna temporada.
+        """
+        if k <= 0:
+            raise ValueError("El número de jugadores similares debe ser positivo")
+        ubicacion = self.ubicaciones.get((clave_temporada(temporada), int(fila)))
+        if ubicacion is None:
+            return []
+
+        grupo, i = ubicacion
+        datos_grupo = self.grupos[grupo]
+        mascara = datos_grupo["elegibles"] & (datos_grupo["nombres"] != datos_grupo["nombres"][i])
+        if precio_max is not None:
+            mascara &= datos_grupo["valores"] <= precio_max
+        if edad_max is not None:
+            mascara &= datos_grupo["edades"] <= edad_max
+        if temporadas:
+            mascara &= np.isin(datos_grupo["temporadas"], [clave_temporada(t) for t in temporadas])
+
+        indices, distancias = self._vecinos(datos_grupo, datos_grupo["vectores"][i], k, mascara)
+        return [(datos_grupo["temporadas"][j], int(datos_grupo["filas"][j]), float(1 - d ** 2 / 2))
+                for j, d in zip(indices, distancias)]
+
+
+_indices_similitud = {}
+
+
+def obtener_indice_similitud(temporadas=TEMPORADAS):
+    """
+    Devuelve el índice de similitud de las temporadas indicadas, construyéndolo solo la primera vez.
+    Las temporadas que no se pueden cargar se omiten.
+
+    Returns:
+        IndiceSimilitud | str: Índice, o el mensaje de error si no se pudo cargar ninguna temporada.
+    """
+    clave = tuple(clave_temporada(temporada) for temporada in temporadas)
+    if clave in _indices_similitud:
+        return _indices_similitud[clave]
+
+    datos = {}
+    for temporada in clave:
+        df = cargar_estadisticas_jugadores(temporada, columns=COLUMNAS_SIMILITUD)
+        if isinstance(df, str):
+            logger.warning(f"No se pudo cargar la temporada {temporada} para el índice de similitud: {df}")
+            continue
+        datos[temporada] = df
+
+    if not datos:
+        return "No se pudo cargar ninguna temporada para buscar jugadores similares"
+
+    _indices_similitud[clave] = IndiceSimilitud(datos)
+    return _indices_similitud[clave]
+
+
+def invalidar_indice_similitud():
+    """Descarta los índices de similitud, por ejemplo después de migrar nuevos datos."""
+    _indices_similitud.clear()
+
+
+def buscar_jugadores_similares(jugador, temporada=None, k=5, precio_max=None, edad_max=None, temporadas=None):
+    """
+    Busca los jugadores que más se parecen a uno dado en todas las temporadas disponibles.
+
+    Args:
+        jugador (str): Nombre del jugador de referencia
+        temporada (str, optional): Temporada del jugador de referencia. Por defecto, la actual.
+        k (int): Número de jugadores a devolver
+        precio_max (float, optional): Valor de mercado máximo en euros
+        edad_max (float, optional): Edad máxima
+        temporadas (list, optional): Temporadas en las que buscar. Por defecto, todas.
+
+    Returns:
+        dict | str: Datos del jugador de referencia (`jugador`, `equipo`, `temporada`, `grupo`, `edad`
+        y `valor`) y lista `similares` con los mismos datos y la `similitud` de cada jugador; o un
+        mensaje si no se puede hacer la búsqueda.
+    """
+    indice = obtener_indice_similitud()
+    if isinstance(indice, str):
+        return indice
+
+    temporada = clave_temporada(temporada) or TEMPORADA_ACTUAL
+    df = indice.datos.get(temporada)
+    if df is None:
+        return f"No hay datos de la temporada {temporada}"
+    if precio_max is not None and not indice.con_valores:
+        return "Los datos no incluyen el valor de mercado de los jugadores; no se puede filtrar por precio."
+
+    resultado = obtener_indice_nombres(df).resolver(jugador)
+    if resultado["estado"] in (RESOLUCION_AMBIGUA, RESOLUCION_NO_ENCONTRADA):
+        return describir_resolucion(jugador, resultado)
+
+    if (temporada, resultado["posicion"]) not in indice.ubicaciones:
+        return f"{jugador}: No tiene un grupo de posición con el que comparar"
+
+    def describir(temporada_jugador, posicion):
+        datos_jugador = indice.datos[temporada_jugador].iloc[posicion]
+        return {
+            "jugador": datos_jugador.get("Player"),
+            "equipo": datos_jugador.get("Squad"),
+            "temporada": temporada_jugador,
+            "grupo": datos_jugador.get("position_group"),
+            "edad": datos_jugador.get("Age_Years"),
+            "valor": datos_jugador.get(COLUMNA_VALOR_MERCADO),
+        }
+
+    similares = [{**describir(temporada_similar, posicion), "similitud": round(similitud, 3)}
+                 for temporada_similar, posicion, similitud in indice.similares(temporada, resultado["posicion"], k,
+                                                                                precio_max, edad_max, temporadas)]
+    return {**describir(temporada, resultado["posicion"]), "similares": similares}
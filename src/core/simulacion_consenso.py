@@ -0,0 +1,214 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from src.core.fuzzy_matrices import (generar_flpr_lote, agregar_flpr_criterios, obtener_conjunto_terminos,
+                                     conjunto_terminos_activo, MODO_AGREGACION_PONDERADO)
+from src.core.logica_consenso import calcular_cr_lote
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# El CR se redondea a 3 decimales, así que un histograma de 1001 casillas guarda su distribución exacta
+CASILLAS_CR = 1001
+
+
+def _resolver_conjunto_simulacion(granularidad):
+    return obtener_conjunto_terminos(granularidad) if granularidad is not None else conjunto_terminos_activo()
+
+
+def calcular_cr_simulaciones(codigos, conjunto, modo=MODO_AGREGACION_PONDERADO):
+    """
+    Calcula el CR de un bloque de simulaciones a partir de las calificaciones codificadas.
+
+    Parámetros:
+    - codigos (np.ndarray): Tensor (simulaciones x expertos x jugadores x criterios) de códigos de términos.
+    - conjunto (TermSet): Conjunto de términos con el que se codificaron las calificaciones.
+    - modo (str): Modo de agregación de los criterios (ver calcular_matrices_flpr).
+
+    Return:
+    - np.ndarray: Vector (simulaciones,) con el CR de cada simulación.
+    """
+    n_simulaciones, n_expertos, n_jugadores, n_criterios = codigos.shape
+    decimales = None if modo == MODO_AGREGACION_PONDERADO else 3
+
+    flprs_criterios = generar_flpr_lote(codigos.reshape(-1, n_jugadores, n_criterios), conjunto, decimales)
+    flprs = agregar_flpr_criterios(flprs_criterios, modo=modo).reshape(n_simulaciones, n_expertos, n_jugadores, n_jugadores)
+    cr, _ = calcular_cr_lote(np.swapaxes(flprs, 0, 1))
+
+    return cr
+
+
+def _revisar_calificaciones(codigos, tasa_revision, rng):
+    """
+    Simula una ronda de discusión: cada calificación se acerca, con probabilidad `tasa_revision`,
+    un término hacia la media del resto de expertos.
+    """
+    n_expertos = codigos.shape[1]
+    codigos_enteros = codigos.astype(np.int16)
+    media_resto = (codigos_enteros.sum(axis=1, keepdims=True) - codigos_enteros) / (n_expertos - 1)
+    paso = np.sign(np.rint(media_resto) - codigos_enteros).astype(np.int16)
+    revisar = rng.random(codigos.shape) < tasa_revision
+
+    return (codigos_enteros + paso * revisar).astype(codigos.dtype)
+
+
+def _simular_bloque(parametros):
+    """
+    Ejecuta un bloque de simulaciones y devuelve solo contadores agregados, de modo que la memoria
+    no crece con el número total de simulaciones.
+    """
+    (n_simulaciones, semilla, n_expertos, n_jugadores, n_criterios, umbrales, max_rondas,
+     tasa_revision, granularidad, modo) = parametros
+    rng = np.random.default_rng(semilla)
+    conjunto = _resolver_conjunto_simulacion(granularidad)
+
+    # Calificaciones iniciales uniformes, como generar_matriz_aleatoria
+    codigos = rng.integers(0, conjunto.granularidad, size=(n_simulaciones, n_expertos, n_jugadores, n_criterios),
+                           dtype=np.int8)
+
+    trayectorias = np.empty((n_simulaciones, max_rondas + 1))
+    trayectorias[:, 0] = calcular_cr_simulaciones(codigos, conjunto, modo)
+    for ronda in range(1, max_rondas + 1):
+        codigos = _revisar_calificaciones(codigos, tasa_revision, rng)
+        trayectorias[:, ronda] = calcular_cr_simulaciones(codigos, conjunto, modo)
+
+    # Primera ronda en la que se alcanza cada umbral (max_rondas + 1 si no se alcanza)
+    alcanzado = trayectorias[:, :, None] >= np.asarray(umbrales)[None, None, :]
+    primera_ronda = np.where(alcanzado.any(axis=1), alcanzado.argmax(axis=1), max_rondas + 1)
+    rondas_convergencia = np.stack([np.bincount(primera_ronda[:, u], minlength=max_rondas + 2)
+                                    for u in range(len(umbrales))])
+
+    milesimas = np.rint(trayectorias * 1000).astype(np.int64)
+    histograma_cr = np.stack([np.bincount(milesimas[:, ronda], minlength=CASILLAS_CR)
+                              for ronda in range(max_rondas + 1)])
+
+    return {
+        "simulaciones": n_simulaciones,
+        "rondas_convergencia": rondas_convergencia,
+        "histograma_cr": histograma_cr,
+    }
+
+
+def _percentil_histograma(histograma, percentil):
+    acumulado = np.cumsum(histograma)
+    return int(np.searchsorted(acumulado, percentil / 100 * acumulado[-1])) / 1000
+
+
+def resumir_simulacion(acumulado, umbrales, max_rondas):
+    """
+    Convierte los contadores acumulados en estadísticas de convergencia.
+
+    Return:
+    - dict: Número de simulaciones, CR medio y percentiles por ronda y, para cada umbral, la
+      fracción de procesos que convergen con cada valor de max_rondas y las rondas medias necesarias.
+    """
+    total = acumulado["simulaciones"]
+    valores_cr = np.arange(CASILLAS_CR) / 1000
+
+    convergencia = {}
+    for u, umbral in enumerate(umbrales):
+        conteos = acumulado["rondas_convergencia"][u]
+        convergidos = conteos[:max_rondas + 1]
+        convergencia[umbral] = {
+            "tasa_por_max_rondas": [round(float(x), 4) for x in np.cumsum(convergidos) / total],
+            "rondas_medias": round(float((convergidos * np.arange(max_rondas + 1)).sum() / convergidos.sum()), 3)
+            if convergidos.sum() else None,
+            "sin_converger": round(float(conteos[max_rondas + 1] / total), 4),
+        }
+
+    cr_por_ronda = []
+    for ronda, histograma in enumerate(acumulado["histograma_cr"]):
+        cr_por_ronda.append({
+            "ronda": ronda,
+            "cr_medio": round(float((histograma * valores_cr).sum() / total), 4),
+            "p5": _percentil_histograma(histograma, 5),
+            "p50": _percentil_histograma(histograma, 50),
+            "p95": _percentil_histograma(histograma, 95),
+        })
+
+    return {"simulaciones": total, "convergencia": convergencia, "cr_por_ronda": cr_por_ronda}
+
+
+def _simular_en_paralelo(bloques, trabajadores):
+    """
+    Reparte los bloques entre varios procesos y devuelve sus resultados según terminan. Como mucho
+    hay dos bloques por proceso pendientes a la vez, de modo que la memoria no depende del número
+    de bloques. Los contadores son enteros, así que el orden en que se suman no cambia el resultado.
+    """
+    with ProcessPoolExecutor(max_workers=trabajadores) as executor:
+        pendientes = set()
+        for bloque in bloques:
+            if len(pendientes) >= 2 * trabajadores:
+                completados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in completados:
+                    yield futuro.result()
+            pendientes.add(executor.submit(_simular_bloque, bloque))
+        for futuro in pendientes:
+            yield futuro.result()
+
+
+def simular_consenso(n_simulaciones, n_expertos=4, n_jugadores=10, n_criterios=4, umbrales=(0.75, 0.8, 0.85, 0.9),
+                     max_rondas=5, tasa_revision=0.3, tamano_bloque=1000, n_procesos=None, semilla=None,
+                     granularidad=None, modo=MODO_AGREGACION_PONDERADO):
+    """
+    Simula sin interacción muchos procesos de consenso con expertos sintéticos para ajustar
+    `consenso_minimo` y `max_rondas`.
+
+    Las simulaciones se procesan en bloques de `tamano_bloque` repartidos entre varios procesos.
+    Cada bloque devuelve solo histogramas, así que la memoria está acotada por el tamaño del bloque
+    y no por el número total de simulaciones. Con la misma semilla el resultado es idéntico
+    independientemente del número de procesos.
+
+    Args:
+        n_simulaciones (int): Número total de procesos de consenso a simular
+        n_expertos (int): Expertos por proceso
+        n_jugadores (int): Jugadores evaluados
+        n_criterios (int): Criterios por jugador
+        umbrales (tuple): Valores de consenso_minimo a evaluar con las mismas simulaciones
+        max_rondas (int): Rondas de discusión simuladas
+        tasa_revision (float): Probabilidad de que un experto acerque una calificación al grupo en cada ronda
+        tamano_bloque (int): Simulaciones por bloque
+        n_procesos (int, optional): Procesos en paralelo. Por defecto, uno por núcleo. 1 para no usar multiproceso.
+        semilla (int, optional): Semilla para reproducir la simulación
+        granularidad (int, optional): Granularidad del conjunto de términos. Por defecto, la configurada.
+        modo (str, optional): Modo de agregación de los criterios
+
+    Returns:
+        dict: Estadísticas de convergencia (ver resumir_simulacion)
+    """
+    if n_simulaciones <= 0 or tamano_bloque <= 0:
+        raise ValueError("El número de simulaciones y el tamaño de bloque deben ser positivos")
+    if n_expertos < 2 or n_jugadores < 2 or n_criterios < 1:
+        raise ValueError("Se necesitan al menos 2 expertos, 2 jugadores y 1 criterio")
+    if not 0 <= tasa_revision <= 1:
+        raise ValueError("La tasa de revisión debe estar entre 0 y 1")
+
+    umbrales = tuple(umbrales)
+    n_bloques = -(-n_simulaciones // tamano_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques)
+    tamanos = [tamano_bloque] * (n_bloques - 1) + [n_simulaciones - tamano_bloque * (n_bloques - 1)]
+    bloques = ((tamano, semilla_bloque, n_expertos, n_jugadores, n_criterios, umbrales, max_rondas,
+                tasa_revision, granularidad, modo) for tamano, semilla_bloque in zip(tamanos, semillas))
+
+    acumulado = {
+        "simulaciones": 0,
+        "rondas_convergencia": np.zeros((len(umbrales), max_rondas + 2), dtype=np.int64),
+        "histograma_cr": np.zeros((max_rondas + 1, CASILLAS_CR), dtype=np.int64),
+    }
+
+    n_procesos = n_procesos or os.cpu_count() or 1
+    if n_procesos == 1 or n_bloques == 1:
+        resultados = map(_simular_bloque, bloques)
+    else:
+        resultados = _simular_en_paralelo(bloques, min(n_procesos, n_bloques))
+
+    for indice, resultado in enumerate(resultados, 1):
+        for clave in acumulado:
+            acumulado[clave] += resultado[clave]
+        if indice % 100 == 0:
+            logger.info(f"Simulados {acumulado['simulaciones']}/{n_simulaciones} procesos de consenso")
+
+    return resumir_simulacion(acumulado, umbrales, max_rondas)
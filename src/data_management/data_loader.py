@@ -1,4 +1,9 @@
 import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 import pandas as pd
 import unidecode
 import logging
@@ -8,70 +13,296 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
-JUGADORES_FBREF = os.path.join(DATA_FOLDER, "fbref_full_stats_2425.csv")
+TEMPORADA_ACTUAL = "2425"
+TEMPORADAS = ("2223", "2324", TEMPORADA_ACTUAL)
+JUGADORES_FBREF = os.path.join(DATA_FOLDER, f"fbref_full_stats_{TEMPORADA_ACTUAL}.csv")
 EXPLICACIONES_ESTADISTICAS = os.path.join(DATA_FOLDER, "fbref_stats_explained.json")
 
+# Caché en memoria de las estadísticas por temporada
+CACHE_TTL_SEGUNDOS = float(os.getenv("CACHE_DATOS_TTL", 600))
+CACHE_MAX_TEMPORADAS = int(os.getenv("CACHE_DATOS_MAX_TEMPORADAS", 4))
+
+_cache_estadisticas = OrderedDict()
+_cerrojo_cache = threading.Lock()
+
+COLUMNA_VALOR_MERCADO = "market_value_in_eur"
+GRUPOS_POSICION = ("GK", "Defender", "Wing-Back", "Defensive-Midfielders", "Central Midfielders",
+                   "Attacking Midfielders", "Forwards")
+FILTROS_ESTADISTICAS = ("season", "position_group", "market_value_min", "market_value_max", "min_90s")
+
+CAMPO_TEMPORADA = "temporada"
+# Clave de `DataFrame.attrs` en la que el cargador guarda la huella de los datos que devuelve
+ATRIBUTO_HUELLA = "huella_datos"
+_PATRON_TEMPORADA = re.compile(r"^\s*(?:\d{2})?(\d{2})\s*[-/]?\s*(?:\d{2})?(\d{2})\s*$")
+
+def clave_temporada(temporada):
+    """
+    Convierte una temporada en cualquiera de sus formatos ("2024-2025", "2024/25", "24/25", "2425")
+    a la clave única que usan los CSV, la caché y MongoDB: "2425".
+    """
+    if temporada is None:
+        return None
+
+    coincidencia = _PATRON_TEMPORADA.match(str(temporada))
+    if not coincidencia or (int(coincidencia.group(1)) + 1) % 100 != int(coincidencia.group(2)):
+        raise ValueError(f"Temporada no válida: {temporada}. Usa, por ejemplo, '2024-2025' o '2425'.")
+    return coincidencia.group(1) + coincidencia.group(2)
+
 def normalizar_nombre(nombre):
     """Normaliza el nombre de un jugador para que se pueda buscar desde la entrada."""
     return unidecode.unidecode(nombre).lower()
 
-def cargar_estadisticas_jugadores(season=None):
+def _clave_filtros(filters):
+    if not filters:
+        return None
+    desconocidos = set(filters) - set(FILTROS_ESTADISTICAS)
+    if desconocidos:
+        raise ValueError(f"Filtros no válidos: {', '.join(sorted(desconocidos))}. "
+                         f"Opciones: {', '.join(FILTROS_ESTADISTICAS)}")
+    return tuple(sorted((clave, tuple(valor) if isinstance(valor, (list, tuple, set)) else valor)
+                        for clave, valor in filters.items() if valor is not None)) or None
+
+def _grupos_posicion(valor):
+    return [valor] if isinstance(valor, str) else list(valor)
+
+def construir_consulta_mongo(season=None, filters=None):
+    """Traduce la temporada y los filtros a una consulta de MongoDB."""
+    filters = dict(filters or {})
+    query = {}
+    if season:
+        query[CAMPO_TEMPORADA] = clave_temporada(season)
+    if filters.get("position_group") is not None:
+        query["position_group"] = {"$in": _grupos_posicion(filters["position_group"])}
+
+    rango_valor = {}
+    if filters.get("market_value_min") is not None:
+        rango_valor["$gte"] = filters["market_value_min"]
+    if filters.get("market_value_max") is not None:
+        rango_valor["$lte"] = filters["market_value_max"]
+    if rango_valor:
+        query[COLUMNA_VALOR_MERCADO] = rango_valor
+
+    if filters.get("min_90s") is not None:
+        query["90s"] = {"$gte": filters["min_90s"]}
+    return query
+
+def construir_proyeccion_mongo(columns=None):
+    """Traduce la lista de columnas a una proyección de MongoDB."""
+    proyeccion = {'_id': 0}
+    for columna in columns or []:
+        proyeccion[columna] = 1
+    return proyeccion
+
+def _columnas_filtros(filters):
+    columnas = []
+    if filters:
+        if filters.get("position_group") is not None:
+            columnas.append("position_group")
+        if filters.get("market_value_min") is not None or filters.get("market_value_max") is not None:
+            columnas.append(COLUMNA_VALOR_MERCADO)
+        if filters.get("min_90s") is not None:
+            columnas.append("90s")
+    return columnas
+
+def aplicar_filtros(df, filters=None, columns=None):
+    """
+    Aplica los filtros y la selección de columnas a un DataFrame ya cargado, con la misma
+    semántica que la consulta de MongoDB: un jugador sin el dato filtrado no cumple el filtro.
+    """
+    filters = dict(filters or {})
+    mascara = pd.Series(True, index=df.index)
+
+    if filters.get("position_group") is not None:
+        if "position_group" in df.columns:
+            mascara &= df["position_group"].isin(_grupos_posicion(filters["position_group"]))
+        else:
+            mascara &= False
+
+    for clave, comparar in (("market_value_min", "ge"), ("market_value_max", "le")):
+        if filters.get(clave) is None:
+            continue
+        if COLUMNA_VALOR_MERCADO not in df.columns:
+            logger.warning(f"Los datos no incluyen la columna {COLUMNA_VALOR_MERCADO}; ningún jugador cumple el filtro {clave}")
+            mascara &= False
+            continue
+        valores = pd.to_numeric(df[COLUMNA_VALOR_MERCADO], errors="coerce")
+        mascara &= getattr(valores, comparar)(filters[clave])
+
+    if filters.get("min_90s") is not None:
+        if "90s" in df.columns:
+            mascara &= pd.to_numeric(df["90s"], errors="coerce") >= filters["min_90s"]
+        else:
+            mascara &= False
+
+    if not mascara.all():
+        df = df[mascara]
+    if columns is not None:
+        df = df[[columna for columna in dict.fromkeys(columns) if columna in df.columns]]
+    return df
+
+def cargar_estadisticas_jugadores(season=None, usar_cache=True, columns=None, filters=None):
     """
     Carga las estadísticas de jugadores desde MongoDB y las devuelve como DataFrame.
     Si la conexión a MongoDB falla, carga los datos desde el CSV como fallback.
 
+    Cada temporada se carga una sola vez y se guarda en una caché en memoria durante
+    CACHE_TTL_SEGUNDOS (como máximo CACHE_MAX_TEMPORADAS cargas). Todas las llamadas comparten
+    los mismos datos: el DataFrame devuelto es una copia superficial que debe tratarse como de solo
+    lectura (con copy-on-write de pandas, modificarlo no altera la caché).
+
+    Con `columns` y `filters` solo se cargan las columnas y jugadores pedidos: se traducen a una
+    proyección y consulta de MongoDB o a una selección de columnas del snapshot. Si la temporada
+    completa ya está en caché, se filtra en memoria.
+
     Args:
-        season (str, optional): Temporada a cargar (e.g., "2223", "2324"). 
+        season (str, optional): Temporada a cargar, en cualquier formato (e.g., "2324", "2023-2024").
                                Si es None, carga todos los datos.
+        usar_cache (bool, optional): Si es False, se ignora la caché y se vuelve a leer el origen.
+        columns (list, optional): Columnas a devolver. Por defecto, todas.
+        filters (dict, optional): Filtros sobre los jugadores: position_group (str o lista),
+                                  market_value_min, market_value_max (euros) y min_90s.
     """
+    filters = dict(filters or {})
+    season = clave_temporada(filters.pop("season", None) or season)
+    clave_filtros = _clave_filtros(filters)
+    columnas = tuple(dict.fromkeys(columns)) if columns is not None else None
+    clave = (season, columnas, clave_filtros)
+
+    if usar_cache:
+        with _cerrojo_cache:
+            for clave_cache in (clave, (season, None, None)):
+                entrada = _cache_estadisticas.get(clave_cache)
+                if entrada is not None and time.monotonic() - entrada[0] < CACHE_TTL_SEGUNDOS:
+                    _cache_estadisticas.move_to_end(clave_cache)
+                    if clave_cache == clave:
+                        return entrada[1].copy(deep=False)
+                    df = aplicar_filtros(entrada[1], filters, columnas).copy(deep=False)
+                    # Las filas filtradas dependen solo de los datos completos y de la consulta
+                    huella = hashlib.sha1(repr((huella_datos(entrada[1]), clave)).encode()).hexdigest()
+                    df.attrs[ATRIBUTO_HUELLA] = huella
+                    return df
+
+    df = _cargar_estadisticas_origen(season, columnas, filters)
+    if isinstance(df, pd.DataFrame):
+        df.attrs[ATRIBUTO_HUELLA] = _huella_contenido(df)
+
+    if usar_cache and isinstance(df, pd.DataFrame) and not df.empty:
+        with _cerrojo_cache:
+            _cache_estadisticas[clave] = (time.monotonic(), df)
+            _cache_estadisticas.move_to_end(clave)
+            while len(_cache_estadisticas) > CACHE_MAX_TEMPORADAS:
+                _cache_estadisticas.popitem(last=False)
+        return df.copy(deep=False)
+
+    return df
+
+def _huella_contenido(df):
+    resumen = hashlib.sha1()
+    for columna in df.columns:
+        try:
+            valores = pd.util.hash_pandas_object(df[columna], index=False)
+        except TypeError:
+            # Valores no hashables (listas, diccionarios de MongoDB): se comparan por su texto
+            valores = pd.util.hash_pandas_object(df[columna].astype(str), index=False)
+        resumen.update(str(columna).encode())
+        resumen.update(valores.to_numpy().tobytes())
+    return resumen.hexdigest()
+
+def huella_datos(df):
+    """
+    Huella del contenido de un DataFrame de estadísticas: cambia si cambian sus columnas, sus filas
+    o el orden de las filas, venga de MongoDB, de un snapshot o de un CSV.
+
+    El cargador la calcula una sola vez por lectura del origen y la guarda en `df.attrs`, así que
+    para sus DataFrames (y sus copias) consultarla es O(1); para el resto se calcula en O(n).
+    pandas conserva `attrs` al derivar un DataFrame: si se cambian sus filas o su orden, hay que
+    descartar la huella (`df.attrs.pop(ATRIBUTO_HUELLA)`) para que se vuelva a calcular.
+    """
+    huella = df.attrs.get(ATRIBUTO_HUELLA)
+    return huella if huella is not None else _huella_contenido(df)
+
+def invalidar_cache_estadisticas(season=None):
+    """
+    Descarta las estadísticas guardadas en caché (de una temporada o de todas), por ejemplo
+    después de migrar nuevos datos a MongoDB.
+    """
+    season = clave_temporada(season)
+    with _cerrojo_cache:
+        if season is None:
+            _cache_estadisticas.clear()
+        else:
+            for clave in [clave for clave in _cache_estadisticas if clave[0] == season]:
+                del _cache_estadisticas[clave]
+
+def _columnas_necesarias(columnas, filters):
+    """Columnas que hay que leer para devolver `columnas` y evaluar los filtros."""
+    if columnas is None:
+        return None
+    necesarias = list(columnas) + _columnas_filtros(filters)
+    if "normalized_name" in necesarias:
+        necesarias.append("Player")
+    return list(dict.fromkeys(necesarias))
+
+def _leer_csv(ruta_csv, columnas=None):
+    if columnas is None:
+        df = pd.read_csv(ruta_csv)
+    else:
+        df = pd.read_csv(ruta_csv, usecols=lambda columna: columna in columnas)
+    if 'Player' in df.columns and 'normalized_name' not in df.columns:
+        df['normalized_name'] = df['Player'].apply(normalizar_nombre)
+    return df
+
+def _leer_temporada(season, columnas=None):
+    """
+    Lee las estadísticas de una temporada de los ficheros locales: primero del snapshot columnar
+    (ver src/data_management/snapshots.py) y, si no existe o está desactualizado, del CSV.
+    Con `columnas`, solo se leen esas columnas.
+    """
+    from src.data_management.snapshots import cargar_snapshot
+
+    df = cargar_snapshot(season, columnas)
+    if df is not None:
+        return df
+
+    return _leer_csv(os.path.join(DATA_FOLDER, f"fbref_full_stats_{season}.csv"), columnas)
+
+def _cargar_desde_ficheros(season=None, columns=None, filters=None):
+    """Carga las estadísticas desde los ficheros locales cuando MongoDB no está disponible."""
+    columnas = _columnas_necesarias(columns, filters)
+
+    if season:
+        csv_file = os.path.join(DATA_FOLDER, f"fbref_full_stats_{season}.csv")
+        if os.path.exists(csv_file):
+            return aplicar_filtros(_leer_temporada(season, columnas), filters, columns)
+
+        return f"No hay datos de la temporada {season}: no está en MongoDB ni existe {os.path.basename(csv_file)}"
+
+    return aplicar_filtros(_leer_temporada(TEMPORADA_ACTUAL, columnas), filters, columns)
+
+def _cargar_estadisticas_origen(season=None, columns=None, filters=None):
+    """Lee las estadísticas de MongoDB o, si no hay datos, de los ficheros locales, sin pasar por la caché."""
     try:
         mongodb = get_mongodb_connection()
 
-        query = {}
-        if season:
-            query = {"Season": season}
+        query = construir_consulta_mongo(season, filters)
+        projection = construir_proyeccion_mongo(columns)
 
-        cursor = mongodb.find(PLAYERS_COLLECTION, query=query, projection={'_id': 0})
+        cursor = mongodb.find(PLAYERS_COLLECTION, query=query, projection=projection)
         df = pd.DataFrame(list(cursor))
 
         if df.empty:
-            logger.info("No data found in MongoDB. Falling back to CSV file.")
-            # Si se especifica una temporada, usar el archivo específico de esa temporada
-            if season:
-                csv_file = os.path.join(DATA_FOLDER, f"fbref_full_stats_{season}.csv")
-                if os.path.exists(csv_file):
-                    df = pd.read_csv(csv_file)
-                else:
-                    logger.info(f"No se encontró el archivo para la temporada {season}. Usando archivo general.")
-                    df = pd.read_csv(JUGADORES_FBREF)
-                    # Filtrar por temporada si existe la columna Season
-                    if 'Season' in df.columns and season:
-                        df = df[df['Season'] == season]
-            else:
-                df = pd.read_csv(JUGADORES_FBREF)
-
-            df['normalized_name'] = df['Player'].apply(normalizar_nombre)
+            # Si la temporada está en MongoDB, los filtros simplemente no tienen resultados
+            if filters and mongodb.find_one(PLAYERS_COLLECTION, {CAMPO_TEMPORADA: season} if season else {}):
+                return df
+            logger.info(f"No hay datos de la temporada {season or 'actual'} en MongoDB. Se usan los ficheros locales.")
+            df = _cargar_desde_ficheros(season, columns, filters)
 
         return df
 
     except Exception as e:
         logger.error(f"Error al cargar datos desde MongoDB: {str(e)}. Intentando cargar desde CSV.")
         try:
-            if season:
-                csv_file = os.path.join(DATA_FOLDER, f"fbref_full_stats_{season}.csv")
-                if os.path.exists(csv_file):
-                    df = pd.read_csv(csv_file)
-                else:
-                    logger.info(f"No se encontró el archivo para la temporada {season}. Usando archivo general.")
-                    df = pd.read_csv(JUGADORES_FBREF)
-
-                    if 'Season' in df.columns and season:
-                        df = df[df['Season'] == season]
-            else:
-                df = pd.read_csv(JUGADORES_FBREF)
-
-            df['normalized_name'] = df['Player'].apply(normalizar_nombre)
-            return df
+            return _cargar_desde_ficheros(season, columns, filters)
         except Exception as csv_error:
             return f"Error al leer los datos: {str(csv_error)}"
 
@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+from src.data_management.data_loader import normalizar_nombre, ATRIBUTO_HUELLA
+
+logger = logging.getLogger(__name__)
+
+UMBRAL_SIMILITUD = 85
+# Diferencia mínima de similitud entre el mejor candidato difuso y el siguiente para no considerarlo ambiguo
+MARGEN_AMBIGUEDAD = 3
+MAX_INDICES_EN_CACHE = 8
+
+RESOLUCION_EXACTA = "exacto"
+RESOLUCION_TOKEN = "token"
+RESOLUCION_DIFUSA = "difuso"
+RESOLUCION_AMBIGUA = "ambiguo"
+RESOLUCION_NO_ENCONTRADA = "no_encontrado"
+
+
+class IndiceNombres:
+    """
+    Índice para resolver nombres de jugadores sobre las filas de una temporada.
+
+    La búsqueda se hace en tres niveles: primero por nombre normalizado exacto (diccionario, O(1)),
+    después por tokens (todos los tokens buscados deben aparecer en el nombre, p. ej. "mbappe" ->
+    "kylian mbappe") y, por último, por similitud difusa. Si varios jugadores distintos encajan
+    igual de bien, el resultado se marca como ambiguo en lugar de elegir uno.
+
+    Para la búsqueda difusa el índice guarda los nombres normalizados en un array contiguo y un
+    índice invertido de trigramas. Solo se comparan los nombres que comparten algún trigrama con
+    la consulta y cuya longitud permite alcanzar el umbral, y varias consultas se resuelven con una
+    única pasada vectorizada (process.cdist) sobre la unión de sus candidatos.
+    """
+
+    def __init__(self, nombres, umbral=UMBRAL_SIMILITUD):
+        """
+        Construye el índice.
+
+        Args:
+            nombres: Nombres de los jugadores en el orden de las filas. Se normalizan con normalizar_nombre.
+            umbral: Similitud mínima (0-100) para aceptar una coincidencia difusa
+        """
+        self.umbral = umbral
+        self.posiciones = {}
+        self.tokens = {}
+
+        for posicion, nombre in enumerate(nombres):
+            nombre = normalizar_nombre(str(nombre)) if pd.notna(nombre) else ""
+            if not nombre or nombre in self.posiciones:
+                # Un jugador con varias filas (traspaso a mitad de temporada) se resuelve a la primera
+                continue
+            self.posiciones[nombre] = posicion
+            for token in nombre.split():
+                self.tokens.setdefault(token, set()).add(nombre)
+
+        self.nombres = list(self.posiciones)
+        self._nombres = np.array(self.nombres, dtype=object)
+        self._longitudes = np.fromiter((len(nombre) for nombre in self.nombres), dtype=np.int32,
+                                       count=len(self.nombres))
+
+        trigramas = {}
+        for i, nombre in enumerate(self.nombres):
+            for trigrama in _trigramas(nombre):
+                trigramas.setdefault(trigrama, []).append(i)
+        self.trigramas = {trigrama: np.array(indices, dtype=np.int32) for trigrama, indices in trigramas.items()}
+
+    @classmethod
+    def desde_dataframe(cls, df, umbral=UMBRAL_SIMILITUD):
+        columna = df["normalized_name"] if "normalized_name" in df.columns else df["Player"]
+        return cls(columna.tolist(), umbral)
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def _resultado(self, estado, nombre=None, candidatos=None, similitud=None):
+        return {
+            "estado": estado,
+            "nombre": nombre,
+            "posicion": self.posiciones.get(nombre) if nombre is not None else None,
+            "candidatos": sorted(candidatos) if candidatos else [],
+            "similitud": similitud,
+        }
+
+    def resolver(self, jugador):
+        """
+        Resuelve un nombre de jugador.
+
+        Returns:
+            dict: Resultado con las claves `estado` (exacto, token, difuso, ambiguo o no_encontrado),
+            `nombre` (nombre normalizado encontrado), `posicion` (posición de su primera fila),
+            `candidatos` (nombres posibles si es ambiguo) y `similitud` (solo en búsquedas difusas).
+        """
+        return self.resolver_lote([jugador])[0]
+
+    def resolver_lote(self, jugadores):
+        """
+        Resuelve varios nombres de jugador a la vez. Los que no se encuentran por nombre exacto ni
+        por tokens se comparan juntos en una sola pasada difusa.
+
+        Returns:
+            list[dict]: Un resultado por jugador, en el mismo orden (ver resolver)
+        """
+        resultados = [None] * len(jugadores)
+        pendientes = {}
+
+        for i, jugador in enumerate(jugadores):
+            consulta = normalizar_nombre(str(jugador).strip())
+            if not consulta:
+                resultados[i] = self._resultado(RESOLUCION_NO_ENCONTRADA)
+                continue
+
+            if consulta in self.posiciones:
+                resultados[i] = self._resultado(RESOLUCION_EXACTA, consulta)
+                continue
+
+            conjuntos = sorted((self.tokens.get(token, set()) for token in consulta.split()), key=len)
+            candidatos = set(conjuntos[0]).intersection(*conjuntos[1:]) if conjuntos else set()
+            if len(candidatos) == 1:
+                resultados[i] = self._resultado(RESOLUCION_TOKEN, candidatos.pop())
+            elif len(candidatos) > 1:
+                resultados[i] = self._resultado(RESOLUCION_AMBIGUA, candidatos=candidatos)
+            else:
+                pendientes.setdefault(consulta, []).append(i)
+
+        if pendientes:
+            for consulta, resultado in zip(pendientes, self._resolver_difusos(list(pendientes))):
+                for i in pendientes[consulta]:
+                    resultados[i] = resultado
+        return resultados
+
+    def _candidatos_difusos(self, consulta):
+        """
+        Índices de los nombres que pueden superar el umbral con la consulta: comparten algún
+        trigrama y su longitud está en el rango en el que fuzz.ratio puede llegar al umbral
+        (ratio <= 200 * min(la, lb) / (la + lb)).
+        """
+        listas = [self.trigramas[trigrama] for trigrama in _trigramas(consulta) if trigrama in self.trigramas]
+        if not listas:
+            return np.array([], dtype=np.int32)
+
+        candidatos = np.unique(np.concatenate(listas))
+        longitud = len(consulta)
+        longitudes = self._longitudes[candidatos]
+        minimas = np.minimum(longitudes, longitud)
+        return candidatos[200 * minimas >= self.umbral * (longitudes + longitud)]
+
+    def _resolver_difusos(self, consultas):
+        candidatos = np.unique(np.concatenate([self._candidatos_difusos(consulta) for consulta in consultas]))
+        if not len(candidatos):
+            return [self._resultado(RESOLUCION_NO_ENCONTRADA) for _ in consultas]
+
+        # Una sola matriz consultas x candidatos; las similitudes bajo el umbral valen 0
+        similitudes = process.cdist(consultas, self._nombres[candidatos].tolist(), scorer=fuzz.ratio,
+                                    score_cutoff=self.umbral, workers=-1 if len(consultas) > 1 else 1)
+
+        resultados = []
+        for fila in similitudes:
+            # Dos mejores candidatos; a igualdad de similitud, el de la primera fila
+            orden = np.lexsort((candidatos, -fila))[:2]
+            coincidencias = [(self.nombres[candidatos[j]], float(fila[j])) for j in orden if fila[j] > 0]
+
+            if not coincidencias:
+                resultados.append(self._resultado(RESOLUCION_NO_ENCONTRADA))
+            elif len(coincidencias) == 2 and coincidencias[0][1] - coincidencias[1][1] < MARGEN_AMBIGUEDAD:
+                resultados.append(self._resultado(RESOLUCION_AMBIGUA, candidatos=[c[0] for c in coincidencias]))
+            else:
+                mejor, similitud = coincidencias[0]
+                resultados.append(self._resultado(RESOLUCION_DIFUSA, mejor, similitud=round(similitud, 1)))
+        return resultados
+
+
+def _trigramas(nombre):
+    """Trigramas del nombre con un espacio a cada lado, para que los nombres cortos también tengan."""
+    nombre = f" {nombre} "
+    return {nombre[i:i + 3] for i in range(len(nombre) - 2)}
+
+
+_indices = OrderedDict()
+_cerrojo_indices = threading.Lock()
+
+
+def obtener_indice_nombres(df, umbral=UMBRAL_SIMILITUD):
+    """
+    Devuelve el índice de nombres de un DataFrame de jugadores, construyéndolo solo la primera vez.
+
+    Los índices se guardan por la huella que el cargador deja en `df.attrs` (ver huella_datos), de
+    modo que consultar un índice ya construido es O(1), varias cargas de los mismos datos comparten
+    el índice y cualquier cambio en los datos genera uno nuevo. Los DataFrames sin huella (no
+    producidos por el cargador) se identifican por el contenido de su columna de nombres, en O(n).
+    """
+    nombre_columna = "normalized_name" if "normalized_name" in df.columns else "Player"
+    columna = df[nombre_columna]
+    huella = df.attrs.get(ATRIBUTO_HUELLA)
+    if huella is None:
+        # La clave depende del orden de las filas: `posicion` es una posición en este DataFrame concreto
+        huella = hashlib.sha1(pd.util.hash_pandas_object(columna, index=False).to_numpy().tobytes()).hexdigest()
+    clave = (len(columna), nombre_columna, huella, umbral)
+
+    with _cerrojo_indices:
+        indice = _indices.get(clave)
+        if indice is not None:
+            _indices.move_to_end(clave)
+            return indice
+
+    # El índice se construye fuera del cerrojo; si otro hilo lo ha guardado antes, se usa el suyo
+    indice = IndiceNombres(columna.tolist(), umbral)
+    with _cerrojo_indices:
+        indice = _indices.setdefault(clave, indice)
+        _indices.move_to_end(clave)
+        while len(_indices) > MAX_INDICES_EN_CACHE:
+            _indices.popitem(last=False)
+    return indice
+
+
+def describir_resolucion(jugador, resultado):
+    """Mensaje legible para un nombre ambiguo o no encontrado."""
+    if resultado["estado"] == RESOLUCION_AMBIGUA:
+        return f"{jugador}: Nombre ambiguo. Posibles jugadores: {', '.join(resultado['candidatos'])}"
+    return f"{jugador}: Datos no disponibles"
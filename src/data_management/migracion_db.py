@@ -1,8 +1,12 @@
 import os
 import pandas as pd
 import json
+import hashlib
 import logging
 import sys
+from datetime import datetime, timezone
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 RUTA_ACTUAL = os.path.abspath(__file__)
 DIR_GESTION_DATOS = os.path.dirname(RUTA_ACTUAL)
@@ -12,6 +16,10 @@ RAIZ_PROYECTO = os.path.dirname(DIR_SRC)
 CARPETA_DATOS = os.path.join(RAIZ_PROYECTO, "data")
 EXPLICACIONES_ESTADISTICAS = os.path.join(CARPETA_DATOS, "fbref_stats_explained.json")
 
+# Documentos por escritura y escrituras en paralelo durante la migración de jugadores
+TAMANO_LOTE_MIGRACION = int(os.getenv("MIGRACION_TAMANO_LOTE", 1000))
+TRABAJADORES_MIGRACION = int(os.getenv("MIGRACION_TRABAJADORES", 4))
+
 # Configuración de logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -21,8 +29,11 @@ if RAIZ_PROYECTO not in sys.path:
     sys.path.insert(0, RAIZ_PROYECTO)
 
 try:
-    from src.database.conexion_mongodb import get_mongodb_connection, PLAYERS_COLLECTION, STATS_EXPLAINED_COLLECTION
-    from src.data_management.data_loader import normalizar_nombre
+    from src.database.conexion_mongodb import (get_mongodb_connection, PLAYERS_COLLECTION, STATS_EXPLAINED_COLLECTION,
+                                               MIGRATION_METADATA_COLLECTION)
+    from pymongo import ReplaceOne, DeleteOne
+    from src.data_management.data_loader import (normalizar_nombre, invalidar_cache_estadisticas, clave_temporada,
+                                                 CAMPO_TEMPORADA)
 except ImportError as e:
     logger.critical(
         f"Error importando módulos necesarios: {e}. Asegúrate que la estructura del proyecto y PYTHONPATH son correctos.")
@@ -30,54 +41,156 @@ except ImportError as e:
         raise
 
 def formatear_temporada(temporada_str):
-    if isinstance(temporada_str, str) and '-' in temporada_str:
-        partes = temporada_str.split('-')
-        if len(partes) == 2 and len(partes[0]) == 4 and len(partes[1]) == 4:
-            return f"{partes[0][2:]}/{partes[1][2:]}"
-    return temporada_str
+    """Clave de temporada que se guarda en MongoDB ("2024-2025" -> "2425"), la misma que usa el cargador."""
+    return clave_temporada(temporada_str)
+
+def leer_lotes_jugadores(ruta_csv, tamano_lote=TAMANO_LOTE_MIGRACION):
+    """
+    Lee un CSV de estadísticas por bloques y devuelve, bloque a bloque, los documentos a insertar
+    con la temporada (extraída de la columna 'Season' de la primera fila) y el nombre normalizado.
+
+    Raises:
+        ValueError: Si el CSV no tiene columna 'Season' o su temporada no es válida.
+    """
+    temporada = None
+    for bloque in pd.read_csv(ruta_csv, chunksize=tamano_lote):
+        if temporada is None:
+            if 'Season' not in bloque.columns:
+                raise ValueError(f"La columna 'Season' no se encuentra en {ruta_csv}")
+            temporada = formatear_temporada(bloque['Season'].iloc[0])
+
+        bloque[CAMPO_TEMPORADA] = temporada
+        bloque['normalized_name'] = bloque['Player'].apply(normalizar_nombre)
+        yield temporada, bloque.to_dict('records')
+
+def hash_archivo(ruta):
+    """Hash SHA-256 del contenido de un fichero, leído por bloques."""
+    resumen = hashlib.sha256()
+    with open(ruta, 'rb') as fichero:
+        for bloque in iter(lambda: fichero.read(1 << 20), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
 
-def migrar_varias_temporadas(rutas_csv):
+def hash_fila(documento):
+    """Hash del contenido de un documento de jugador, para detectar qué filas han cambiado."""
+    # Los enteros leídos como decimales (columnas con huecos) se tratan igual que los enteros, para que
+    # el hash no dependa de cómo se dividió el CSV en bloques
+    valores = {clave: int(valor) if isinstance(valor, float) and valor.is_integer() else valor
+               for clave, valor in documento.items()}
+    contenido = json.dumps(valores, sort_keys=True, default=str)
+    return hashlib.sha1(contenido.encode()).hexdigest()
+
+def clave_fila(documento):
+    """Clave de un jugador dentro de su temporada: (jugador, equipo)."""
+    equipo = documento.get('Squad')
+    return documento.get('Player'), equipo if pd.notna(equipo) else None
+
+def _filtro_fila(temporada, clave):
+    return {CAMPO_TEMPORADA: temporada, 'Player': clave[0], 'Squad': clave[1]}
+
+def _crear_indices_jugadores(coleccion):
+    # Índice compuesto para las consultas por temporada del cargador (temporada y grupo de posición)
+    coleccion.create_index([(CAMPO_TEMPORADA, 1), ('position_group', 1), ('normalized_name', 1)])
+    coleccion.create_index('normalized_name')
+    # Clave de las actualizaciones incrementales
+    coleccion.create_index([(CAMPO_TEMPORADA, 1), ('Player', 1), ('Squad', 1)])
+
+def _guardar_metadatos(mongodb, ruta_csv, temporada, huella, filas):
+    mongodb.get_collection(MIGRATION_METADATA_COLLECTION).replace_one(
+        {'_id': temporada},
+        {'_id': temporada, 'archivo': os.path.basename(ruta_csv), 'hash_archivo': huella, 'filas': filas,
+         'actualizado': datetime.now(timezone.utc)},
+        upsert=True)
+
+def _insertar_en_paralelo(mongodb, coleccion, lotes, trabajadores):
+    """
+    Inserta los lotes con escrituras no ordenadas en varios hilos. Como mucho hay dos lotes por
+    hilo pendientes a la vez, de modo que la memoria no depende del tamaño del CSV.
+    """
+    insertados = 0
+    with ThreadPoolExecutor(max_workers=trabajadores) as executor:
+        pendientes = set()
+        for lote in lotes:
+            if len(pendientes) >= 2 * trabajadores:
+                completados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                insertados += sum(len(futuro.result()) for futuro in completados)
+            pendientes.add(executor.submit(mongodb.insert_many, coleccion, lote, ordered=False))
+        insertados += sum(len(futuro.result()) for futuro in pendientes)
+    return insertados
+
+def migrar_varias_temporadas(rutas_csv, tamano_lote=None, trabajadores=None):
     """
     Migra estadísticas de jugadores de varios CSV a MongoDB,
     extrayendo la temporada de la columna 'Season'.
+
+    Los CSV se leen por bloques de `tamano_lote` filas y se insertan con escrituras no ordenadas en
+    `trabajadores` hilos sobre una colección temporal. Al terminar, la colección temporal se
+    renombra sobre la definitiva en una sola operación, así que los lectores nunca ven la colección
+    vacía o a medio migrar. Si algo falla, la colección definitiva no se modifica.
     """
+    tamano_lote = tamano_lote or TAMANO_LOTE_MIGRACION
+    trabajadores = trabajadores or TRABAJADORES_MIGRACION
+    coleccion_temporal = f"{PLAYERS_COLLECTION}_migracion"
+
     try:
         mongodb = get_mongodb_connection()
-
-        if mongodb.get_collection(PLAYERS_COLLECTION).count_documents({}) > 0:
-            logger.warning(
-                f"La colección {PLAYERS_COLLECTION} ya contiene datos. Eliminando colección...")
-            mongodb.drop_collection(PLAYERS_COLLECTION)
+        # Restos de una migración interrumpida
+        mongodb.drop_collection(coleccion_temporal)
 
         total_docs = 0
+        metadatos = []
         for ruta_csv in rutas_csv:
             logger.info(f"Leyendo estadísticas de {ruta_csv}")
             if not os.path.exists(ruta_csv):
                 logger.error(f"Archivo CSV no encontrado: {ruta_csv}. Se omite este archivo.")
                 continue
 
-            df = pd.read_csv(ruta_csv)
-
-            if 'Season' not in df.columns:
-                logger.error(
-                    f"La columna 'Season' no se encuentra en {ruta_csv}. Se omite el archivo.")
+            lotes = leer_lotes_jugadores(ruta_csv, tamano_lote)
+            try:
+                temporada, primer_lote = next(lotes)
+            except StopIteration:
+                logger.warning(f"El archivo {ruta_csv} está vacío. Se omite el archivo.")
+                continue
+            except ValueError as e:
+                logger.error(f"{e}. Se omite el archivo.")
                 continue
 
-            temporada_raw = df['Season'].iloc[0]
-            temporada_formateada = formatear_temporada(temporada_raw)
+            filas = []
+
+            def registrar_hashes(lote):
+                filas.extend({'clave': list(clave_fila(documento)), 'hash': hash_fila(documento)} for documento in lote)
+                return lote
+
+            resto = (lote for _, lote in lotes)
+            insertados = _insertar_en_paralelo(mongodb, coleccion_temporal,
+                                               map(registrar_hashes, chain([primer_lote], resto)), trabajadores)
+            metadatos.append((ruta_csv, temporada, hash_archivo(ruta_csv), filas))
+            total_docs += insertados
+            logger.info(f"Insertados {insertados} registros de {ruta_csv} para la temporada {temporada}")
+
+        if total_docs == 0:
+            mongodb.drop_collection(coleccion_temporal)
+            logger.warning(f"No se migró ningún registro. La colección {PLAYERS_COLLECTION} no se modifica.")
+            return True
 
-            df['temporada'] = temporada_formateada
-            df['normalized_name'] = df['Player'].apply(normalizar_nombre)
+        _crear_indices_jugadores(mongodb.get_collection(coleccion_temporal))
+        mongodb.rename_collection(coleccion_temporal, PLAYERS_COLLECTION, drop_target=True)
 
-            datos_jugadores = df.to_dict('records')
-            mongodb.insert_many(PLAYERS_COLLECTION, datos_jugadores)
-            total_docs += len(datos_jugadores)
-            logger.info(
-                f"Insertados {len(datos_jugadores)} registros de {ruta_csv} para la temporada {temporada_formateada}")
+        # Hashes de ficheros y filas para las siguientes actualizaciones incrementales
+        mongodb.delete_many(MIGRATION_METADATA_COLLECTION, {})
+        for ruta_csv, temporada, huella, filas in metadatos:
+            _guardar_metadatos(mongodb, ruta_csv, temporada, huella, filas)
 
-        if total_docs > 0:
-            mongodb.get_collection(PLAYERS_COLLECTION).create_index('normalized_name')
-            mongodb.get_collection(PLAYERS_COLLECTION).create_index('temporada')
+        # Los datos han cambiado: la caché, las tablas de puntuaciones y los resúmenes ya no son válidos
+        from src.core.logica_ranking import invalidar_tabla_puntuaciones
+        from src.core.resumen_jugadores import invalidar_cache_resumenes
+        from src.core.indice_mercado import invalidar_indice_mercado
+        from src.core.similitud_jugadores import invalidar_indice_similitud
+        invalidar_cache_estadisticas()
+        invalidar_tabla_puntuaciones()
+        invalidar_cache_resumenes()
+        invalidar_indice_mercado()
+        invalidar_indice_similitud()
         logger.info(f"Se migraron {total_docs} registros de jugadores a MongoDB")
         return True
     except FileNotFoundError as e:
@@ -85,8 +198,95 @@ def migrar_varias_temporadas(rutas_csv):
         return False
     except Exception as e:
         logger.error(f"Error migrando estadísticas de jugadores: {str(e)}")
+        try:
+            get_mongodb_connection().drop_collection(coleccion_temporal)
+        except Exception as e_limpieza:
+            logger.warning(f"No se pudo eliminar la colección temporal {coleccion_temporal}: {e_limpieza}")
         return False
 
+def refrescar_temporadas(rutas_csv, tamano_lote=None):
+    """
+    Actualiza en MongoDB solo lo que ha cambiado en los CSV, sin borrar la colección.
+
+    Para cada CSV se compara su hash con el guardado en la colección de metadatos; si coincide, se
+    omite. Si no, se calcula el hash de cada fila y solo las filas nuevas o modificadas se
+    reemplazan (upsert) con la clave (temporada, jugador, equipo); las filas que ya no están en el
+    CSV se eliminan. Las escrituras se agrupan en bulk_write no ordenados de `tamano_lote` operaciones.
+
+    Returns:
+        dict | None: Por temporada, número de filas actualizadas y eliminadas (None si falla).
+    """
+    tamano_lote = tamano_lote or TAMANO_LOTE_MIGRACION
+    try:
+        mongodb = get_mongodb_connection()
+        coleccion_metadatos = mongodb.get_collection(MIGRATION_METADATA_COLLECTION)
+        _crear_indices_jugadores(mongodb.get_collection(PLAYERS_COLLECTION))
+
+        resumen = {}
+        for ruta_csv in rutas_csv:
+            if not os.path.exists(ruta_csv):
+                logger.error(f"Archivo CSV no encontrado: {ruta_csv}. Se omite este archivo.")
+                continue
+
+            huella = hash_archivo(ruta_csv)
+            anterior = coleccion_metadatos.find_one({'archivo': os.path.basename(ruta_csv)})
+            if anterior and anterior.get('hash_archivo') == huella:
+                logger.info(f"{ruta_csv} no ha cambiado desde la última migración. Se omite.")
+                continue
+
+            hashes_previos = {tuple(fila['clave']): fila['hash'] for fila in (anterior or {}).get('filas', [])}
+            filas, vistas, operaciones = [], set(), []
+            actualizadas = 0
+            temporada = None
+            try:
+                for temporada, lote in leer_lotes_jugadores(ruta_csv, tamano_lote):
+                    for documento in lote:
+                        clave = clave_fila(documento)
+                        huella_fila = hash_fila(documento)
+                        filas.append({'clave': list(clave), 'hash': huella_fila})
+                        vistas.add(clave)
+                        if hashes_previos.get(clave) != huella_fila:
+                            operaciones.append(ReplaceOne(_filtro_fila(temporada, clave), documento, upsert=True))
+                            actualizadas += 1
+
+                        if len(operaciones) >= tamano_lote:
+                            mongodb.bulk_write(PLAYERS_COLLECTION, operaciones, ordered=False)
+                            operaciones = []
+            except ValueError as e:
+                logger.error(f"{e}. Se omite el archivo.")
+                continue
+
+            if temporada is None:
+                logger.warning(f"El archivo {ruta_csv} está vacío. Se omite el archivo.")
+                continue
+
+            eliminadas = [clave for clave in hashes_previos if clave not in vistas]
+            operaciones.extend(DeleteOne(_filtro_fila(temporada, clave)) for clave in eliminadas)
+            for inicio in range(0, len(operaciones), tamano_lote):
+                mongodb.bulk_write(PLAYERS_COLLECTION, operaciones[inicio:inicio + tamano_lote], ordered=False)
+
+            _guardar_metadatos(mongodb, ruta_csv, temporada, huella, filas)
+            resumen[temporada] = {'actualizadas': actualizadas, 'eliminadas': len(eliminadas)}
+            logger.info(f"Temporada {temporada}: {actualizadas} filas actualizadas y {len(eliminadas)} eliminadas")
+
+        if resumen:
+            # Las cargas sin temporada mezclan todas las temporadas, así que se vacía toda la caché;
+            # las tablas de puntuaciones solo se descartan para las temporadas modificadas
+            from src.core.logica_ranking import invalidar_tabla_puntuaciones
+            from src.core.resumen_jugadores import invalidar_cache_resumenes
+            from src.core.indice_mercado import invalidar_indice_mercado
+            from src.core.similitud_jugadores import invalidar_indice_similitud
+            invalidar_cache_estadisticas()
+            invalidar_cache_resumenes()
+            invalidar_indice_similitud()
+            for temporada in resumen:
+                invalidar_tabla_puntuaciones(temporada)
+                invalidar_indice_mercado(temporada)
+        return resumen
+    except Exception as e:
+        logger.error(f"Error actualizando estadísticas de jugadores: {str(e)}")
+        return None
+
 def migrar_explicaciones_estadisticas():
     """
     Migra las explicaciones de las estadísticas de JSON a MongoDB.
@@ -134,9 +334,17 @@ def migrar_explicaciones_estadisticas():
         logger.error(f"Error migrando explicaciones de estadísticas: {str(e)}")
         return False
 
-def ejecutar_migracion():
+def _hay_migracion_previa():
+    mongodb = get_mongodb_connection()
+    return (mongodb.find_one(PLAYERS_COLLECTION) is not None
+            and mongodb.find_one(MIGRATION_METADATA_COLLECTION) is not None)
+
+def ejecutar_migracion(completa=False):
     """
     Ejecuta el proceso completo de migración.
+
+    Si la base de datos ya tiene jugadores migrados con sus hashes, solo se actualizan las filas
+    que han cambiado (ver refrescar_temporadas). Con `completa=True` se recarga todo.
     """
     logger.info("Iniciando la migración de datos a MongoDB")
 
@@ -155,6 +363,9 @@ def ejecutar_migracion():
     if not existen_todos:
         logger.error("Faltan uno o más archivos CSV. Abortando migración de jugadores.")
         exito_jugadores = False
+    elif not completa and _hay_migracion_previa():
+        logger.info("Se actualizan solo las filas modificadas desde la última migración")
+        exito_jugadores = refrescar_temporadas(archivos_csv) is not None
     else:
         exito_jugadores = migrar_varias_temporadas(archivos_csv)
 
@@ -0,0 +1,166 @@
+import os
+import re
+import glob
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data_management.data_loader import DATA_FOLDER, normalizar_nombre
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+CARPETA_SNAPSHOTS = os.path.join(DATA_FOLDER, "snapshots")
+VERSION_SNAPSHOT = 1
+CLAVE_METADATOS = b"moneyball_snapshot"
+
+# Columnas de texto con pocos valores distintos, que se guardan como categorías
+COLUMNAS_CATEGORICAS = ["Squad", "Comp", "position_group", "Nation", "Pos", "Season"]
+
+
+def snapshots_disponibles():
+    """Los snapshots requieren pyarrow; sin él el cargador usa siempre los CSV."""
+    return feather is not None
+
+
+def ruta_snapshot(temporada):
+    return os.path.join(CARPETA_SNAPSHOTS, f"fbref_full_stats_{temporada}.feather")
+
+
+def _huella_csv(ruta_csv):
+    info = os.stat(ruta_csv)
+    return {"csv": os.path.basename(ruta_csv), "tamano": info.st_size, "mtime_ns": info.st_mtime_ns,
+            "version": VERSION_SNAPSHOT}
+
+
+def tipar_estadisticas(df):
+    """
+    Asigna tipos compactos a las estadísticas leídas de un CSV.
+
+    - Las columnas enteras pasan a int32 (sin bajar de ahí, para que sumar columnas no desborde).
+    - Las columnas decimales cuyos valores son todos enteros (conteos con huecos) pasan a float32,
+      que los representa exactamente. El resto se mantiene en float64 para que las puntuaciones
+      calculadas sobre el snapshot sean idénticas a las del CSV.
+    - Las columnas de texto repetitivo (equipo, liga, posición...) pasan a categorías.
+    - Se añade `normalized_name`, para no normalizar los nombres en cada carga.
+    """
+    df = df.copy()
+    for columna in df.columns:
+        serie = df[columna]
+        if pd.api.types.is_integer_dtype(serie):
+            if serie.abs().max() < 2 ** 31:
+                df[columna] = serie.astype(np.int32)
+        elif pd.api.types.is_float_dtype(serie):
+            valores = serie.to_numpy()
+            finitos = valores[np.isfinite(valores)]
+            if np.array_equal(finitos, np.round(finitos)) and (np.abs(finitos) < 2 ** 24).all():
+                df[columna] = serie.astype(np.float32)
+
+    for columna in COLUMNAS_CATEGORICAS:
+        if columna in df.columns:
+            df[columna] = df[columna].astype("category")
+
+    if "Player" in df.columns:
+        df["normalized_name"] = df["Player"].astype(str).apply(normalizar_nombre)
+
+    return df
+
+
+def construir_snapshot(ruta_csv, temporada=None):
+    """
+    Convierte un CSV de estadísticas en un snapshot Feather sin comprimir (apto para memory-map).
+
+    Args:
+        ruta_csv (str): Ruta al CSV `fbref_full_stats_{temporada}.csv`
+        temporada (str, optional): Temporada del snapshot. Por defecto, se extrae del nombre del CSV.
+
+    Returns:
+        str: Ruta del snapshot generado
+    """
+    if not snapshots_disponibles():
+        raise ImportError("Se necesita pyarrow para generar snapshots de estadísticas")
+
+    if temporada is None:
+        coincidencia = re.search(r"fbref_full_stats_(\w+)\.csv$", os.path.basename(ruta_csv))
+        if not coincidencia:
+            raise ValueError(f"No se puede deducir la temporada del fichero {ruta_csv}")
+        temporada = coincidencia.group(1)
+
+    df = tipar_estadisticas(pd.read_csv(ruta_csv))
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    metadatos = dict(tabla.schema.metadata or {})
+    metadatos[CLAVE_METADATOS] = json.dumps(_huella_csv(ruta_csv)).encode()
+
+    os.makedirs(CARPETA_SNAPSHOTS, exist_ok=True)
+    destino = ruta_snapshot(temporada)
+    temporal = destino + ".tmp"
+    feather.write_feather(tabla.replace_schema_metadata(metadatos), temporal, compression="uncompressed")
+    os.replace(temporal, destino)
+
+    logger.info(f"Snapshot de la temporada {temporada} generado en {destino} ({len(df)} jugadores)")
+    return destino
+
+
+def construir_snapshots(carpeta=DATA_FOLDER):
+    """Genera el snapshot de cada `fbref_full_stats_*.csv` de la carpeta de datos."""
+    return [construir_snapshot(ruta_csv) for ruta_csv in sorted(glob.glob(os.path.join(carpeta, "fbref_full_stats_*.csv")))]
+
+
+def _esquema_snapshot(temporada):
+    """Lee solo el esquema (columnas y metadatos) del snapshot; Feather v2 es un fichero Arrow IPC."""
+    with pa.memory_map(ruta_snapshot(temporada)) as fuente:
+        return pa.ipc.open_file(fuente).schema
+
+
+def snapshot_vigente(temporada, ruta_csv=None):
+    """
+    Indica si existe un snapshot de la temporada generado a partir de la versión actual del CSV.
+    Si el CSV no existe, cualquier snapshot legible se considera vigente.
+    """
+    if not snapshots_disponibles() or not os.path.exists(ruta_snapshot(temporada)):
+        return False
+
+    ruta_csv = ruta_csv or os.path.join(DATA_FOLDER, f"fbref_full_stats_{temporada}.csv")
+    if not os.path.exists(ruta_csv):
+        return True
+
+    try:
+        metadatos = _esquema_snapshot(temporada).metadata or {}
+        return json.loads(metadatos.get(CLAVE_METADATOS, b"{}")) == _huella_csv(ruta_csv)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        logger.warning(f"Snapshot de la temporada {temporada} no legible: {e}")
+        return False
+
+
+def cargar_snapshot(temporada, columnas=None):
+    """
+    Carga las estadísticas de una temporada desde su snapshot, con memory-map y leyendo solo las
+    columnas pedidas.
+
+    Args:
+        temporada (str): Temporada (e.g., "2425")
+        columnas (list, optional): Columnas a leer. Las que no existan en el snapshot se ignoran.
+
+    Returns:
+        pd.DataFrame | None: Estadísticas, o None si no hay snapshot vigente (el cargador usará el CSV).
+    """
+    if not snapshot_vigente(temporada):
+        return None
+
+    try:
+        if columnas is not None:
+            disponibles = set(_esquema_snapshot(temporada).names)
+            columnas = [columna for columna in dict.fromkeys(columnas) if columna in disponibles]
+        tabla = feather.read_table(ruta_snapshot(temporada), columns=columnas, memory_map=True)
+        return tabla.to_pandas()
+    except (OSError, ValueError, pa.ArrowException) as e:
+        logger.warning(f"No se pudo leer el snapshot de la temporada {temporada}: {e}. Se usará el CSV.")
+        return None
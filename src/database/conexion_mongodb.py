@@ -13,6 +13,7 @@ DB_NAME = os.getenv('MONGO_DB_NAME', 'Moneyball')
 
 PLAYERS_COLLECTION = 'stats_jugadores'
 STATS_EXPLAINED_COLLECTION = 'stats_explained'
+MIGRATION_METADATA_COLLECTION = 'metadatos_migracion'
 
 class MongoDBConnection:
     """
@@ -57,11 +58,11 @@ class MongoDBConnection:
             logger.error(f"Error insertando el documento: {str(e)}")
             raise
     
-    def insert_many(self, collection_name, documents):
+    def insert_many(self, collection_name, documents, ordered=True):
         """Inserta múltiples documentos en una colección"""
         try:
             collection = self.get_collection(collection_name)
-            result = collection.insert_many(documents)
+            result = collection.insert_many(documents, ordered=ordered)
             return result.inserted_ids
         except Exception as e:
             logger.error(f"Error insertando documentos: {str(e)}")
@@ -94,6 +95,15 @@ class MongoDBConnection:
             logger.error(f"Error updating document: {str(e)}")
             raise
     
+    def bulk_write(self, collection_name, operations, ordered=False):
+        """Ejecuta varias operaciones de escritura en una sola petición"""
+        try:
+            collection = self.get_collection(collection_name)
+            return collection.bulk_write(operations, ordered=ordered)
+        except Exception as e:
+            logger.error(f"Error in bulk write: {str(e)}")
+            raise
+
     def delete_one(self, collection_name, query):
         """Borra un solo documento de una colección"""
         try:
@@ -112,6 +122,15 @@ class MongoDBConnection:
             logger.error(f"Error deleting documents: {str(e)}")
             raise
     
+    def rename_collection(self, collection_name, new_name, drop_target=True):
+        """Renombra una colección de forma atómica, reemplazando la de destino si existe"""
+        try:
+            self.get_collection(collection_name).rename(new_name, dropTarget=drop_target)
+            logger.info(f"Collection {collection_name} renamed to {new_name}")
+        except Exception as e:
+            logger.error(f"Error renaming collection: {str(e)}")
+            raise
+
     def drop_collection(self, collection_name):
         """Borra una colección de la BD"""
         try:
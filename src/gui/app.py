@@ -21,9 +21,14 @@ from src.agentes.analista_qwen import configurar_agente as configurar_agente_qwe
 from src.agentes.analista_gemini import configurar_agente as configurar_agente_gemini
 from src.agentes.analista_groq import configurar_agente as configurar_agente_groq
 from src.data_management.data_loader import cargar_estadisticas_jugadores
-from src.core.logica_ranking import calcular_ranking_jugadores, calcular_ponderacion_estadisticas, normalizar_puntuacion_individual
-from src.core.fuzzy_matrices import generar_flpr, calcular_flpr_comun, calcular_matrices_flpr
-from src.core.logica_consenso import calcular_matriz_similitud, calcular_cr
+from src.core.logica_ranking import (calcular_ranking_jugadores, calcular_ponderacion_estadisticas,
+                                     normalizar_puntuacion_individual, obtener_normalizador)
+from src.core.agregacion_ranking import formatear_posicion_ranking
+from src.core.similitud_jugadores import buscar_jugadores_similares
+from src.core.fuzzy_matrices import calcular_flpr_comun, calcular_matrices_flpr, conjunto_terminos_activo
+from src.core.logica_consenso import (calcular_similitudes_por_pares, calcular_cr, calcular_proximidad_expertos,
+                                     identificar_celdas_retroalimentacion, formatear_celdas_revision, EstadoConsenso,
+                                     validar_matriz_calificaciones)
 from langchain_core.prompts import ChatPromptTemplate
 
 
@@ -222,7 +227,8 @@ class PestañaEvaluacion(ttk.Frame):
         self.max_jugadores = 3
         self.datos_jugadores = {}
 
-        self.valores_linguisticos = ["Muy Bajo", "Bajo", "Medio", "Alto", "Muy Alto"]
+        self.conjunto_terminos = conjunto_terminos_activo()
+        self.valores_linguisticos = self.conjunto_terminos.etiquetas
 
         self.temporadas = ["2022-2023", "2023-2024", "2024-2025"]
         self.temporada_seleccionada = StringVar(value=self.temporadas[-1])
@@ -606,36 +612,61 @@ class PestañaEvaluacion(ttk.Frame):
         pdf.set_font("DejaVu", style="B", size=12)
         pdf.cell(0, 10, "Ranking Final:", ln=True)
         pdf.set_font("DejaVu", size=10)
-        for jugador, puntuacion in (self.resultados_evaluacion.get("ranking") or []):
-            pdf.cell(0, 8, f"{jugador}: {round(puntuacion, 3)}", ln=True)
+        for fila in (self.resultados_evaluacion.get("ranking") or []):
+            pdf.cell(0, 8, formatear_posicion_ranking(fila), ln=True)
 
         pdf.output("evaluacion_resultados.pdf")
 
         messagebox.showinfo("Exportación", "PDF exportado correctamente.")
 
-    def mostrar_distancias_al_consenso(self, flpr_usuario, flpr_agente_qwen, flpr_agente_gemini, flpr_agente_groq, flpr_colectiva):
-        distancias_agentes = []
+    def actualizar_estado_consenso(self, estado_consenso, matrices, jugadores, criterios):
+        """
+        Actualiza el estado incremental del consenso con las nuevas matrices de calificaciones.
 
-        if flpr_usuario is not None and flpr_colectiva is not None:
-            similitud_usuario = np.mean(calcular_matriz_similitud(flpr_usuario, flpr_colectiva))
-            distancia_usuario = 1 - similitud_usuario
-            distancias_agentes.append(("Usuario", distancia_usuario))
+        Si siguen participando los mismos expertos solo se recalculan los jugadores que han
+        cambiado; si no, se reconstruye el estado. Las matrices mal formadas se descartan con
+        una advertencia.
 
-        if flpr_agente_qwen is not None and flpr_colectiva is not None:
-            similitud_qwen = np.mean(calcular_matriz_similitud(flpr_agente_qwen, flpr_colectiva))
-            distancia_qwen = 1 - similitud_qwen
-            distancias_agentes.append(("Agente Qwen", distancia_qwen))
+        Returns:
+            tuple: (estado_consenso, flpr_matrices). El estado es None si hay menos de dos expertos
+            con calificaciones válidas, y las FLPR de los expertos sin ellas son None.
+        """
+        validos = []
+        for nombre, matriz in matrices.items():
+            if not matriz:
+                continue
+            error = validar_matriz_calificaciones(matriz, len(jugadores), criterios)
+            if error:
+                self.agregar_resultado(f"ADVERTENCIA: Matriz de evaluación de '{nombre}' no válida ({error}). Se excluye del consenso.")
+            else:
+                validos.append(nombre)
 
-        if flpr_agente_gemini is not None and flpr_colectiva is not None:
-            similitud_gemini = np.mean(calcular_matriz_similitud(flpr_agente_gemini, flpr_colectiva))
-            distancia_gemini = 1 - similitud_gemini
-            distancias_agentes.append(("Agente Gemini", distancia_gemini))
+        if len(validos) < 2:
+            estado_consenso = None
+        elif estado_consenso is None or estado_consenso.nombres != validos:
+            estado_consenso = EstadoConsenso({nombre: matrices[nombre] for nombre in validos}, criterios)
+        else:
+            for nombre in validos:
+                estado_consenso.actualizar_experto(nombre, matrices[nombre])
 
-        if flpr_agente_groq is not None and flpr_colectiva is not None:
-            similitud_groq = np.mean(calcular_matriz_similitud(flpr_agente_groq, flpr_colectiva))
-            distancia_groq = 1 - similitud_groq
-            distancias_agentes.append(("Agente Groq", distancia_groq))
+        flpr_matrices = {
+            nombre: estado_consenso.flpr(nombre) if estado_consenso is not None and nombre in validos else None
+            for nombre in matrices
+        }
+        return estado_consenso, flpr_matrices
 
+    def mostrar_distancias_al_consenso(self, flpr_usuario, flpr_agente_qwen, flpr_agente_gemini, flpr_agente_groq, flpr_colectiva):
+        if flpr_colectiva is None:
+            return
+
+        expertos = [("Usuario", flpr_usuario), ("Agente Qwen", flpr_agente_qwen),
+                    ("Agente Gemini", flpr_agente_gemini), ("Agente Groq", flpr_agente_groq)]
+        expertos = [(nombre, flpr) for nombre, flpr in expertos if flpr is not None]
+        if not expertos:
+            return
+
+        proximidad = calcular_proximidad_expertos(np.stack([flpr for _, flpr in expertos]), flpr_colectiva)
+        distancias_agentes = [(nombre, 1 - proximidad["global"][i]) for i, (nombre, _) in enumerate(expertos)]
         distancias_agentes.sort(key=lambda x: x[1], reverse=True)
 
         self.agregar_resultado(f"\n=== Ranking de Agentes por Distancia al Consenso ===")
@@ -643,10 +674,19 @@ class PestañaEvaluacion(ttk.Frame):
         for posicion, (agente, distancia) in enumerate(distancias_agentes, 1):
             self.agregar_resultado(f"{posicion}. {agente} - Distancia al consenso: {distancia:.3f}")
 
-        if distancias_agentes:
-            agente_mas_lejano = distancias_agentes[0][0]
-            distancia_maxima = distancias_agentes[0][1]
-            self.agregar_resultado(f"\nEl agente que más influye en reducir el consenso global es: {agente_mas_lejano} (distancia: {distancia_maxima:.3f})")
+        agente_mas_lejano = distancias_agentes[0][0]
+        distancia_maxima = distancias_agentes[0][1]
+        self.agregar_resultado(f"\nEl agente que más influye en reducir el consenso global es: {agente_mas_lejano} (distancia: {distancia_maxima:.3f})")
+
+    def mostrar_celdas_retroalimentacion(self, celdas, jugadores):
+        if not celdas:
+            return
+
+        self.agregar_resultado("\n=== Calificaciones que más alejan el consenso ===")
+        for posicion, celda in enumerate(celdas, 1):
+            self.agregar_resultado(
+                f"{posicion}. {celda['experto']} - {jugadores[celda['jugador_idx']]} ({celda['criterio']}): "
+                f"{celda['actual']} → {celda['sugerido']} (CR +{celda['mejora_cr']:.3f})")
 
     def ejecutar_evaluacion(self, jugadores, criterios, consenso_minimo, max_rondas):
         """Ejecuta el proceso de evaluación en un hilo separado"""
@@ -655,7 +695,7 @@ class PestañaEvaluacion(ttk.Frame):
                 (
                     "system",
                     "Eres un analista de fútbol experto en evaluar jugadores. "
-                    "Tu deber es asignar una calificación lingüística (Muy Bajo, Bajo, Medio, Alto, Muy Alto) a cada jugador dado para cada criterio proporcionado. "
+                    "Tu deber es asignar una calificación lingüística ({terminos}) a cada jugador dado para cada criterio proporcionado. "
                     "No compares los jugadores entre sí; evalúalos individualmente. Usa la herramienta 'analizador_jugadores'."
                     "Responde siempre SOLO en el formato CSV siguiente, no devuelvas ningún texto adicional\n "
 
@@ -671,13 +711,14 @@ class PestañaEvaluacion(ttk.Frame):
                 (
                     "user",
                     "Dado el listado de jugadores: {jugadores} y los criterios: {criterios}, "
-                    "asigna una calificación lingüística (Muy Bajo, Bajo, Medio, Alto, Muy Alto) para cada jugador en cada criterio. "
+                    "asigna una calificación lingüística ({terminos}) para cada jugador en cada criterio. "
                     "Responde usando el formato CSV descrito. No incluyas texto adicional, solo el CSV.\n"
                     "No uses comillas en ninguna parte de la salida, ni incluyas espacios extra entre los campos.\n\n"
                 )
             ])
 
-            prompt = prompt_template.format(jugadores=jugadores, criterios=criterios)
+            prompt = prompt_template.format(jugadores=jugadores, criterios=criterios,
+                                            terminos=self.conjunto_terminos.descripcion())
             max_intentos = 3
 
             def procesar_csv_agente(output_agente, criterios_list):
@@ -886,22 +927,8 @@ class PestañaEvaluacion(ttk.Frame):
                     flpr_matrices[nombre] = None
                     continue
 
-                flpr_matriz_calculada = None
                 if criterios and len(matriz_eval[0]) == len(criterios):
-                    for idx, criterio_item in enumerate(criterios):
-                        calificaciones_criterio = [fila[idx] for fila in matriz_eval if len(fila) > idx]
-
-                        if not calificaciones_criterio:
-                             self.agregar_resultado(f"ADVERTENCIA: No hay calificaciones para el criterio '{criterio_item}' en la matriz de '{nombre}'.")
-                             continue
-
-                        flpr_criterio = generar_flpr(calificaciones_criterio)
-
-                        if flpr_matriz_calculada is None:
-                            flpr_matriz_calculada = flpr_criterio
-                        elif flpr_criterio is not None :
-                            flpr_matriz_calculada = calcular_flpr_comun(flpr_matriz_calculada, flpr_criterio)
-                    flpr_matrices[nombre] = flpr_matriz_calculada
+                    flpr_matrices[nombre] = calcular_matrices_flpr({nombre: matriz_eval}, criterios)[nombre]
                 else:
                     self.agregar_resultado(f"ADVERTENCIA: No se pudo calcular FLPR para '{nombre}' debido a discrepancia en criterios o estructura de matriz.")
                     flpr_matrices[nombre] = None
@@ -938,13 +965,7 @@ class PestañaEvaluacion(ttk.Frame):
                     self.evaluate_button.config(state=tk.NORMAL)
                 return
 
-            matrices_similitud_validas = []
-            if flpr_usuario is not None and flpr_agente_qwen is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_usuario, flpr_agente_qwen))
-            if flpr_usuario is not None and flpr_agente_gemini is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_usuario, flpr_agente_gemini))
-            if flpr_usuario is not None and flpr_agente_groq is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_usuario, flpr_agente_groq))
-            if flpr_agente_qwen is not None and flpr_agente_gemini is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_gemini))
-            if flpr_agente_qwen is not None and flpr_agente_groq is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_groq))
-            if flpr_agente_gemini is not None and flpr_agente_groq is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_agente_gemini, flpr_agente_groq))
+            matrices_similitud_validas = calcular_similitudes_por_pares([flpr_usuario, flpr_agente_qwen, flpr_agente_gemini, flpr_agente_groq])
 
             self.agregar_resultado("\n=== Revisión de Matrices de Agentes ===")
             self.agregar_resultado("Antes de calcular el consenso global, puedes revisar las matrices de los "
@@ -981,15 +1002,9 @@ class PestañaEvaluacion(ttk.Frame):
                 flpr_agente_gemini = flpr_matrices.get("Agente Gemini")
                 flpr_agente_groq = flpr_matrices.get("Agente Groq")
 
-                matrices_similitud_validas = []
-                if flpr_usuario is not None and flpr_agente_qwen is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_usuario, flpr_agente_qwen))
-                if flpr_usuario is not None and flpr_agente_gemini is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_usuario, flpr_agente_gemini))
-                if flpr_usuario is not None and flpr_agente_groq is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_usuario, flpr_agente_groq))
-                if flpr_agente_qwen is not None and flpr_agente_gemini is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_gemini))
-                if flpr_agente_qwen is not None and flpr_agente_groq is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_groq))
-                if flpr_agente_gemini is not None and flpr_agente_groq is not None: matrices_similitud_validas.append(calcular_matriz_similitud(flpr_agente_gemini, flpr_agente_groq))
+                matrices_similitud_validas = calcular_similitudes_por_pares([flpr_usuario, flpr_agente_qwen, flpr_agente_gemini, flpr_agente_groq])
 
-            if not matrices_similitud_validas:
+            if len(matrices_similitud_validas) == 0:
                 self.agregar_resultado("ERROR: No se pudieron calcular matrices de similitud. No se puede determinar el consenso.")
                 cr, consenso_alcanzado = 0, False
             else:
@@ -1008,12 +1023,11 @@ class PestañaEvaluacion(ttk.Frame):
                 self.agregar_resultado("Se ha alcanzado el nivel mínimo de consenso.")
                 if flpr_colectiva is not None:
                     self.agregar_resultado("\n=== Ranking de Jugadores ===")
-                    ranking = calcular_ranking_jugadores(flpr_colectiva, jugadores)
+                    ranking = calcular_ranking_jugadores(flpr_colectiva, jugadores,
+                                                         temporada=self.temporada_seleccionada.get())
                     self.agregar_resultado("TOP JUGADORES (de mejor a peor):")
-                    for posicion, (jugador, puntuacion) in enumerate(ranking, 1):
-                        if puntuacion == 0:
-                            puntuacion = "10.000"
-                        self.agregar_resultado(f"{posicion}. {jugador} - Puntuación: {puntuacion:.3f}")
+                    for fila in ranking:
+                        self.agregar_resultado(formatear_posicion_ranking(fila))
                 else:
                     self.agregar_resultado("No se puede generar ranking debido a FLPR colectiva no válida.")
             else:
@@ -1022,6 +1036,12 @@ class PestañaEvaluacion(ttk.Frame):
 
                 ronda_actual = 1
                 consenso_alcanzado_nuevo = False
+                estado_consenso, _ = self.actualizar_estado_consenso(None, {
+                    "Usuario": matriz_usuario,
+                    "Agente Qwen": matriz_agente_qwen,
+                    "Agente Gemini": matriz_agente_gemini,
+                    "Agente Groq": matriz_agente_groq
+                }, jugadores, criterios)
                 cr_nuevo = cr
                 flpr_usuario_actual = flpr_usuario
                 flpr_agente_qwen_actual = flpr_agente_qwen
@@ -1224,11 +1244,15 @@ class PestañaEvaluacion(ttk.Frame):
                     self.agregar_resultado(f"\n=== Re-evaluación de jugadores (Ronda {ronda_actual}/{max_rondas}) ===")
                     self.agregar_resultado("Los agentes volverán a evaluar a los jugadores basándose en la discusión anterior.")
 
+                    celdas_revision = identificar_celdas_retroalimentacion(estado_consenso) if estado_consenso is not None else []
+                    self.mostrar_celdas_retroalimentacion(celdas_revision, jugadores)
+
                     prompt_reevaluacion_qwen = f"""
                     Basándote en nuestra discusión anterior sobre las valoraciones de los jugadores, 
                     por favor, vuelve a evaluar a los siguientes jugadores: {', '.join(jugadores)} 
                     según los criterios: {', '.join(criterios)}.
 
+                    {formatear_celdas_revision(celdas_revision, jugadores, "Agente Qwen")}
                     Proporciona tu nueva evaluación en el mismo formato CSV que usaste anteriormente.
                     """
 
@@ -1249,6 +1273,7 @@ class PestañaEvaluacion(ttk.Frame):
                     Y el usuario dio estas calificaciones:
                     {calificaciones_usuario_str}
 
+                    {formatear_celdas_revision(celdas_revision, jugadores, "Agente Gemini")}
                     Proporciona tu nueva evaluación en el mismo formato CSV que usaste anteriormente.
                     """
 
@@ -1269,6 +1294,7 @@ class PestañaEvaluacion(ttk.Frame):
                     Y el usuario dio estas calificaciones:
                     {calificaciones_usuario_str}
 
+                    {formatear_celdas_revision(celdas_revision, jugadores, "Agente Groq")}
                     Proporciona tu nueva evaluación en el mismo formato CSV que usaste anteriormente.
                     """
 
@@ -1310,7 +1336,7 @@ class PestañaEvaluacion(ttk.Frame):
                         "Agente Groq": matriz_agente_groq_nueva
                     }
 
-                    flpr_matrices_nuevas = calcular_matrices_flpr(matrices_nuevas, criterios)
+                    estado_consenso, flpr_matrices_nuevas = self.actualizar_estado_consenso(estado_consenso, matrices_nuevas, jugadores, criterios)
 
                     flpr_usuario_nueva = flpr_matrices_nuevas["Usuario"]
                     flpr_agente_qwen_nueva = flpr_matrices_nuevas["Agente Qwen"]
@@ -1322,19 +1348,11 @@ class PestañaEvaluacion(ttk.Frame):
 
                     flpr_colectiva_nueva = calcular_flpr_comun(flpr_agentes_nueva, flpr_usuario_nueva)
 
-                    matrices_similitud_nuevas = []
-                    if flpr_usuario_nueva is not None and flpr_agente_qwen_nueva is not None: matrices_similitud_nuevas.append(calcular_matriz_similitud(flpr_usuario_nueva, flpr_agente_qwen_nueva))
-                    if flpr_usuario_nueva is not None and flpr_agente_gemini_nueva is not None: matrices_similitud_nuevas.append(calcular_matriz_similitud(flpr_usuario_nueva, flpr_agente_gemini_nueva))
-                    if flpr_usuario_nueva is not None and flpr_agente_groq_nueva is not None: matrices_similitud_nuevas.append(calcular_matriz_similitud(flpr_usuario_nueva, flpr_agente_groq_nueva))
-                    if flpr_agente_qwen_nueva is not None and flpr_agente_gemini_nueva is not None: matrices_similitud_nuevas.append(calcular_matriz_similitud(flpr_agente_qwen_nueva, flpr_agente_gemini_nueva))
-                    if flpr_agente_qwen_nueva is not None and flpr_agente_groq_nueva is not None: matrices_similitud_nuevas.append(calcular_matriz_similitud(flpr_agente_qwen_nueva, flpr_agente_groq_nueva))
-                    if flpr_agente_gemini_nueva is not None and flpr_agente_groq_nueva is not None: matrices_similitud_nuevas.append(calcular_matriz_similitud(flpr_agente_gemini_nueva, flpr_agente_groq_nueva))
-
-                    if not matrices_similitud_nuevas:
+                    if estado_consenso is None:
                         self.agregar_resultado("ERROR: No se pudieron calcular matrices de similitud nuevas. No se puede determinar el consenso.")
                         cr_nuevo, consenso_alcanzado_nuevo = 0, False
                     else:
-                        cr_nuevo, consenso_alcanzado_nuevo = calcular_cr(matrices_similitud_nuevas, consenso_minimo)
+                        cr_nuevo, consenso_alcanzado_nuevo = estado_consenso.evaluar(consenso_minimo)
 
                     self.agregar_resultado(f"\n=== Nivel de Consenso (Después de la ronda {ronda_actual} de discusión) ===")
                     self.agregar_resultado(f"Nivel de consenso (CR): {cr_nuevo:.3f}")
@@ -1381,11 +1399,12 @@ class PestañaEvaluacion(ttk.Frame):
 
                     if consenso_alcanzado_nuevo or ronda_actual > max_rondas:
                         self.agregar_resultado("\n=== Ranking de Jugadores (Después de la discusión) ===")
-                        ranking = calcular_ranking_jugadores(flpr_colectiva_nueva, jugadores)
+                        ranking = calcular_ranking_jugadores(flpr_colectiva_nueva, jugadores,
+                                                             temporada=self.temporada_seleccionada.get())
 
                         self.agregar_resultado("TOP JUGADORES (de mejor a peor):")
-                        for posicion, (jugador, puntuacion) in enumerate(ranking, 1):
-                            self.agregar_resultado(f"{posicion}. {jugador} - Puntuación: {puntuacion:.3f}")
+                        for fila in ranking:
+                            self.agregar_resultado(formatear_posicion_ranking(fila))
 
                         if not consenso_alcanzado_nuevo and ronda_actual > max_rondas:
                             self.agregar_resultado(f"\nSe ha alcanzado el número máximo de rondas de discusión ({max_rondas}) sin llegar al consenso mínimo requerido.")
@@ -1404,7 +1423,7 @@ class PestañaEvaluacion(ttk.Frame):
                             matrices_revisadas_final = self.revisar_matrices_agentes(jugadores, criterios, matrices_finales)
 
                             if matrices_revisadas_final is not None:
-                                flpr_matrices_final = calcular_matrices_flpr(matrices_revisadas_final, criterios)
+                                estado_consenso, flpr_matrices_final = self.actualizar_estado_consenso(estado_consenso, matrices_revisadas_final, jugadores, criterios)
 
                                 flpr_usuario_final = flpr_matrices_final["Usuario"]
                                 flpr_agente_qwen_final = flpr_matrices_final["Agente Qwen"]
@@ -1415,19 +1434,11 @@ class PestañaEvaluacion(ttk.Frame):
                                 flpr_agentes_final = calcular_flpr_comun(flpr_agentes_qwen_gemini_final, flpr_agente_groq_final)
                                 flpr_colectiva_final = calcular_flpr_comun(flpr_agentes_final, flpr_usuario_final)
 
-                                matrices_similitud_final = []
-                                if flpr_usuario_final is not None and flpr_agente_qwen_final is not None: matrices_similitud_final.append(calcular_matriz_similitud(flpr_usuario_final, flpr_agente_qwen_final))
-                                if flpr_usuario_final is not None and flpr_agente_gemini_final is not None: matrices_similitud_final.append(calcular_matriz_similitud(flpr_usuario_final, flpr_agente_gemini_final))
-                                if flpr_usuario_final is not None and flpr_agente_groq_final is not None: matrices_similitud_final.append(calcular_matriz_similitud(flpr_usuario_final, flpr_agente_groq_final))
-                                if flpr_agente_qwen_final is not None and flpr_agente_gemini_final is not None: matrices_similitud_final.append(calcular_matriz_similitud(flpr_agente_qwen_final, flpr_agente_gemini_final))
-                                if flpr_agente_qwen_final is not None and flpr_agente_groq_final is not None: matrices_similitud_final.append(calcular_matriz_similitud(flpr_agente_qwen_final, flpr_agente_groq_final))
-                                if flpr_agente_gemini_final is not None and flpr_agente_groq_final is not None: matrices_similitud_final.append(calcular_matriz_similitud(flpr_agente_gemini_final, flpr_agente_groq_final))
-
-                                if not matrices_similitud_final:
+                                if estado_consenso is None:
                                     self.agregar_resultado("ERROR: No se pudieron calcular matrices de similitud finales. No se puede determinar el consenso.")
                                     cr_final, consenso_alcanzado_final = 0, False
                                 else:
-                                    cr_final, consenso_alcanzado_final = calcular_cr(matrices_similitud_final, consenso_minimo)
+                                    cr_final, consenso_alcanzado_final = estado_consenso.evaluar(consenso_minimo)
 
                                 self.agregar_resultado(f"\n=== Nivel de Consenso (Después de modificaciones finales) ===")
                                 self.agregar_resultado(f"Nivel de consenso (CR): {cr_final:.3f}")
@@ -1439,11 +1450,12 @@ class PestañaEvaluacion(ttk.Frame):
                                     self.agregar_resultado("No se ha alcanzado el nivel mínimo de consenso.")
 
                                 self.agregar_resultado("\n=== Ranking de Jugadores (Actualizado) ===")
-                                ranking_final = calcular_ranking_jugadores(flpr_colectiva_final, jugadores)
+                                ranking_final = calcular_ranking_jugadores(flpr_colectiva_final, jugadores,
+                                                                           temporada=self.temporada_seleccionada.get())
 
                                 self.agregar_resultado("TOP JUGADORES (de mejor a peor):")
-                                for posicion, (jugador, puntuacion) in enumerate(ranking_final, 1):
-                                    self.agregar_resultado(f"{posicion}. {jugador} - Puntuación: {puntuacion:.3f}")
+                                for fila in ranking_final:
+                                    self.agregar_resultado(formatear_posicion_ranking(fila))
 
                                 self.agregar_resultado(f"\nSe muestra el ranking con el nivel de consenso actual: {cr_final:.3f}")
                             else:
@@ -1799,6 +1811,31 @@ class PestañaBaseDeDatos(ttk.Frame):
                                            command=self.quitar_jugador_comparar)
         self.boton_quitar_comparar.pack(fill=tk.X, pady=2)
 
+        self.marco_similares = ttk.LabelFrame(marco_izquierdo, text="Jugadores Similares")
+        self.marco_similares.pack(fill=tk.X, padx=5, pady=10, ipady=5)
+
+        marco_filtros_similares = ttk.Frame(self.marco_similares)
+        marco_filtros_similares.pack(fill=tk.X, padx=10, pady=(10, 5))
+
+        ttk.Label(marco_filtros_similares, text="Precio máx. (M€):").pack(side=tk.LEFT, padx=(0, 5))
+        self.var_precio_similares = StringVar()
+        ttk.Entry(marco_filtros_similares, textvariable=self.var_precio_similares, width=6).pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(marco_filtros_similares, text="Edad máx.:").pack(side=tk.LEFT, padx=(0, 5))
+        self.var_edad_similares = StringVar()
+        ttk.Entry(marco_filtros_similares, textvariable=self.var_edad_similares, width=4).pack(side=tk.LEFT, padx=(0, 10))
+
+        self.boton_buscar_similares = ttk.Button(marco_filtros_similares, text="Buscar similares",
+                                                 command=self.buscar_similares)
+        self.boton_buscar_similares.pack(side=tk.RIGHT)
+
+        self.lista_similares = tk.Listbox(self.marco_similares, height=5,
+                                          bg=self.colores["bg_dark_entry"], fg=self.colores["fg_light"],
+                                          selectbackground=self.colores["accent_color"],
+                                          selectforeground=self.colores["fg_white"],
+                                          borderwidth=0, highlightthickness=0, font=("Arial",10))
+        self.lista_similares.pack(fill=tk.X, expand=True, padx=10, pady=(0, 10))
+
         self.marco_detalles = ttk.LabelFrame(marco_derecho, text="Estadísticas del Jugador")
         self.marco_detalles.pack(fill=tk.BOTH, expand=True, padx=5, pady=5, ipady=5, ipadx=5)
 
@@ -1863,6 +1900,39 @@ class PestañaBaseDeDatos(ttk.Frame):
             if self.info_jugador_actual is not None:
                 self.actualizar_grafico_radar()
 
+    def buscar_similares(self):
+        if self.info_jugador_actual is None:
+            messagebox.showinfo("Jugadores similares", "Seleccione primero un jugador.")
+            return
+
+        try:
+            precio_max = float(self.var_precio_similares.get()) * 1000000 if self.var_precio_similares.get().strip() else None
+            edad_max = float(self.var_edad_similares.get()) if self.var_edad_similares.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Error", "El precio y la edad máximos deben ser números.")
+            return
+
+        try:
+            resultado = buscar_jugadores_similares(self.info_jugador_actual.get('Player'),
+                                                   self.info_jugador_actual.get('Season') or self.temporada_seleccionada.get(),
+                                                   k=10, precio_max=precio_max, edad_max=edad_max)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al buscar jugadores similares: {str(e)}")
+            return
+
+        self.lista_similares.delete(0, tk.END)
+        if isinstance(resultado, str):
+            messagebox.showinfo("Jugadores similares", resultado)
+            return
+        if not resultado["similares"]:
+            self.lista_similares.insert(tk.END, "No hay jugadores similares con esos filtros")
+            return
+
+        for similar in resultado["similares"]:
+            temporada = f"20{similar['temporada'][:2]}-20{similar['temporada'][2:]}"
+            self.lista_similares.insert(tk.END, f"{similar['jugador']} ({similar['equipo']}, {temporada}) - "
+                                                f"{similar['similitud'] * 100:.0f}%")
+
     def al_seleccionar_temporada(self, evento):
         nombre_posicion = self.var_posicion.get()
 
@@ -1984,7 +2054,11 @@ class PestañaBaseDeDatos(ttk.Frame):
         añadir_detalle("Temporada", serie_info_jugador.get('Season', 'Desconocida'))
 
         puntuacion = calcular_ponderacion_estadisticas(serie_info_jugador)
-        puntuacion_normalizada = normalizar_puntuacion_individual(puntuacion, min_teorico=0, max_teorico=100, escala=10)
+        normalizador = obtener_normalizador(serie_info_jugador.get('Season') or self.temporada_seleccionada.get())
+        if normalizador is not None:
+            puntuacion_normalizada = normalizador.normalizar(puntuacion, serie_info_jugador.get('position_group'))
+        else:
+            puntuacion_normalizada = normalizar_puntuacion_individual(puntuacion, min_teorico=0, max_teorico=100, escala=10)
         añadir_detalle("Puntuación", round(puntuacion_normalizada, 2), es_puntuacion=True)
 
         self.texto_detalles.insert(tk.END, "\nEstadísticas completas:\n", ("categoria_encabezado",))
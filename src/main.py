@@ -7,6 +7,8 @@ import unicodedata
 import re
 from io import StringIO
 
+import numpy as np
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def normalizar_texto(texto):
@@ -181,34 +183,6 @@ def evaluar_con_agente(agente, prompt, jugadores, criterios, valores_linguistico
 
     return matriz_agente, output_agente
 
-def calcular_matrices_flpr(matrices, criterios):
-    """
-    Calcula las matrices FLPR para cada matriz de calificaciones.
-
-    Args:
-        matrices (dict): Diccionario con las matrices de calificaciones
-        criterios (list): Lista de criterios
-
-    Returns:
-        dict: Diccionario con las matrices FLPR calculadas
-    """
-    flpr_matrices = {}
-
-    for nombre, matriz in matrices.items():
-        flpr_matriz = None
-        for idx, criterio in enumerate(criterios):
-            calificaciones = [fila[idx] for fila in matriz]
-            flpr_criterio = generar_flpr(calificaciones)
-
-            if flpr_matriz is None:
-                flpr_matriz = flpr_criterio
-            else:
-                flpr_matriz = calcular_flpr_comun(flpr_matriz, flpr_criterio)
-
-        flpr_matrices[nombre] = flpr_matriz
-
-    return flpr_matrices
-
 def formatear_calificaciones(jugadores, criterios, matriz, nombre_agente):
     """
     Formatea las calificaciones de un agente en una cadena de texto.
@@ -235,9 +209,11 @@ from src.agentes.analista_qwen import configurar_agente as configurar_agente_qwe
 from src.agentes.analista_gemini import configurar_agente as configurar_agente_gemini
 from src.agentes.analista_groq import configurar_agente as configurar_agente_groq
 from src.utils.logger import logger
-from src.core.fuzzy_matrices import generar_flpr, calcular_flpr_comun
-from src.core.logica_consenso import calcular_matriz_similitud, calcular_cr
+from src.core.fuzzy_matrices import calcular_flpr_comun, calcular_matrices_flpr, conjunto_terminos_activo
+from src.core.logica_consenso import (calcular_similitudes_por_pares, indices_pares_validos, calcular_cr, EstadoConsenso,
+                                      identificar_celdas_retroalimentacion, formatear_celdas_revision)
 from src.core.logica_ranking import calcular_ranking_jugadores
+from src.core.agregacion_ranking import formatear_posicion_ranking
 from langchain_core.prompts import ChatPromptTemplate
 
 # Define the path to the data directory
@@ -266,6 +242,8 @@ def solicitar_lista(prompt_msg: str):
     return [elem.strip() for elem in entrada.split(",") if elem.strip()]
 
 if __name__ == "__main__":
+    conjunto_terminos = conjunto_terminos_activo()
+
     logger.info("Iniciando agentes expertos...")
     agente_qwen = configurar_agente_qwen()
     logger.info("Agente qwen listo.")
@@ -313,7 +291,7 @@ if __name__ == "__main__":
         (
             "system",
             "Eres un analista de fútbol experto en evaluar jugadores. "
-            "Tu deber es asignar una calificación lingüística (Muy Bajo, Bajo, Medio, Alto, Muy Alto) a cada jugador dado para cada criterio proporcionado. "
+            "Tu deber es asignar una calificación lingüística ({terminos}) a cada jugador dado para cada criterio proporcionado. "
             "No compares los jugadores entre sí; evalúalos individualmente. Usa la herramienta 'analizador_jugadores'."
             "Responde siempre SOLO en el formato CSV siguiente, no devuelvas ningún texto adicional\n "
 
@@ -328,14 +306,14 @@ if __name__ == "__main__":
         (
             "user",
             "Dado el listado de jugadores: {jugadores} y los criterios: {criterios}, "
-            "asigna una calificación lingüística (Muy Bajo, Bajo, Medio, Alto, Muy Alto) para cada jugador en cada criterio. "
+            "asigna una calificación lingüística ({terminos}) para cada jugador en cada criterio. "
             "Responde usando el formato CSV descrito. No incluyas texto adicional, solo el CSV.\n"
             "No uses comillas en ninguna parte de la salida, ni incluyas espacios extra entre los campos.\n\n"
         )
     ])
 
-    prompt = prompt_template.format(jugadores=jugadores, criterios=criterios)
-    valores_linguisticos = ["Muy Bajo", "Bajo", "Medio", "Alto", "Muy Alto"]
+    prompt = prompt_template.format(jugadores=jugadores, criterios=criterios, terminos=conjunto_terminos.descripcion())
+    valores_linguisticos = conjunto_terminos.etiquetas
     max_intentos = 3
 
     # Evaluación con los agentes
@@ -348,11 +326,13 @@ if __name__ == "__main__":
     matriz_agente_groq, output_agente_groq = evaluar_con_agente(
         agente_groq, prompt, jugadores, criterios, valores_linguisticos, "Groq", max_intentos)
 
-    print(
-        "\n\nCalifica el desempeño de cada jugador en cada criterio del 1 al 5:")
-    print("1: Muy Bajo, 2: Bajo, 3: Medio, 4: Alto, 5: Muy Alto")
+    terminos_opciones = conjunto_terminos.opciones_numericas()
+    max_opcion = conjunto_terminos.granularidad
+    descripcion_opciones = ", ".join(f"{numero}: {termino}" for numero, termino in terminos_opciones.items())
 
-    terminos_opciones = {1: "Muy Bajo", 2: "Bajo", 3: "Medio", 4: "Alto", 5: "Muy Alto"}
+    print(
+        f"\n\nCalifica el desempeño de cada jugador en cada criterio del 1 al {max_opcion}:")
+    print(descripcion_opciones)
 
     matriz_usuario = []
     for jugador in jugadores:
@@ -360,14 +340,14 @@ if __name__ == "__main__":
         for criterio in criterios:
             while True:
                 try:
-                    calif = int(input(f"¿Qué te parece el desempeño de {jugador} en {criterio}? (1-5): ").strip())
+                    calif = int(input(f"¿Qué te parece el desempeño de {jugador} en {criterio}? (1-{max_opcion}): ").strip())
                     if calif in terminos_opciones:
                         califs_jugador.append(terminos_opciones[calif])
                         break
                     else:
-                        print("Por favor, ingrese un número válido entre 1 y 5.")
+                        print(f"Por favor, ingrese un número válido entre 1 y {max_opcion}.")
                 except ValueError:
-                    print("Por favor, ingrese un número válido entre 1 y 5.")
+                    print(f"Por favor, ingrese un número válido entre 1 y {max_opcion}.")
         matriz_usuario.append(califs_jugador)
 
     # Calcular matrices FLPR para todos los agentes y el usuario
@@ -386,16 +366,16 @@ if __name__ == "__main__":
     flpr_agente_groq = flpr_matrices["Groq"]
 
     print("\n=== Matriz FLPR Final del Usuario ===")
-    print(flpr_usuario)
+    print(np.round(flpr_usuario, 3))
 
     print("\n=== Matriz FLPR Final del Agente qwen ===")
-    print(flpr_agente_qwen)
+    print(np.round(flpr_agente_qwen, 3))
 
     print("\n=== Matriz FLPR Final del Agente Gemini ===")
-    print(flpr_agente_gemini)
+    print(np.round(flpr_agente_gemini, 3))
 
     print("\n=== Matriz FLPR Final del Agente Groq ===")
-    print(flpr_agente_groq)
+    print(np.round(flpr_agente_groq, 3))
 
     # Calcular matriz FLPR colectiva entre los agentes
     flpr_agentes_qwen_gemini = calcular_flpr_comun(flpr_agente_qwen, flpr_agente_gemini)
@@ -408,31 +388,13 @@ if __name__ == "__main__":
     print("\n=== Matriz FLPR Colectiva (Usuario y Agentes) ===")
     print(flpr_colectiva)
 
-    # Calcular matrices de similitud
-    matriz_similitud_qwen_usuario = calcular_matriz_similitud(flpr_usuario, flpr_agente_qwen)
-    matriz_similitud_gemini_usuario = calcular_matriz_similitud(flpr_usuario, flpr_agente_gemini)
-    matriz_similitud_groq_usuario = calcular_matriz_similitud(flpr_usuario, flpr_agente_groq)
-    matriz_similitud_qwen_gemini = calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_gemini)
-    matriz_similitud_qwen_groq = calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_groq)
-    matriz_similitud_gemini_groq = calcular_matriz_similitud(flpr_agente_gemini, flpr_agente_groq)
-
-    print("\n=== Matriz de Similitud (Usuario y Agente qwen) ===")
-    print(matriz_similitud_qwen_usuario)
-
-    print("\n=== Matriz de Similitud (Usuario y Agente Gemini) ===")
-    print(matriz_similitud_gemini_usuario)
-
-    print("\n=== Matriz de Similitud (Usuario y Agente Groq) ===")
-    print(matriz_similitud_groq_usuario)
+    # Calcular matrices de similitud entre todos los pares de expertos
+    nombres_expertos = ["Usuario", "Agente qwen", "Agente Gemini", "Agente Groq"]
+    matrices_similitud = calcular_similitudes_por_pares([flpr_usuario, flpr_agente_qwen, flpr_agente_gemini, flpr_agente_groq])
 
-    print("\n=== Matriz de Similitud (Agente qwen y Agente Gemini) ===")
-    print(matriz_similitud_qwen_gemini)
-
-    print("\n=== Matriz de Similitud (Agente qwen y Agente Groq) ===")
-    print(matriz_similitud_qwen_groq)
-
-    print("\n=== Matriz de Similitud (Agente Gemini y Agente Groq) ===")
-    print(matriz_similitud_gemini_groq)
+    for i, j, matriz_similitud in zip(*indices_pares_validos([True] * len(nombres_expertos)), matrices_similitud):
+        print(f"\n=== Matriz de Similitud ({nombres_expertos[i]} y {nombres_expertos[j]}) ===")
+        print(matriz_similitud)
 
     # Mostrar matrices de términos lingüísticos y permitir al usuario corregir sesgos
     print("\n=== Matrices de Términos Lingüísticos ===")
@@ -509,7 +471,7 @@ if __name__ == "__main__":
                         continue
 
                     print(f"\nValor actual: {matriz_a_modificar[jugador_idx][criterio_idx]}")
-                    print("Valores posibles: Muy Bajo, Bajo, Medio, Alto, Muy Alto")
+                    print(f"Valores posibles: {conjunto_terminos.descripcion()}")
 
                     nuevo_valor = input("Ingresa el nuevo valor: ").strip()
                     if nuevo_valor not in valores_linguisticos:
@@ -530,49 +492,21 @@ if __name__ == "__main__":
 
             # Recalcular la matriz FLPR correspondiente
             if opcion == '1':
-                flpr_usuario = None
-                for idx, criterio in enumerate(criterios):
-                    calificaciones_usuario = [fila[idx] for fila in matriz_usuario]
-                    flpr_usuario_criterio = generar_flpr(calificaciones_usuario)
-                    if flpr_usuario is None:
-                        flpr_usuario = flpr_usuario_criterio
-                    else:
-                        flpr_usuario = calcular_flpr_comun(flpr_usuario, flpr_usuario_criterio)
+                flpr_usuario = calcular_matrices_flpr({"matriz": matriz_usuario}, criterios)["matriz"]
                 print("\n=== Matriz FLPR del Usuario (Actualizada) ===")
-                print(flpr_usuario)
+                print(np.round(flpr_usuario, 3))
             elif opcion == '2':
-                flpr_agente_qwen = None
-                for idx, criterio in enumerate(criterios):
-                    calificaciones_agente_qwen = [fila[idx] for fila in matriz_agente_qwen]
-                    flpr_agente_qwen_criterio = generar_flpr(calificaciones_agente_qwen)
-                    if flpr_agente_qwen is None:
-                        flpr_agente_qwen = flpr_agente_qwen_criterio
-                    else:
-                        flpr_agente_qwen = calcular_flpr_comun(flpr_agente_qwen, flpr_agente_qwen_criterio)
+                flpr_agente_qwen = calcular_matrices_flpr({"matriz": matriz_agente_qwen}, criterios)["matriz"]
                 print("\n=== Matriz FLPR del Agente qwen (Actualizada) ===")
-                print(flpr_agente_qwen)
+                print(np.round(flpr_agente_qwen, 3))
             elif opcion == '3':
-                flpr_agente_gemini = None
-                for idx, criterio in enumerate(criterios):
-                    calificaciones_agente_gemini = [fila[idx] for fila in matriz_agente_gemini]
-                    flpr_agente_gemini_criterio = generar_flpr(calificaciones_agente_gemini)
-                    if flpr_agente_gemini is None:
-                        flpr_agente_gemini = flpr_agente_gemini_criterio
-                    else:
-                        flpr_agente_gemini = calcular_flpr_comun(flpr_agente_gemini, flpr_agente_gemini_criterio)
+                flpr_agente_gemini = calcular_matrices_flpr({"matriz": matriz_agente_gemini}, criterios)["matriz"]
                 print("\n=== Matriz FLPR del Agente Gemini (Actualizada) ===")
-                print(flpr_agente_gemini)
+                print(np.round(flpr_agente_gemini, 3))
             elif opcion == '4':
-                flpr_agente_groq = None
-                for idx, criterio in enumerate(criterios):
-                    calificaciones_agente_groq = [fila[idx] for fila in matriz_agente_groq]
-                    flpr_agente_groq_criterio = generar_flpr(calificaciones_agente_groq)
-                    if flpr_agente_groq is None:
-                        flpr_agente_groq = flpr_agente_groq_criterio
-                    else:
-                        flpr_agente_groq = calcular_flpr_comun(flpr_agente_groq, flpr_agente_groq_criterio)
+                flpr_agente_groq = calcular_matrices_flpr({"matriz": matriz_agente_groq}, criterios)["matriz"]
                 print("\n=== Matriz FLPR del Agente Groq (Actualizada) ===")
-                print(flpr_agente_groq)
+                print(np.round(flpr_agente_groq, 3))
 
         # Recalcular matrices FLPR colectivas
         flpr_agentes_qwen_gemini = calcular_flpr_comun(flpr_agente_qwen, flpr_agente_gemini)
@@ -585,16 +519,9 @@ if __name__ == "__main__":
         print(flpr_colectiva)
 
         # Recalcular matrices de similitud
-        matriz_similitud_qwen_usuario = calcular_matriz_similitud(flpr_usuario, flpr_agente_qwen)
-        matriz_similitud_gemini_usuario = calcular_matriz_similitud(flpr_usuario, flpr_agente_gemini)
-        matriz_similitud_groq_usuario = calcular_matriz_similitud(flpr_usuario, flpr_agente_groq)
-        matriz_similitud_qwen_gemini = calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_gemini)
-        matriz_similitud_qwen_groq = calcular_matriz_similitud(flpr_agente_qwen, flpr_agente_groq)
-        matriz_similitud_gemini_groq = calcular_matriz_similitud(flpr_agente_gemini, flpr_agente_groq)
+        matrices_similitud = calcular_similitudes_por_pares([flpr_usuario, flpr_agente_qwen, flpr_agente_gemini, flpr_agente_groq])
 
     # Calcular nivel de consenso con todas las matrices de similitud
-    matrices_similitud = [matriz_similitud_qwen_usuario, matriz_similitud_gemini_usuario, matriz_similitud_groq_usuario, 
-                          matriz_similitud_qwen_gemini, matriz_similitud_qwen_groq, matriz_similitud_gemini_groq]
     cr, consenso_alcanzado = calcular_cr(matrices_similitud, consenso_minimo)
     print(f"\n=== Nivel de Consenso ===")
     print(f"Nivel de consenso (CR): {cr}")
@@ -631,8 +558,23 @@ if __name__ == "__main__":
         matriz_agente_qwen_actual = matriz_agente_qwen
         matriz_agente_gemini_actual = matriz_agente_gemini
 
+        # Estado incremental del consenso: en cada ronda solo se recalculan los jugadores que cambian
+        estado_consenso = EstadoConsenso({
+            "Usuario": matriz_usuario,
+            "qwen": matriz_agente_qwen,
+            "Gemini": matriz_agente_gemini
+        }, criterios)
+
         # Bucle de rondas de discusión
         while ronda_actual <= max_rondas_discusion and not consenso_alcanzado_nuevo:
+
+            # Señalar las calificaciones cuyo cambio más acercaría al grupo al consenso
+            celdas_revision = identificar_celdas_retroalimentacion(estado_consenso)
+            if celdas_revision:
+                print("\n=== Calificaciones que más alejan el consenso ===")
+                for posicion, celda in enumerate(celdas_revision, 1):
+                    print(f"{posicion}. {celda['experto']} - {jugadores[celda['jugador_idx']]} ({celda['criterio']}): "
+                          f"{celda['actual']} → {celda['sugerido']} (CR +{celda['mejora_cr']:.3f})")
             print(f"\n\n=== RONDA DE DISCUSIÓN {ronda_actual}/{max_rondas_discusion} ===")
 
             # Preparar las cadenas de calificaciones para esta ronda
@@ -743,6 +685,7 @@ if __name__ == "__main__":
             por favor, vuelve a evaluar a los siguientes jugadores: {', '.join(jugadores)} 
             según los criterios: {', '.join(criterios)}.
 
+            {formatear_celdas_revision(celdas_revision, jugadores, "qwen")}
             Proporciona tu nueva evaluación en el mismo formato CSV que usaste anteriormente.
             """
 
@@ -764,6 +707,7 @@ if __name__ == "__main__":
             Y el usuario dio estas calificaciones:
             {calificaciones_usuario_str}
 
+            {formatear_celdas_revision(celdas_revision, jugadores, "Gemini")}
             Proporciona tu nueva evaluación en el mismo formato CSV que usaste anteriormente.
             """
 
@@ -789,7 +733,7 @@ if __name__ == "__main__":
             """
 
             max_intentos_reevaluacion = 3
-            valores_linguisticos = ["Muy Bajo", "Bajo", "Medio", "Alto", "Muy Alto"]
+            valores_linguisticos = conjunto_terminos.etiquetas
 
             # Re-evaluación con el agente qwen
             print(f"\n=== Re-evaluación con el Agente qwen (Ronda {ronda_actual}/{max_rondas_discusion}) ===")
@@ -810,8 +754,8 @@ if __name__ == "__main__":
             # Re-evaluación del usuario
             print(f"\n=== Re-evaluación del usuario (Ronda {ronda_actual}/{max_rondas_discusion}) ===")
             print("Ahora es tu turno de volver a evaluar a los jugadores después de la discusión.")
-            print("Califica el desempeño de cada jugador en cada criterio del 1 al 5:")
-            print("1: Muy Bajo, 2: Bajo, 3: Medio, 4: Alto, 5: Muy Alto")
+            print(f"Califica el desempeño de cada jugador en cada criterio del 1 al {max_opcion}:")
+            print(descripcion_opciones)
 
             matriz_usuario_nueva = []
             for jugador in jugadores:
@@ -819,14 +763,14 @@ if __name__ == "__main__":
                 for criterio in criterios:
                     while True:
                         try:
-                            calif = int(input(f"¿Qué te parece ahora el desempeño de {jugador} en {criterio}? (1-5): ").strip())
+                            calif = int(input(f"¿Qué te parece ahora el desempeño de {jugador} en {criterio}? (1-{max_opcion}): ").strip())
                             if calif in terminos_opciones:
                                 califs_jugador.append(terminos_opciones[calif])
                                 break
                             else:
-                                print("Por favor, ingrese un número válido entre 1 y 5.")
+                                print(f"Por favor, ingrese un número válido entre 1 y {max_opcion}.")
                         except ValueError:
-                            print("Por favor, ingrese un número válido entre 1 y 5.")
+                            print(f"Por favor, ingrese un número válido entre 1 y {max_opcion}.")
                 matriz_usuario_nueva.append(califs_jugador)
 
             # Calcular nuevas matrices FLPR
@@ -836,20 +780,21 @@ if __name__ == "__main__":
                 "Gemini": matriz_agente_gemini_nueva
             }
 
-            flpr_matrices_nuevas = calcular_matrices_flpr(matrices_nuevas, criterios)
+            for nombre, matriz in matrices_nuevas.items():
+                estado_consenso.actualizar_experto(nombre, matriz)
 
-            flpr_usuario_nueva = flpr_matrices_nuevas["Usuario"]
-            flpr_agente_qwen_nueva = flpr_matrices_nuevas["qwen"]
-            flpr_agente_gemini_nueva = flpr_matrices_nuevas["Gemini"]
+            flpr_usuario_nueva = estado_consenso.flpr("Usuario")
+            flpr_agente_qwen_nueva = estado_consenso.flpr("qwen")
+            flpr_agente_gemini_nueva = estado_consenso.flpr("Gemini")
 
             print(f"\n=== Matriz FLPR Final del Usuario (Después de la ronda {ronda_actual} de discusión) ===")
-            print(flpr_usuario_nueva)
+            print(np.round(flpr_usuario_nueva, 3))
 
             print(f"\n=== Matriz FLPR Final del Agente qwen (Después de la ronda {ronda_actual} de discusión) ===")
-            print(flpr_agente_qwen_nueva)
+            print(np.round(flpr_agente_qwen_nueva, 3))
 
             print(f"\n=== Matriz FLPR Final del Agente Gemini (Después de la ronda {ronda_actual} de discusión) ===")
-            print(flpr_agente_gemini_nueva)
+            print(np.round(flpr_agente_gemini_nueva, 3))
 
             # Calcular matriz FLPR colectiva entre los agentes después de la reevaluación
             flpr_agentes_nueva = calcular_flpr_comun(flpr_agente_qwen_nueva, flpr_agente_gemini_nueva)
@@ -862,22 +807,15 @@ if __name__ == "__main__":
             print(flpr_colectiva_nueva)
 
             # Calcular matrices de similitud después de la discusión
-            matriz_similitud_qwen_usuario_nueva = calcular_matriz_similitud(flpr_usuario_nueva, flpr_agente_qwen_nueva)
-            matriz_similitud_gemini_usuario_nueva = calcular_matriz_similitud(flpr_usuario_nueva, flpr_agente_gemini_nueva)
-            matriz_similitud_agentes_nueva = calcular_matriz_similitud(flpr_agente_qwen_nueva, flpr_agente_gemini_nueva)
+            nombres_expertos_nuevos = ["Usuario", "Agente qwen", "Agente Gemini"]
+            matrices_similitud_nuevas = estado_consenso.matrices_similitud()
 
-            print(f"\n=== Matriz de Similitud (Usuario y Agente qwen) (Después de la ronda {ronda_actual} de discusión) ===")
-            print(matriz_similitud_qwen_usuario_nueva)
-
-            print(f"\n=== Matriz de Similitud (Usuario y Agente Gemini) (Después de la ronda {ronda_actual} de discusión) ===")
-            print(matriz_similitud_gemini_usuario_nueva)
-
-            print(f"\n=== Matriz de Similitud (Agente qwen y Agente Gemini) (Después de la ronda {ronda_actual} de discusión) ===")
-            print(matriz_similitud_agentes_nueva)
+            for i, j, matriz_similitud in zip(*indices_pares_validos([True] * len(nombres_expertos_nuevos)), matrices_similitud_nuevas):
+                print(f"\n=== Matriz de Similitud ({nombres_expertos_nuevos[i]} y {nombres_expertos_nuevos[j]}) (Después de la ronda {ronda_actual} de discusión) ===")
+                print(matriz_similitud)
 
             # Calcular nivel de consenso después de la discusión
-            matrices_similitud_nuevas = [matriz_similitud_qwen_usuario_nueva, matriz_similitud_gemini_usuario_nueva, matriz_similitud_agentes_nueva]
-            cr_nuevo, consenso_alcanzado_nuevo = calcular_cr(matrices_similitud_nuevas, consenso_minimo)
+            cr_nuevo, consenso_alcanzado_nuevo = estado_consenso.evaluar(consenso_minimo)
             print(f"\n=== Nivel de Consenso (Después de la ronda {ronda_actual} de discusión) ===")
             print(f"Nivel de consenso (CR): {cr_nuevo}")
             print(f"Consenso mínimo requerido: {consenso_minimo}")
@@ -912,8 +850,8 @@ if __name__ == "__main__":
                 ranking = calcular_ranking_jugadores(flpr_colectiva_nueva, jugadores)
 
                 print("TOP JUGADORES (de mejor a peor):")
-                for posicion, (jugador, puntuacion) in enumerate(ranking, 1):
-                    print(f"{posicion}. {jugador} - Puntuación: {puntuacion:.3f}")
+                for fila in ranking:
+                    print(formatear_posicion_ranking(fila))
 
                 # Si se alcanzó el máximo de rondas sin consenso, dar una última oportunidad para modificar matrices
                 if not consenso_alcanzado_nuevo and ronda_actual > max_rondas_discusion:
@@ -977,7 +915,7 @@ if __name__ == "__main__":
                                         continue
 
                                     print(f"\nValor actual: {matriz_a_modificar[jugador_idx][criterio_idx]}")
-                                    print("Valores posibles: Muy Bajo, Bajo, Medio, Alto, Muy Alto")
+                                    print(f"Valores posibles: {conjunto_terminos.descripcion()}")
 
                                     nuevo_valor = input("Ingresa el nuevo valor: ").strip()
                                     if nuevo_valor not in valores_linguisticos:
@@ -998,40 +936,22 @@ if __name__ == "__main__":
 
                             # Recalcular la matriz FLPR correspondiente
                             if opcion == '1':
-                                flpr_usuario_nueva = None
-                                for idx, criterio in enumerate(criterios):
-                                    calificaciones_usuario_nuevas = [fila[idx] for fila in matriz_usuario_actual]
-                                    flpr_usuario_criterio_nueva = generar_flpr(calificaciones_usuario_nuevas)
-                                    if flpr_usuario_nueva is None:
-                                        flpr_usuario_nueva = flpr_usuario_criterio_nueva
-                                    else:
-                                        flpr_usuario_nueva = calcular_flpr_comun(flpr_usuario_nueva, flpr_usuario_criterio_nueva)
+                                estado_consenso.actualizar_experto("Usuario", matriz_usuario_actual)
+                                flpr_usuario_nueva = estado_consenso.flpr("Usuario")
                                 print("\n=== Matriz FLPR del Usuario (Actualizada) ===")
-                                print(flpr_usuario_nueva)
+                                print(np.round(flpr_usuario_nueva, 3))
                                 flpr_usuario_actual = flpr_usuario_nueva
                             elif opcion == '2':
-                                flpr_agente_qwen_nueva = None
-                                for idx, criterio in enumerate(criterios):
-                                    calificaciones_agente_qwen_nuevas = [fila[idx] for fila in matriz_agente_qwen_actual]
-                                    flpr_agente_qwen_criterio_nueva = generar_flpr(calificaciones_agente_qwen_nuevas)
-                                    if flpr_agente_qwen_nueva is None:
-                                        flpr_agente_qwen_nueva = flpr_agente_qwen_criterio_nueva
-                                    else:
-                                        flpr_agente_qwen_nueva = calcular_flpr_comun(flpr_agente_qwen_nueva, flpr_agente_qwen_criterio_nueva)
+                                estado_consenso.actualizar_experto("qwen", matriz_agente_qwen_actual)
+                                flpr_agente_qwen_nueva = estado_consenso.flpr("qwen")
                                 print("\n=== Matriz FLPR del Agente qwen (Actualizada) ===")
-                                print(flpr_agente_qwen_nueva)
+                                print(np.round(flpr_agente_qwen_nueva, 3))
                                 flpr_agente_qwen_actual = flpr_agente_qwen_nueva
                             elif opcion == '3':
-                                flpr_agente_gemini_nueva = None
-                                for idx, criterio in enumerate(criterios):
-                                    calificaciones_agente_gemini_nuevas = [fila[idx] for fila in matriz_agente_gemini_actual]
-                                    flpr_agente_gemini_criterio_nueva = generar_flpr(calificaciones_agente_gemini_nuevas)
-                                    if flpr_agente_gemini_nueva is None:
-                                        flpr_agente_gemini_nueva = flpr_agente_gemini_criterio_nueva
-                                    else:
-                                        flpr_agente_gemini_nueva = calcular_flpr_comun(flpr_agente_gemini_nueva, flpr_agente_gemini_criterio_nueva)
+                                estado_consenso.actualizar_experto("Gemini", matriz_agente_gemini_actual)
+                                flpr_agente_gemini_nueva = estado_consenso.flpr("Gemini")
                                 print("\n=== Matriz FLPR del Agente Gemini (Actualizada) ===")
-                                print(flpr_agente_gemini_nueva)
+                                print(np.round(flpr_agente_gemini_nueva, 3))
                                 flpr_agente_gemini_actual = flpr_agente_gemini_nueva
 
                         # Recalcular matrices FLPR colectivas
@@ -1043,14 +963,8 @@ if __name__ == "__main__":
                         print("\n=== Matriz FLPR Colectiva (Usuario y Agentes) (Actualizada) ===")
                         print(flpr_colectiva_nueva)
 
-                        # Recalcular matrices de similitud
-                        matriz_similitud_qwen_usuario_nueva = calcular_matriz_similitud(flpr_usuario_actual, flpr_agente_qwen_actual)
-                        matriz_similitud_gemini_usuario_nueva = calcular_matriz_similitud(flpr_usuario_actual, flpr_agente_gemini_actual)
-                        matriz_similitud_agentes_nueva = calcular_matriz_similitud(flpr_agente_qwen_actual, flpr_agente_gemini_actual)
-
                         # Recalcular nivel de consenso
-                        matrices_similitud_nuevas = [matriz_similitud_qwen_usuario_nueva, matriz_similitud_gemini_usuario_nueva, matriz_similitud_agentes_nueva]
-                        cr_nuevo, consenso_alcanzado_nuevo = calcular_cr(matrices_similitud_nuevas, consenso_minimo)
+                        cr_nuevo, consenso_alcanzado_nuevo = estado_consenso.evaluar(consenso_minimo)
                         print(f"\n=== Nivel de Consenso (Después de modificaciones finales) ===")
                         print(f"Nivel de consenso (CR): {cr_nuevo}")
                         print(f"Consenso mínimo requerido: {consenso_minimo}")
@@ -1064,8 +978,8 @@ if __name__ == "__main__":
                         ranking = calcular_ranking_jugadores(flpr_colectiva_nueva, jugadores)
 
                         print("TOP JUGADORES (de mejor a peor):")
-                        for posicion, (jugador, puntuacion) in enumerate(ranking, 1):
-                            print(f"{posicion}. {jugador} - Puntuación: {puntuacion:.3f}")
+                        for fila in ranking:
+                            print(formatear_posicion_ranking(fila))
 
                     print(f"\nSe muestra el ranking con el nivel de consenso actual: {cr_nuevo}")
 
@@ -1076,5 +990,5 @@ if __name__ == "__main__":
         ranking = calcular_ranking_jugadores(flpr_colectiva, jugadores)
 
         print("TOP JUGADORES (de mejor a peor):")
-        for posicion, (jugador, puntuacion) in enumerate(ranking, 1):
-            print(f"{posicion}. {jugador} - Puntuación: {puntuacion:.3f}")
+        for fila in ranking:
+            print(formatear_posicion_ranking(fila))
@@ -0,0 +1,83 @@
+import pytest
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.core.agregacion_ranking as agregacion_ranking
+from src.core.agregacion_ranking import (calcular_qgdd, calcular_qgndd, calcular_ranking_agregado, indices_top_k,
+                                         pesos_owa, formatear_posicion_ranking)
+from src.core.logica_ranking import calcular_ranking_jugadores
+
+
+class TestAgregacionRanking:
+    """
+    Pruebas de la agregación del ranking (QGDD, QGNDD y estadísticas)
+    """
+
+    @pytest.fixture
+    def flpr(self):
+        rng = np.random.default_rng(7)
+        valores = rng.uniform(1, 10, size=12)
+        return valores[:, None] / (valores[:, None] + valores[None, :])
+
+    def owa(self, valores, a=0.3, b=0.8):
+        m = len(valores)
+        q = lambda r: min(max((r - a) / (b - a), 0), 1)
+        return sum((q(k / m) - q((k - 1) / m)) * v for k, v in enumerate(sorted(valores, reverse=True), 1))
+
+    def test_grados_de_dominancia(self, flpr):
+        n = flpr.shape[0]
+        qgdd_esperado = [self.owa([flpr[i, j] for j in range(n) if j != i]) for i in range(n)]
+        qgndd_esperado = [self.owa([1 - max(flpr[j, i] - flpr[i, j], 0) for j in range(n) if j != i]) for i in range(n)]
+
+        assert np.allclose(calcular_qgdd(flpr), qgdd_esperado)
+        assert np.allclose(calcular_qgndd(flpr), qgndd_esperado)
+        assert pesos_owa(5).sum() == pytest.approx(1)
+        assert np.array_equal(calcular_qgdd(np.array([[0.5]])), [1.0])
+        with pytest.raises(ValueError):
+            pesos_owa(5, "casi_todos")
+
+    def test_ranking_agregado(self, flpr):
+        jugadores = [f"Jugador {i}" for i in range(flpr.shape[0])]
+        estadisticas = np.linspace(10, 0, flpr.shape[0])
+
+        ranking = calcular_ranking_agregado(flpr, jugadores, puntuaciones_estadisticas=estadisticas)
+        assert [r["posicion"] for r in ranking] == list(range(1, len(jugadores) + 1))
+        finales = [r["puntuacion_final"] for r in ranking]
+        assert finales == sorted(finales, reverse=True)
+        assert set(ranking[0]) == {"posicion", "jugador", "qgdd", "qgndd", "puntuacion_estadisticas", "puntuacion_final"}
+
+        solo_flpr = calcular_ranking_agregado(flpr, jugadores, pesos={"qgndd": 0, "estadisticas": 0},
+                                              puntuaciones_estadisticas=estadisticas)
+        assert solo_flpr[0]["jugador"] == jugadores[int(np.argmax(calcular_qgdd(flpr)))]
+
+        top3 = calcular_ranking_agregado(flpr, jugadores, k=3, puntuaciones_estadisticas=estadisticas)
+        assert top3 == ranking[:3], "El top-k parcial debe coincidir con el ranking completo"
+
+        with pytest.raises(ValueError):
+            calcular_ranking_agregado(flpr, jugadores, pesos={"otro": 1}, puntuaciones_estadisticas=estadisticas)
+
+    def test_ranking_jugadores_agregado(self, flpr, monkeypatch):
+        jugadores = [f"Jugador {i}" for i in range(flpr.shape[0])]
+        estadisticas = np.linspace(0, 10, flpr.shape[0])
+        temporadas = []
+
+        def puntuaciones(nombres, temporada, metodo):
+            temporadas.append(temporada)
+            return estadisticas
+        monkeypatch.setattr(agregacion_ranking, "puntuaciones_estadisticas_jugadores", puntuaciones)
+
+        ranking = calcular_ranking_jugadores(flpr, jugadores, temporada="2324", k=5)
+        assert ranking == calcular_ranking_agregado(flpr, jugadores, k=5, puntuaciones_estadisticas=estadisticas), \
+            "El ranking de jugadores debe usar la agregación de QGDD, QGNDD y estadísticas"
+        assert temporadas == ["2324"]
+        assert formatear_posicion_ranking(ranking[0]).startswith(f"1. {ranking[0]['jugador']} - Puntuación: ")
+
+    def test_top_k_parcial(self):
+        puntuaciones = np.array([0.2, 0.9, 0.5, 0.9, 0.1, 0.7, 0.5])
+
+        assert indices_top_k(puntuaciones).tolist() == [1, 3, 5, 2, 6, 0, 4]
+        for k in range(len(puntuaciones) + 1):
+            assert indices_top_k(puntuaciones, k).tolist() == indices_top_k(puntuaciones)[:k].tolist()
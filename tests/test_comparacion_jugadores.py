@@ -0,0 +1,66 @@
+import pytest
+import os
+import sys
+import json
+import importlib
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+herramientas = importlib.import_module("src.core.herramientas_análisis")
+
+
+class TestComparacionJugadores:
+    """
+    Pruebas de la comparación de varios jugadores en una sola llamada
+    """
+
+    @pytest.fixture
+    def df_jugadores(self, monkeypatch):
+        df = pd.DataFrame({
+            "Player": ["Pedri", "Gavi", "Rodri", "Kroos", "Modric", "Lamine Yamal", "Raphinha"],
+            "Squad": ["Barcelona", "Barcelona", "Manchester City", "Real Madrid", "Real Madrid", "Barcelona",
+                      "Barcelona"],
+            "position_group": ["Central Midfielders"] * 5 + ["Forwards"] * 2,
+            "Ast": [6, 2, 3, 8, 5, 9, 11],
+            "KP": [60, 20, 25, 70, 40, 75, 65],
+            "Gls": [4, 1, 2, 1, 3, 7, 18],
+        })
+        llamadas = []
+
+        def cargar(*args, **kwargs):
+            llamadas.append(args)
+            return df
+
+        monkeypatch.setattr(herramientas, "cargar_estadisticas_jugadores", cargar)
+        return llamadas
+
+    def test_tabla_con_percentiles(self, df_jugadores):
+        tabla = json.loads(herramientas.comparar_jugadores_lote(["Pedri", "Kroos", "Gavi", "Yamal", "Inventado"],
+                                                                ["Ast", "kp", "Dist"]))
+
+        assert len(df_jugadores) == 1, "Debe cargarse una sola vez el conjunto de datos"
+        assert tabla["estadisticas"] == ["Ast", "KP"]
+        assert [jugador["jugador"] for jugador in tabla["jugadores"]] == ["Pedri", "Kroos", "Gavi", "Lamine Yamal"]
+        assert tabla["jugadores"][0]["valores"] == [6, 60]
+        assert tabla["jugadores"][0]["percentiles"] == [80, 80], "El percentil debe calcularse dentro de su posición"
+        assert tabla["jugadores"][1]["percentiles"] == [100, 100]
+        assert tabla["jugadores"][3]["percentiles"] == [86, 100], "Un grupo con pocos jugadores usa toda la temporada"
+        assert tabla["avisos"] == ["Inventado: Datos no disponibles"]
+
+    def test_estadisticas_por_defecto(self, df_jugadores):
+        tabla = json.loads(herramientas.comparar_jugadores("Pedri", "Rodri"))
+
+        assert {"Ast", "KP", "Gls"} <= set(tabla["estadisticas"]), \
+            "Sin estadísticas pedidas deben usarse las relevantes de su posición"
+        assert len(tabla["jugadores"]) == 2
+        assert "Datos no disponibles" in herramientas.comparar_jugadores_lote(["Inventado"])
+
+    def test_una_sola_temporada(self, df_jugadores):
+        tabla = json.loads(herramientas.comparar_jugadores_lote(["Pedri", "Kroos"], ["Ast"]))
+        assert df_jugadores[-1] == (herramientas.TEMPORADA_ACTUAL,), "Por defecto debe cargarse la temporada actual"
+        assert tabla["temporada"] == herramientas.TEMPORADA_ACTUAL
+
+        tabla = json.loads(herramientas.comparar_jugadores_lote(["Pedri", "Kroos"], ["Ast"], temporada="2023-2024"))
+        assert df_jugadores[-1] == ("2324",), "Los percentiles deben calcularse con una sola temporada"
+        assert tabla["temporada"] == "2324"
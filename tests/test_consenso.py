@@ -6,7 +6,11 @@ from unittest.mock import patch, MagicMock
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.core.logica_consenso import calcular_matriz_similitud, calcular_consenso_nivel1, calcular_cr
+from src.core.logica_consenso import (calcular_matriz_similitud, calcular_consenso_nivel1, calcular_consenso_nivel2,
+                                      calcular_consenso_nivel3, calcular_cr, calcular_similitudes_por_pares,
+                                      indices_pares_validos, EstadoConsenso, validar_matriz_calificaciones,
+                                      calcular_proximidad_expertos, identificar_celdas_retroalimentacion,
+                                      formatear_celdas_revision)
 from src.core.fuzzy_matrices import generar_flpr, calcular_flpr_comun
 from src.main import evaluar_con_agente, calcular_matrices_flpr
 
@@ -132,4 +136,144 @@ class TestConsenso:
         cr_ronda2, consenso_alcanzado_ronda2 = calcular_cr(matrices_similitud_ronda2, consenso_minimo)
 
         assert cr_ronda2 > cr, f"El consenso debe aumentar en la segunda ronda. Ronda1 CR: {cr}, Ronda2 CR: {cr_ronda2}"
-        assert consenso_alcanzado_ronda2, f"El consenso debe alcanzarse en la segunda ronda. CR: {cr_ronda2}, Mínimo: {consenso_minimo}"
\ No newline at end of file
+        assert consenso_alcanzado_ronda2, f"El consenso debe alcanzarse en la segunda ronda. CR: {cr_ronda2}, Mínimo: {consenso_minimo}"
+
+    def test_consenso_tensor_apilado(self):
+        rng = np.random.default_rng(7)
+        flprs = np.round(rng.random((6, 15, 15)), 3)
+        pares_i, pares_j = np.triu_indices(len(flprs), 1)
+
+        matrices_similitud = [calcular_matriz_similitud(flprs[i], flprs[j]) for i, j in zip(pares_i, pares_j)]
+        tensor_similitud = calcular_matriz_similitud(flprs[pares_i], flprs[pares_j])
+
+        assert tensor_similitud.shape == (15, 15, 15)
+        assert np.array_equal(np.array(matrices_similitud), tensor_similitud)
+
+        matriz_consenso = calcular_consenso_nivel1(tensor_similitud)
+        assert np.array_equal(matriz_consenso, calcular_consenso_nivel1(matrices_similitud))
+
+        esperado_nivel2 = np.round([sum(matriz_consenso[i][j] for j in range(15) if j != i) / 14 for i in range(15)], 3)
+        assert np.array_equal(calcular_consenso_nivel2(matriz_consenso), esperado_nivel2)
+
+        lote = np.stack([matriz_consenso, matriz_consenso.T])
+        assert calcular_consenso_nivel3(lote)[0] == calcular_consenso_nivel3(matriz_consenso)
+        assert calcular_cr(tensor_similitud) == calcular_cr(matrices_similitud)
+
+    def test_similitudes_por_pares_con_expertos_ausentes(self):
+        rng = np.random.default_rng(11)
+        flprs = [np.round(rng.random((8, 8)), 3) for _ in range(5)]
+        flprs[2] = None
+
+        tensor_similitud = calcular_similitudes_por_pares(flprs)
+        pares_i, pares_j = indices_pares_validos([flpr is not None for flpr in flprs])
+
+        assert list(zip(pares_i, pares_j)) == [(0, 1), (0, 3), (0, 4), (1, 3), (1, 4), (3, 4)]
+        for similitud, i, j in zip(tensor_similitud, pares_i, pares_j):
+            assert np.array_equal(similitud, calcular_matriz_similitud(flprs[i], flprs[j]))
+
+        tensor_flprs = np.stack([flpr if flpr is not None else np.zeros((8, 8)) for flpr in flprs])
+        validos = np.array([True, True, False, True, True])
+        assert np.array_equal(calcular_similitudes_por_pares(tensor_flprs, validos), tensor_similitud)
+
+        assert calcular_similitudes_por_pares([flprs[0], None, None]).shape == (0, 8, 8)
+
+    def test_estado_consenso_incremental(self, valores_linguisticos):
+        rng = np.random.default_rng(5)
+        criterios = ["Técnica", "Físico", "Táctico"]
+        matrices = {f"Experto{k}": rng.choice(valores_linguisticos, (20, 3)).tolist() for k in range(4)}
+
+        estado = EstadoConsenso(matrices, criterios)
+
+        for paso in range(12):
+            nombre = f"Experto{rng.integers(4)}"
+            if paso % 3 == 0:
+                matriz = rng.choice(valores_linguisticos, (20, 3)).tolist()
+                matrices[nombre] = matriz
+                estado.actualizar_experto(nombre, matriz)
+            else:
+                jugador, criterio = rng.integers(20), rng.integers(3)
+                termino = str(rng.choice(valores_linguisticos))
+                matrices[nombre][jugador][criterio] = termino
+                estado.actualizar_calificacion(nombre, jugador, criterio, termino)
+
+            flpr_matrices = calcular_matrices_flpr(matrices, criterios)
+            for nombre_experto, flpr in flpr_matrices.items():
+                assert np.array_equal(estado.flpr(nombre_experto), flpr)
+
+            matrices_similitud = calcular_similitudes_por_pares(list(flpr_matrices.values()))
+            assert np.array_equal(estado.matrices_similitud(), matrices_similitud)
+
+            assert np.array_equal(estado.matriz_consenso, calcular_consenso_nivel1(matrices_similitud))
+            assert estado.evaluar() == calcular_cr(matrices_similitud), "El CR incremental debe coincidir con el completo"
+
+        with pytest.raises(ValueError):
+            estado.actualizar_experto("Desconocido", matrices["Experto0"])
+
+    def test_validar_matriz_calificaciones(self, valores_linguisticos):
+        criterios = ["Técnica", "Físico"]
+        termino = valores_linguisticos[0]
+        valida = [[termino, termino], [termino, termino, termino]]
+
+        assert validar_matriz_calificaciones(valida, 2, criterios) is None, "Las columnas sobrantes se ignoran"
+        assert validar_matriz_calificaciones([], 2, criterios) is not None
+        assert validar_matriz_calificaciones(valida[:1], 2, criterios) is not None, "Debe detectar jugadores de menos"
+        assert validar_matriz_calificaciones([[termino], [termino, termino]], 2, criterios) is not None, \
+            "Debe detectar jugadores sin una calificación por criterio"
+        assert validar_matriz_calificaciones([[termino, "Inventado"], [termino, termino]], 2, criterios) is not None, \
+            "Debe detectar términos desconocidos"
+
+        estado = EstadoConsenso({"Usuario": valida, "Agente": valida}, criterios)
+        assert estado.evaluar() == (1.0, True), "Una matriz válida debe poder incorporarse al consenso"
+
+    def test_estado_consenso_mismo_redondeo(self, valores_linguisticos):
+        rng = np.random.default_rng(11)
+
+        for _ in range(100):
+            n_expertos, n_jugadores, n_criterios = rng.integers(2, 7), rng.integers(2, 16), rng.integers(1, 5)
+            criterios = [f"Criterio{k}" for k in range(n_criterios)]
+            matrices = {f"Experto{k}": rng.choice(valores_linguisticos, (n_jugadores, n_criterios)).tolist()
+                        for k in range(n_expertos)}
+            estado = EstadoConsenso(matrices, criterios)
+            consenso_minimo = rng.uniform(0.5, 1)
+
+            for _ in range(3):
+                assert estado.evaluar(consenso_minimo) == calcular_cr(estado.matrices_similitud(), consenso_minimo), \
+                    "El estado debe redondear cada nivel igual que calcular_cr"
+                estado.actualizar_calificacion(f"Experto{rng.integers(n_expertos)}", rng.integers(n_jugadores),
+                                               rng.integers(n_criterios), str(rng.choice(valores_linguisticos)))
+
+    def test_retroalimentacion_celdas(self, valores_linguisticos):
+        rng = np.random.default_rng(9)
+        criterios = ["Técnica", "Físico", "Táctico", "Mental"]
+        matrices = {f"Experto{k}": rng.choice(valores_linguisticos, (10, 4)).tolist() for k in range(4)}
+
+        def cr_sin_redondeo(matrices_actuales):
+            flprs = np.stack(list(calcular_matrices_flpr(matrices_actuales, criterios).values()))
+            pares_i, pares_j = np.triu_indices(len(flprs), 1)
+            consenso = (1 - np.abs(flprs[pares_i] - flprs[pares_j])).mean(axis=0)
+            return (consenso.sum() - np.trace(consenso)) / (10 * 9)
+
+        estado = EstadoConsenso(matrices, criterios)
+        celdas = identificar_celdas_retroalimentacion(estado, k=5)
+
+        assert 0 < len(celdas) <= 5
+        mejoras = [celda["mejora_cr"] for celda in celdas]
+        assert mejoras == sorted(mejoras, reverse=True) and mejoras[-1] > 0
+
+        celda = celdas[0]
+        assert matrices[celda["experto"]][celda["jugador_idx"]][celda["criterio_idx"]] == celda["actual"]
+        jugadores = [f"Jugador {i}" for i in range(10)]
+        texto = formatear_celdas_revision(celdas, jugadores, celda["experto"])
+        assert f"{jugadores[celda['jugador_idx']]} ({celda['criterio']}): diste {celda['actual']}" in texto, \
+            "El prompt de re-evaluación debe incluir las celdas del experto"
+        assert formatear_celdas_revision(celdas, jugadores, "Inexistente") == ""
+        cr_antes = cr_sin_redondeo(matrices)
+        matrices[celda["experto"]][celda["jugador_idx"]][celda["criterio_idx"]] = celda["sugerido"]
+        assert np.isclose(cr_sin_redondeo(matrices) - cr_antes, celda["mejora_cr"]), "La mejora estimada debe ser la real"
+
+        flprs = np.stack([estado.flpr(nombre) for nombre in estado.nombres])
+        proximidad = calcular_proximidad_expertos(flprs, flprs.mean(axis=0))
+        assert proximidad["pares"].shape == (4, 10, 10)
+        assert proximidad["alternativas"].shape == (4, 10)
+        assert proximidad["global"].shape == (4,)
+        assert np.all((proximidad["global"] > 0) & (proximidad["global"] <= 1))
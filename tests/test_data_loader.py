@@ -0,0 +1,161 @@
+import pytest
+import os
+import sys
+import pandas as pd
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.data_management.data_loader as data_loader
+from src.data_management.data_loader import (cargar_estadisticas_jugadores, invalidar_cache_estadisticas,
+                                             construir_consulta_mongo, construir_proyeccion_mongo, aplicar_filtros,
+                                             clave_temporada, huella_datos, ATRIBUTO_HUELLA)
+
+
+@pytest.fixture
+def origen(monkeypatch):
+    cargas = []
+
+    def cargar_falso(season=None, columns=None, filters=None):
+        cargas.append(season)
+        return pd.DataFrame({"Player": ["Pedri", "Rodri"], "Season": [season, season], "Gls": [4, 2],
+                             "position_group": ["Central Midfielders", "Defensive-Midfielders"],
+                             "90s": [25.0, 3.0]})
+
+    reloj = {"ahora": 1000.0}
+    monkeypatch.setattr(data_loader, "_cargar_estadisticas_origen", cargar_falso)
+    monkeypatch.setattr(data_loader.time, "monotonic", lambda: reloj["ahora"])
+    monkeypatch.setattr(data_loader, "CACHE_TTL_SEGUNDOS", 60)
+    monkeypatch.setattr(data_loader, "CACHE_MAX_TEMPORADAS", 2)
+    invalidar_cache_estadisticas()
+    yield {"cargas": cargas, "reloj": reloj}
+    invalidar_cache_estadisticas()
+
+
+class TestCacheEstadisticas:
+    """
+    Pruebas de la caché en memoria de las estadísticas de jugadores
+    """
+
+    def test_una_carga_por_temporada(self, origen):
+        cargas = origen["cargas"]
+        for _ in range(5):
+            df = cargar_estadisticas_jugadores("2425")
+        assert cargas == ["2425"], "Varias llamadas seguidas deben hacer una sola carga"
+
+        df["Gls"] = 0
+        df["nueva_columna"] = 1
+        df_cache = cargar_estadisticas_jugadores("2425")
+        assert df_cache["Gls"].tolist() == [4, 2], "Modificar el DataFrame devuelto no debe alterar la caché"
+        assert "nueva_columna" not in df_cache.columns
+
+        cargar_estadisticas_jugadores("2425", usar_cache=False)
+        assert cargas == ["2425", "2425"]
+
+    def test_expiracion_y_invalidacion(self, origen):
+        cargas = origen["cargas"]
+        cargar_estadisticas_jugadores("2425")
+        origen["reloj"]["ahora"] += 61
+        cargar_estadisticas_jugadores("2425")
+        assert cargas == ["2425", "2425"], "Los datos caducados deben recargarse"
+
+        cargar_estadisticas_jugadores("2324")
+        cargar_estadisticas_jugadores("2223")
+        cargar_estadisticas_jugadores("2425")
+        assert cargas[-1] == "2425", "Con más temporadas que el máximo se descarta la menos usada"
+
+        invalidar_cache_estadisticas("2324")
+        cargar_estadisticas_jugadores("2223")
+        cargar_estadisticas_jugadores("2324")
+        assert cargas[-1] == "2324"
+        assert cargas.count("2223") == 1
+
+
+class TestFiltrosEstadisticas:
+    """
+    Pruebas de la proyección de columnas y los filtros del cargador
+    """
+
+    @pytest.fixture
+    def df_jugadores(self):
+        return pd.DataFrame({
+            "Player": ["Pedri", "Rodri", "Lamine Yamal", "Suplente"],
+            "position_group": ["Central Midfielders", "Defensive-Midfielders", "Forwards", "Forwards"],
+            "market_value_in_eur": [80e6, 65e6, 150e6, None],
+            "90s": [25.0, 3.0, 30.0, 0.5],
+            "Gls": [4, 0, 7, 0],
+        })
+
+    def test_traduccion_a_mongo(self):
+        query = construir_consulta_mongo("2024-2025", {"position_group": ["Forwards", "Wing-Back"], "market_value_max": 5e7,
+                                                  "min_90s": 5})
+        assert query == {"temporada": "2425", "position_group": {"$in": ["Forwards", "Wing-Back"]},
+                         "market_value_in_eur": {"$lte": 5e7}, "90s": {"$gte": 5}}
+        assert construir_consulta_mongo() == {}
+        assert construir_proyeccion_mongo(["Player", "Gls"]) == {"_id": 0, "Player": 1, "Gls": 1}
+        assert construir_proyeccion_mongo() == {"_id": 0}
+
+    def test_clave_temporada(self):
+        for formato in ["2024-2025", "2024/25", "24/25", "2425", " 2024 - 2025 "]:
+            assert clave_temporada(formato) == "2425"
+        assert clave_temporada("1999-2000") == "9900"
+        assert clave_temporada(None) is None
+        for invalida in ["2025", "2024-2026", "temporada", ""]:
+            with pytest.raises(ValueError):
+                clave_temporada(invalida)
+
+    def test_filtros_en_memoria(self, df_jugadores):
+        filtrado = aplicar_filtros(df_jugadores, {"position_group": "Forwards", "market_value_max": 2e8, "min_90s": 1},
+                                   columns=["Player", "Gls"])
+        assert filtrado["Player"].tolist() == ["Lamine Yamal"], "Un jugador sin valor de mercado no cumple el filtro"
+        assert list(filtrado.columns) == ["Player", "Gls"]
+
+        assert aplicar_filtros(df_jugadores, {"market_value_min": 70e6})["Player"].tolist() == ["Pedri", "Lamine Yamal"]
+        assert aplicar_filtros(df_jugadores.drop(columns="market_value_in_eur"), {"market_value_max": 1e9}).empty
+
+    def test_carga_filtrada_desde_cache(self, origen):
+        completo = cargar_estadisticas_jugadores("2425")
+        filtrado = cargar_estadisticas_jugadores("2024-2025", columns=["Player"], filters={"min_90s": 10})
+
+        assert origen["cargas"] == ["2425"], "Con la temporada completa en caché se filtra en memoria"
+        assert filtrado["Player"].tolist() == ["Pedri"]
+        assert len(completo) == 2
+
+        with pytest.raises(ValueError):
+            cargar_estadisticas_jugadores("2425", filters={"equipo": "Barcelona"})
+
+    def test_huella_de_los_datos(self, origen):
+        completo = cargar_estadisticas_jugadores("2425")
+        huella = completo.attrs[ATRIBUTO_HUELLA]
+
+        assert cargar_estadisticas_jugadores("2425").attrs[ATRIBUTO_HUELLA] == huella, \
+            "La huella se calcula al leer el origen y se reutiliza desde la caché"
+        sin_huella = completo.copy()
+        sin_huella.attrs.clear()
+        assert huella_datos(sin_huella) == huella, "Sin la huella guardada se obtiene la misma a partir del contenido"
+        filtrado = cargar_estadisticas_jugadores("2425", filters={"min_90s": 10})
+        assert filtrado.attrs[ATRIBUTO_HUELLA] != huella, "Los datos filtrados deben tener su propia huella"
+
+        for cambiado in (completo.assign(Gls=[5, 2]), completo.iloc[::-1].reset_index(drop=True)):
+            cambiado.attrs.clear()
+            assert huella_datos(cambiado) != huella, "La huella debe cambiar si cambian los datos o su orden"
+
+    @patch('src.data_management.data_loader.get_mongodb_connection')
+    def test_consulta_por_temporada_en_mongo(self, mock_conexion):
+        mongodb = MagicMock()
+        mongodb.find.return_value = []
+        mongodb.find_one.return_value = {"temporada": "2324"}
+        mock_conexion.return_value = mongodb
+
+        df = cargar_estadisticas_jugadores("2023-2024", usar_cache=False, columns=["Player"],
+                                           filters={"position_group": "GK", "min_90s": 50})
+
+        mongodb.find.assert_called_once_with("stats_jugadores",
+                                             query={"temporada": "2324", "position_group": {"$in": ["GK"]},
+                                                    "90s": {"$gte": 50}},
+                                             projection={"_id": 0, "Player": 1})
+        assert isinstance(df, pd.DataFrame) and df.empty, "Si la temporada existe, no se debe recurrir al CSV"
+
+        mongodb.find_one.return_value = None
+        resultado = cargar_estadisticas_jugadores("1998-1999", usar_cache=False)
+        assert isinstance(resultado, str) and "9899" in resultado, "Una temporada sin datos debe informarse como error"
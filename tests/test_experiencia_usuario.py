@@ -7,6 +7,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.main import evaluar_con_agente, calcular_matrices_flpr
 from src.core.logica_consenso import calcular_matriz_similitud, calcular_cr
+import src.core.logica_ranking as logica_ranking
 from src.core.logica_ranking import calcular_ranking_jugadores
 
 class TestExperienciaUsuario:
@@ -72,7 +73,9 @@ class TestExperienciaUsuario:
             "consenso_minimo": 0.75
         }
 
-    def test_flujo_entrenador(self, agentes_simulados, datos_prueba):
+    def test_flujo_entrenador(self, agentes_simulados, datos_prueba, tmp_path, monkeypatch):
+        # Las tablas de puntuaciones se guardan en un directorio temporal, no en data/cache
+        monkeypatch.setattr(logica_ranking, "CARPETA_CACHE", str(tmp_path))
         jugadores = datos_prueba["jugadores"]
         criterios = datos_prueba["criterios"]
         valores_linguisticos = datos_prueba["valores_linguisticos"]
@@ -132,13 +135,13 @@ class TestExperienciaUsuario:
         ranking = calcular_ranking_jugadores(flpr_colectiva, jugadores)
 
         assert len(ranking) == len(jugadores), "El ranking no incluye a todos los jugadores"
-        valores_ranking = [valor for _, valor in ranking]
+        valores_ranking = [fila["puntuacion_final"] for fila in ranking]
         assert len(set(valores_ranking)) == len(valores_ranking), "Hay empates en el ranking"
         assert isinstance(cr, float), "El nivel de consenso no es un número"
         assert 0 <= cr <= 1, "El nivel de consenso no está en el rango [0,1]"
 
-        mejor_jugador = ranking[0][0]
-        print(f"\nEl sistema recomienda fichar a {mejor_jugador} con una puntuación de {ranking[0][1]:.3f}")
+        mejor_jugador = ranking[0]["jugador"]
+        print(f"\nEl sistema recomienda fichar a {mejor_jugador} con una puntuación de {ranking[0]['puntuacion_final']:.3f}")
         print(f"Nivel de consenso entre expertos: {cr:.3f} ({'Suficiente' if consenso_alcanzado else 'Insuficiente'})")
 
         assert True, "El flujo de usuario se completó correctamente"
\ No newline at end of file
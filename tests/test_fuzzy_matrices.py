@@ -0,0 +1,112 @@
+import pytest
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.fuzzy_matrices import (generar_flpr, generar_flpr_lote, calcular_matrices_flpr, calcular_flpr_comun,
+                                     codificar_calificaciones, decodificar_calificaciones, TermSet,
+                                     obtener_conjunto_terminos)
+
+class TestFuzzyMatrices:
+    """
+    Pruebas del cálculo de matrices FLPR
+
+    Objetivo:
+    Comprobar que el cálculo por lotes produce las mismas matrices que el cálculo por criterio.
+    """
+
+    @pytest.fixture
+    def calificaciones(self):
+        rng = np.random.default_rng(42)
+        terminos = ["Muy Bajo", "Bajo", "Medio", "Alto", "Muy Alto"]
+        return rng.choice(terminos, size=(4, 12, 5))
+
+    def test_flpr_propiedades(self):
+        flpr = generar_flpr(["Muy Alto", "Medio", "Bajo"])
+
+        assert flpr.shape == (3, 3)
+        assert np.all(np.diag(flpr) == 0.5), "La diagonal de la FLPR debe ser 0.5"
+        assert flpr[0][1] == round(0.9333333333333335 / (0.9333333333333335 + 0.5), 3)
+        assert np.allclose(flpr + flpr.T, 1, atol=1e-3), "La FLPR debe ser recíproca"
+
+    def test_termino_desconocido(self):
+        with pytest.raises(ValueError):
+            generar_flpr(["Alto", "Excelente"])
+
+    def test_lote_coincide_con_generar_flpr(self, calificaciones):
+        flprs = generar_flpr_lote(calificaciones)
+
+        assert flprs.shape == (4, 5, 12, 12)
+        for agente in range(calificaciones.shape[0]):
+            for criterio in range(calificaciones.shape[2]):
+                esperado = generar_flpr(list(calificaciones[agente, :, criterio]))
+                assert np.array_equal(flprs[agente, criterio], esperado)
+
+    def test_matrices_flpr_secuencial(self, calificaciones):
+        criterios = ["Técnica", "Físico", "Táctico", "Mental", "Velocidad"]
+        matrices = {f"Agente{k}": calificaciones[k].tolist() for k in range(calificaciones.shape[0])}
+
+        flpr_matrices = calcular_matrices_flpr(matrices, criterios, modo="secuencial")
+
+        for nombre, matriz in matrices.items():
+            esperado = None
+            for idx in range(len(criterios)):
+                flpr_criterio = generar_flpr([fila[idx] for fila in matriz])
+                esperado = flpr_criterio if esperado is None else calcular_flpr_comun(esperado, flpr_criterio)
+            assert np.array_equal(flpr_matrices[nombre], esperado)
+
+    def test_matrices_flpr_ponderadas(self, calificaciones):
+        criterios = ["Técnica", "Físico", "Táctico", "Mental", "Velocidad"]
+        matrices = {f"Agente{k}": calificaciones[k].tolist() for k in range(calificaciones.shape[0])}
+        flprs = generar_flpr_lote(calificaciones, decimales=None)
+
+        flpr_matrices = calcular_matrices_flpr(matrices, criterios)
+        for k, nombre in enumerate(matrices):
+            assert np.allclose(flpr_matrices[nombre], flprs[k].mean(axis=0))
+            assert np.allclose(flpr_matrices[nombre] + flpr_matrices[nombre].T, 1), "La FLPR agregada debe ser recíproca"
+
+        flpr_ponderadas = calcular_matrices_flpr(matrices, criterios, pesos={"Técnica": 3, "Mental": 1})
+        for k, nombre in enumerate(matrices):
+            assert np.allclose(flpr_ponderadas[nombre], 0.75 * flprs[k, 0] + 0.25 * flprs[k, 3])
+
+        with pytest.raises(ValueError):
+            calcular_matrices_flpr(matrices, criterios, pesos=[1, 2])
+        with pytest.raises(ValueError):
+            calcular_matrices_flpr(matrices, criterios, pesos=[1] * 5, modo="secuencial")
+        with pytest.raises(ValueError):
+            calcular_matrices_flpr(matrices, criterios, modo="mediana")
+
+    def test_codificacion_terminos_y_alias(self):
+        codigos = codificar_calificaciones([["Muy Bajo", "High"], ["Medio", "Very High"]])
+
+        assert codigos.dtype == np.int8
+        assert np.array_equal(codigos, codificar_calificaciones([["Very Low", "Alto"], ["Medium", "Muy Alto"]]))
+        assert np.allclose(decodificar_calificaciones(codigos), [[0.0667, 0.75], [0.5, 0.9333]], atol=1e-4)
+        assert np.array_equal(generar_flpr_lote(codigos[None, :, :]), generar_flpr_lote([[["Muy Bajo", "High"], ["Medio", "Very High"]]]))
+
+    @pytest.mark.parametrize("granularidad", [3, 5, 7, 9])
+    def test_conjuntos_predefinidos(self, granularidad):
+        conjunto = obtener_conjunto_terminos(granularidad)
+
+        assert conjunto.granularidad == granularidad
+        assert np.all(np.diff(conjunto.valores) > 0), "Los centroides deben crecer con la etiqueta"
+        assert conjunto is obtener_conjunto_terminos(granularidad), "El conjunto debe reutilizarse desde la caché"
+
+        flpr = generar_flpr([conjunto.etiquetas[-1], conjunto.etiquetas[0]], conjunto)
+        assert flpr[0][1] > 0.5
+
+    def test_conjunto_desde_config(self):
+        conjunto = TermSet.desde_config({
+            "etiquetas": ["Bajo", "Medio", "Alto"],
+            "alias": {"Low": "Bajo", "Medium": "Medio", "High": "Alto"},
+            "resolucion": 0.05,
+        })
+
+        assert conjunto.opciones_numericas() == {1: "Bajo", 2: "Medio", 3: "Alto"}
+        assert np.array_equal(conjunto.codificar(["Low", "Alto"]), conjunto.codificar(["Bajo", "High"]))
+        assert np.isclose(conjunto.valores[1], 0.5)
+
+        with pytest.raises(ValueError):
+            TermSet.desde_config({"granularidad": 4})
@@ -0,0 +1,84 @@
+import pytest
+import os
+import sys
+import json
+import importlib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.indice_mercado import IndiceMercado, grupo_posicion, ORDEN_VALOR, ORDEN_PUNTUACION
+
+herramientas = importlib.import_module("src.core.herramientas_análisis")
+
+
+class TestIndiceMercado:
+    """
+    Pruebas del índice de jugadores por posición y valor de mercado
+    """
+
+    @pytest.fixture
+    def df_jugadores(self):
+        rng = np.random.default_rng(7)
+        n = 40
+        return pd.DataFrame({
+            "Player": [f"Delantero {i}" for i in range(n)] + ["Portero", "Sin valor"],
+            "Squad": ["Equipo"] * (n + 2),
+            "position_group": ["Forwards"] * n + ["GK", "Forwards"],
+            "90s": [10.0] * (n + 2),
+            "Gls": list(rng.integers(0, 20, n)) + [0, 30],
+            "npxG": list(rng.random(n) * 10) + [0, 20],
+            "market_value_in_eur": list(rng.integers(1, 100, n) * 1e6) + [5e6, np.nan],
+        })
+
+    def test_rango_de_precios(self, df_jugadores):
+        indice = IndiceMercado(df_jugadores)
+        valores = df_jugadores["market_value_in_eur"]
+        en_rango = df_jugadores[(df_jugadores["position_group"] == "Forwards") & valores.between(20e6, 60e6)]
+
+        resultado = indice.buscar("Forwards", 20e6, 60e6, k=5, ordenar_por=ORDEN_VALOR)
+
+        assert resultado["total"] == len(en_rango)
+        assert list(indice.df.loc[resultado["filas"], "market_value_in_eur"]) == \
+            sorted(en_rango["market_value_in_eur"], reverse=True)[:5], "Deben devolverse los más caros del rango"
+        assert "Sin valor" not in set(indice.df.loc[indice.grupos["Forwards"][1], "Player"]), \
+            "Los jugadores sin valor de mercado no deben indexarse"
+
+    def test_top_k_y_paginacion(self, df_jugadores):
+        indice = IndiceMercado(df_jugadores)
+
+        todos = indice.buscar("Forwards", precio_max=1e9, k=100, ordenar_por=ORDEN_PUNTUACION)["filas"]
+        puntuaciones = indice.puntuaciones[todos]
+        assert np.all(np.diff(puntuaciones) <= 0), "Deben ordenarse de mejor a peor puntuación"
+
+        paginas = [indice.buscar("Forwards", precio_max=1e9, k=7, pagina=p)["filas"] for p in range(1, 7)]
+        assert list(np.concatenate(paginas)) == list(todos), "Las páginas deben recorrer todos los jugadores sin repetir"
+        assert len(indice.buscar("Forwards", precio_max=1e9, k=7, ordenar_por=ORDEN_VALOR, pagina=6)["filas"]) == 5
+
+        with pytest.raises(ValueError):
+            indice.buscar("Forwards", ordenar_por="edad")
+
+    def test_herramienta_en_millones(self, df_jugadores, monkeypatch):
+        monkeypatch.setattr(herramientas, "obtener_indice_mercado", lambda: IndiceMercado(df_jugadores))
+
+        respuesta = json.loads(herramientas.listar_jugadores_por_posicion_y_precio("Delanteros", 30, k=3))
+        valores_rango = df_jugadores["market_value_in_eur"][df_jugadores["position_group"] == "Forwards"]
+
+        assert respuesta["grupo"] == "Forwards"
+        assert respuesta["total"] == int((valores_rango <= 30e6).sum()), "El precio máximo se indica en millones"
+        assert len(respuesta["jugadores"]) == 3
+        assert all(jugador["valor"] <= 30e6 for jugador in respuesta["jugadores"])
+        assert all(0 <= jugador["puntuacion"] <= 10 and "jugador" in jugador for jugador in respuesta["jugadores"]), \
+            "Cada jugador debe incluir su puntuación junto a su resumen"
+        assert "Posición no reconocida" in herramientas.listar_jugadores_por_posicion_y_precio("Utillero", 30)
+
+        monkeypatch.setattr(herramientas, "obtener_indice_mercado",
+                            lambda: IndiceMercado(df_jugadores.drop(columns="market_value_in_eur")))
+        assert "no incluyen el valor de mercado" in herramientas.listar_jugadores_por_posicion_y_precio("Forwards", 30)
+
+    def test_alias_de_posicion(self):
+        assert grupo_posicion("Delantero") == "Forwards"
+        assert grupo_posicion(" portero ") == "GK"
+        assert grupo_posicion("central midfielders") == "Central Midfielders"
+        assert grupo_posicion("Utillero") is None
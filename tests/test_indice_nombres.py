@@ -0,0 +1,115 @@
+import pytest
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.data_management.indice_nombres as indice_nombres
+from src.data_management.data_loader import ATRIBUTO_HUELLA
+from src.data_management.indice_nombres import (IndiceNombres, obtener_indice_nombres, RESOLUCION_EXACTA,
+                                                RESOLUCION_TOKEN, RESOLUCION_DIFUSA, RESOLUCION_AMBIGUA,
+                                                RESOLUCION_NO_ENCONTRADA)
+
+
+class TestIndiceNombres:
+    """
+    Pruebas de la resolución de nombres de jugadores
+    """
+
+    @pytest.fixture
+    def df_jugadores(self):
+        return pd.DataFrame({
+            "Player": ["Rodri", "Rodrigo De Paul", "Bernardo Silva", "André Silva", "Kylian Mbappé",
+                       "Aurélien Tchouaméni", "Rodri", "Lamine Yamal"],
+            "Squad": ["Manchester City", "Atlético Madrid", "Manchester City", "Leipzig", "Real Madrid",
+                      "Real Madrid", "Betis", "Barcelona"],
+        })
+
+    def test_niveles_de_resolucion(self, df_jugadores):
+        indice = IndiceNombres.desde_dataframe(df_jugadores)
+
+        exacto = indice.resolver("  Rodri ")
+        assert exacto["estado"] == RESOLUCION_EXACTA
+        assert exacto["posicion"] == 0, "Un jugador con varias filas debe resolverse a la primera"
+
+        token = indice.resolver("Tchouameni")
+        assert token["estado"] == RESOLUCION_TOKEN
+        assert token["posicion"] == 5
+
+        difuso = indice.resolver("Lamine Yamall")
+        assert difuso["estado"] == RESOLUCION_DIFUSA
+        assert difuso["nombre"] == "lamine yamal"
+
+        ambiguo = indice.resolver("Silva")
+        assert ambiguo["estado"] == RESOLUCION_AMBIGUA
+        assert ambiguo["posicion"] is None
+        assert ambiguo["candidatos"] == ["andre silva", "bernardo silva"]
+
+        assert indice.resolver("Jugador Inventado")["estado"] == RESOLUCION_NO_ENCONTRADA
+        assert indice.resolver("")["estado"] == RESOLUCION_NO_ENCONTRADA
+
+    def test_indice_compartido(self, df_jugadores):
+        indice = obtener_indice_nombres(df_jugadores)
+
+        assert obtener_indice_nombres(df_jugadores.copy()) is indice, "La misma temporada debe reutilizar el índice"
+        df_modificado = df_jugadores.copy()
+        df_modificado.loc[0, "Player"] = "Pedri"
+        assert obtener_indice_nombres(df_modificado) is not indice, "Si cambian los datos debe construirse otro índice"
+        assert len(indice) == 7
+
+    def test_resolucion_por_lote(self, df_jugadores):
+        indice = IndiceNombres.desde_dataframe(df_jugadores)
+        jugadores = ["Rodri", "Lamine Yamall", "Silva", "Kylian Mbape", "Jugador Inventado", "Lamine Yamall", ""]
+
+        lote = indice.resolver_lote(jugadores)
+
+        assert [r["estado"] for r in lote] == [RESOLUCION_EXACTA, RESOLUCION_DIFUSA, RESOLUCION_AMBIGUA,
+                                               RESOLUCION_DIFUSA, RESOLUCION_NO_ENCONTRADA, RESOLUCION_DIFUSA,
+                                               RESOLUCION_NO_ENCONTRADA]
+        assert lote == [indice.resolver(jugador) for jugador in jugadores], \
+            "Resolver por lote debe dar lo mismo que resolver cada nombre por separado"
+        assert lote[3]["posicion"] == 4
+
+    def test_bloqueo_por_trigramas(self, df_jugadores):
+        indice = IndiceNombres.desde_dataframe(df_jugadores)
+
+        candidatos = [indice.nombres[i] for i in indice._candidatos_difusos("lamine yamall")]
+
+        assert candidatos == ["lamine yamal"], "Solo deben compararse nombres con trigramas y longitud compatibles"
+        assert not len(indice._candidatos_difusos("xq")), "Sin trigramas comunes no hay candidatos"
+
+    def test_indice_depende_del_orden(self, df_jugadores):
+        indice = obtener_indice_nombres(df_jugadores)
+        invertido = df_jugadores.iloc[::-1]
+
+        indice_invertido = obtener_indice_nombres(invertido)
+
+        assert indice_invertido is not indice, "El mismo contenido en otro orden debe tener su propio índice"
+        posicion = indice_invertido.resolver("Lamine Yamal")["posicion"]
+        assert invertido.iloc[posicion]["Player"] == "Lamine Yamal"
+
+    def test_indice_por_huella_del_cargador(self, df_jugadores, monkeypatch):
+        cargado = df_jugadores.copy()
+        cargado.attrs[ATRIBUTO_HUELLA] = "temporada-2425"
+        indice = obtener_indice_nombres(cargado)
+
+        def sin_hash(*args, **kwargs):
+            raise AssertionError("Con la huella del cargador no debe recorrerse la columna de nombres")
+        monkeypatch.setattr(indice_nombres.pd.util, "hash_pandas_object", sin_hash)
+
+        assert obtener_indice_nombres(cargado.copy(deep=False)) is indice, \
+            "Las copias de una misma carga deben compartir el índice sin volver a calcular la huella"
+
+    def test_cache_concurrente(self, df_jugadores, monkeypatch):
+        monkeypatch.setattr(indice_nombres, "MAX_INDICES_EN_CACHE", 3)
+        tablas = [df_jugadores.iloc[:i] for i in range(2, len(df_jugadores) + 1)] * 20
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            indices = list(executor.map(obtener_indice_nombres, tablas))
+
+        for indice, tabla in zip(indices, tablas):
+            esperado = RESOLUCION_EXACTA if "Lamine Yamal" in tabla["Player"].values else RESOLUCION_NO_ENCONTRADA
+            assert indice.resolver("Lamine Yamal")["estado"] == esperado, "Cada hilo debe recibir el índice de sus datos"
+        assert len(indice_nombres._indices) <= 3
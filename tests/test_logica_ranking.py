@@ -0,0 +1,112 @@
+import pytest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.core.logica_ranking as logica_ranking
+from src.core.logica_ranking import (calcular_puntuaciones_estadisticas, calcular_ponderacion_estadisticas,
+                                     construir_tabla_puntuaciones, obtener_tabla_puntuaciones,
+                                     invalidar_tabla_puntuaciones, calcular_ranking_jugadores,
+                                     PESOS_POSICION, ESCALAS_RATIO)
+
+
+class TestLogicaRanking:
+    """
+    Pruebas de la puntuación estadística de los jugadores
+    """
+
+    @pytest.fixture
+    def df_jugadores(self):
+        return pd.DataFrame([
+            {"Player": "Portero", "position_group": "GK", "90s": 10.0, "Saves": 30, "CS": 4, "Err": 1,
+             "Total - Cmp%": 80.0, "Long - Cmp%": 45.0},
+            {"Player": "Delantero", "position_group": "Forwards", "90s": 20.0, "Gls": 15, "npxG": 12.5, "Sh": 60,
+             "SoT%": 45.0, "G/Sh": 0.25, "npxG/Sh": 0.2, "Ast": 3, "KP": 20, "PrgR": 150, "Succ%": 55.0, "GCA": 8},
+            {"Player": "Sin posición", "position_group": None, "90s": 0.0, "Gls": 1, "Ast": "2", "SoT%": 120.0},
+            {"Player": "Texto", "position_group": "Defender", "90s": "n/a", "TklW": "abc", "Clr": 40, "Won%": 10.0},
+        ])
+
+    def puntuacion_esperada(self, jugador):
+        pesos = PESOS_POSICION.get(jugador["position_group"], PESOS_POSICION["Unknown"])
+        minutos_90s = pd.to_numeric(jugador.get("90s"), errors="coerce")
+        minutos_90s = 1.0 if pd.isna(minutos_90s) else max(minutos_90s, 0.1)
+
+        puntuacion = 0.0
+        for stat, peso in pesos.items():
+            valor = pd.to_numeric(jugador.get(stat), errors="coerce")
+            if pd.isna(valor):
+                continue
+            if stat in ESCALAS_RATIO:
+                escala = ESCALAS_RATIO[stat]
+                valor = np.clip((valor - escala["min_expected"]) / (escala["max_expected"] - escala["min_expected"]) * 100, 0, 100)
+            elif stat.endswith("%"):
+                valor = np.clip(valor, 0, 100)
+            else:
+                valor = valor / minutos_90s
+            puntuacion += valor * peso
+        return puntuacion
+
+    def test_puntuaciones_vectorizadas(self, df_jugadores):
+        puntuaciones = calcular_puntuaciones_estadisticas(df_jugadores)
+
+        assert list(puntuaciones.index) == list(df_jugadores.index)
+        for indice, jugador in df_jugadores.iterrows():
+            esperado = self.puntuacion_esperada(jugador)
+            assert np.isclose(puntuaciones[indice], esperado)
+            assert np.isclose(calcular_ponderacion_estadisticas(jugador), esperado)
+
+    def test_columnas_ausentes(self):
+        df = pd.DataFrame({"Player": ["A", "B"], "position_group": ["Forwards", "Desconocida"]})
+
+        assert calcular_puntuaciones_estadisticas(df).tolist() == [0.0, 0.0]
+        assert calcular_ponderacion_estadisticas({"Gls": 2, "90s": 2}) == pytest.approx(0.9)
+
+    def test_tabla_puntuaciones(self, df_jugadores, tmp_path, monkeypatch):
+        datos = {"df": df_jugadores}
+        cargas = []
+
+        def cargar_falso(temporada=None):
+            return datos["df"].copy()
+
+        def construir_contando(df):
+            cargas.append(len(df))
+            return construir_tabla_puntuaciones(df)
+
+        monkeypatch.setattr(logica_ranking, "cargar_estadisticas_jugadores", cargar_falso)
+        monkeypatch.setattr(logica_ranking, "construir_tabla_puntuaciones", construir_contando)
+        monkeypatch.setattr(logica_ranking, "CARPETA_CACHE", str(tmp_path))
+        invalidar_tabla_puntuaciones()
+
+        tabla = obtener_tabla_puntuaciones("2425")
+        esperada = construir_tabla_puntuaciones(df_jugadores)
+        assert list(tabla.index) == ["portero", "delantero", "sin posicion", "texto"]
+        assert np.allclose(tabla["puntuacion_bruta"], calcular_puntuaciones_estadisticas(df_jugadores))
+        assert (tabla["puntuacion_normalizada"] <= 10).all(), "La puntuación normalizada debe estar en [0, 10]"
+
+        # Segunda consulta: desde memoria. Tras vaciar la memoria: desde disco, sin recalcular
+        assert obtener_tabla_puntuaciones("2425") is tabla
+        logica_ranking._tablas_puntuaciones.clear()
+        assert np.allclose(obtener_tabla_puntuaciones("2425")["puntuacion_bruta"], esperada["puntuacion_bruta"])
+        assert cargas == [4], "La tabla solo debe calcularse una vez por temporada"
+
+        flpr = np.array([[0.5, 0.3], [0.7, 0.5]])
+        ranking = calcular_ranking_jugadores(flpr, ["Portero", "Delantero"], temporada="2425")
+        assert [fila["jugador"] for fila in ranking] == ["Delantero", "Portero"]
+        assert max(fila["puntuacion_estadisticas"] for fila in ranking) == pytest.approx(10)
+        assert ranking[0]["qgdd"] > ranking[1]["qgdd"], "El ranking debe incluir la dominancia en la FLPR"
+
+        # Datos actualizados en el origen (p. ej. MongoDB) sin que cambie ningún fichero: nueva tabla
+        datos["df"] = df_jugadores.assign(Gls=df_jugadores["Gls"].fillna(0) + 1)
+        tabla_nueva = obtener_tabla_puntuaciones("2425")
+        assert len(cargas) == 2, "Si cambian los datos cargados la tabla debe recalcularse"
+        assert tabla_nueva.loc["delantero", "puntuacion_bruta"] > tabla.loc["delantero", "puntuacion_bruta"]
+        datos["df"] = df_jugadores
+
+        invalidar_tabla_puntuaciones("2425")
+        assert not os.listdir(tmp_path), "La invalidación debe eliminar las tablas guardadas"
+        obtener_tabla_puntuaciones("2425")
+        assert len(cargas) == 3
+        invalidar_tabla_puntuaciones()
@@ -0,0 +1,107 @@
+import pytest
+import os
+import sys
+import pandas as pd
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_management.migracion_db import migrar_varias_temporadas, leer_lotes_jugadores, refrescar_temporadas
+from src.database.conexion_mongodb import PLAYERS_COLLECTION, MIGRATION_METADATA_COLLECTION
+
+
+class TestMigracion:
+    """
+    Pruebas de la migración por lotes de las estadísticas de jugadores
+    """
+
+    @pytest.fixture
+    def csv_temporadas(self, tmp_path):
+        rutas = []
+        for temporada, filas in (("2023-2024", 25), ("2024-2025", 7)):
+            ruta = tmp_path / f"fbref_full_stats_{temporada}.csv"
+            pd.DataFrame({
+                "Player": [f"Jugador Ñ{i}" for i in range(filas)],
+                "position_group": ["Forwards"] * filas,
+                "Season": [temporada] * filas,
+            }).to_csv(ruta, index=False)
+            rutas.append(str(ruta))
+        return rutas
+
+    @pytest.fixture
+    def mock_mongodb(self):
+        with patch('src.data_management.migracion_db.get_mongodb_connection') as mock_conexion, \
+                patch('src.data_management.migracion_db.invalidar_cache_estadisticas') as mock_invalidar_cache, \
+                patch('src.core.logica_ranking.invalidar_tabla_puntuaciones') as mock_invalidar_tablas:
+            mongodb = MagicMock()
+            mongodb.insert_many.side_effect = lambda coleccion, documentos, ordered=True: list(range(len(documentos)))
+            mongodb._invalidaciones = (mock_invalidar_cache, mock_invalidar_tablas)
+            mock_conexion.return_value = mongodb
+            yield mongodb
+
+    def test_lotes(self, csv_temporadas):
+        lotes = list(leer_lotes_jugadores(csv_temporadas[0], tamano_lote=10))
+
+        assert [len(lote) for _, lote in lotes] == [10, 10, 5]
+        assert {temporada for temporada, _ in lotes} == {"2324"}
+        assert lotes[0][1][0]["normalized_name"] == "jugador n0"
+
+    def test_migracion_sobre_coleccion_temporal(self, mock_mongodb, csv_temporadas, tmp_path):
+        ruta_invalida = tmp_path / "sin_temporada.csv"
+        pd.DataFrame({"Player": ["A"]}).to_csv(ruta_invalida, index=False)
+
+        assert migrar_varias_temporadas(csv_temporadas + [str(ruta_invalida), "no_existe.csv"],
+                                        tamano_lote=10, trabajadores=2)
+
+        llamadas = mock_mongodb.insert_many.call_args_list
+        assert sorted(len(llamada.args[1]) for llamada in llamadas) == [5, 7, 10, 10]
+        assert all(llamada.kwargs["ordered"] is False for llamada in llamadas)
+        temporal = {llamada.args[0] for llamada in llamadas}
+        assert temporal == {f"{PLAYERS_COLLECTION}_migracion"}, "Se debe escribir en la colección temporal"
+
+        mock_mongodb.rename_collection.assert_called_once_with(f"{PLAYERS_COLLECTION}_migracion", PLAYERS_COLLECTION,
+                                                               drop_target=True)
+        mock_mongodb.drop_collection.assert_called_once_with(f"{PLAYERS_COLLECTION}_migracion")
+        for mock_invalidar in mock_mongodb._invalidaciones:
+            mock_invalidar.assert_called_once_with()
+
+    def test_fallo_no_toca_la_coleccion(self, mock_mongodb, csv_temporadas):
+        mock_mongodb.insert_many.side_effect = RuntimeError("conexión perdida")
+
+        assert not migrar_varias_temporadas(csv_temporadas, tamano_lote=10, trabajadores=2)
+        mock_mongodb.rename_collection.assert_not_called()
+        for mock_invalidar in mock_mongodb._invalidaciones:
+            mock_invalidar.assert_not_called()
+        assert all(llamada.args[0] != PLAYERS_COLLECTION for llamada in mock_mongodb.drop_collection.call_args_list)
+
+    def test_refresco_incremental(self, mock_mongodb, csv_temporadas):
+        metadatos = {}
+        coleccion_metadatos = MagicMock()
+        coleccion_metadatos.find_one.side_effect = lambda consulta: next(
+            (doc for doc in metadatos.values() if doc["archivo"] == consulta["archivo"]), None)
+        coleccion_metadatos.replace_one.side_effect = lambda filtro, doc, upsert: metadatos.__setitem__(filtro["_id"], doc)
+        mock_mongodb.get_collection.side_effect = lambda nombre: (coleccion_metadatos
+                                                                  if nombre == MIGRATION_METADATA_COLLECTION else MagicMock())
+        operaciones = []
+        mock_mongodb.bulk_write.side_effect = lambda coleccion, ops, ordered: operaciones.extend(ops)
+
+        resumen = refrescar_temporadas(csv_temporadas, tamano_lote=10)
+        assert resumen == {"2324": {"actualizadas": 25, "eliminadas": 0}, "2425": {"actualizadas": 7, "eliminadas": 0}}
+        assert all(llamada.kwargs["ordered"] is False for llamada in mock_mongodb.bulk_write.call_args_list)
+
+        # Sin cambios en los CSV no se escribe nada
+        operaciones.clear()
+        assert refrescar_temporadas(csv_temporadas, tamano_lote=10) == {}
+        assert operaciones == []
+
+        # Un jugador cambia de posición y otro desaparece: solo se tocan esas dos filas
+        df = pd.read_csv(csv_temporadas[0])
+        df.loc[3, "position_group"] = "Wing-Back"
+        df.drop(index=20).to_csv(csv_temporadas[0], index=False)
+
+        assert refrescar_temporadas(csv_temporadas, tamano_lote=7) == {"2324": {"actualizadas": 1, "eliminadas": 1}}
+        assert len(operaciones) == 2
+        actualizacion, borrado = operaciones
+        assert actualizacion._filter == {"temporada": "2324", "Player": "Jugador Ñ3", "Squad": None}
+        assert actualizacion._doc["position_group"] == "Wing-Back"
+        assert borrado._filter == {"temporada": "2324", "Player": "Jugador Ñ20", "Squad": None}
@@ -0,0 +1,61 @@
+import pytest
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.normalizacion import NormalizadorGrupos, METODOS_NORMALIZACION, percentiles_por_grupo
+
+
+class TestNormalizacion:
+    """
+    Pruebas de la normalización de puntuaciones por grupo de posición
+    """
+
+    @pytest.fixture
+    def normalizador(self):
+        puntuaciones = [10, 20, 30, 40, 50, 100, 150, 200, 250, 300, 75]
+        grupos = ["GK"] * 5 + ["Forwards"] * 5 + [None]
+        return NormalizadorGrupos(puntuaciones, grupos)
+
+    def test_percentiles_por_grupo(self, normalizador):
+        assert normalizador.normalizar(50, "GK") == pytest.approx(10)
+        assert normalizador.normalizar(30, "GK") == pytest.approx(6)
+        assert normalizador.normalizar(50, "Forwards") == pytest.approx(0), "El percentil depende del grupo"
+        assert normalizador.normalizar(5, "GK") == 0
+
+        # Grupos desconocidos: distribución global de la temporada
+        assert normalizador.grupo_efectivo("Wing-Back") == "__global__"
+        assert normalizador.normalizar(75, "Wing-Back") == pytest.approx(6 / 11 * 10)
+
+    def test_metodos(self, normalizador):
+        puntuaciones = [30, 200, 1000]
+        grupos = ["GK", "Forwards", "Forwards"]
+
+        minmax = normalizador.normalizar_lote(puntuaciones, grupos, metodo="minmax")
+        assert np.allclose(minmax, [5, 5, 10])
+
+        zscore = normalizador.normalizar_lote(puntuaciones, grupos, metodo="zscore")
+        assert np.allclose(zscore[:2], 5), "La media del grupo debe quedar en el centro de la escala"
+        assert zscore[2] > 9.9
+
+        teorico = normalizador.normalizar_lote(puntuaciones, grupos, metodo="teorico")
+        assert np.allclose(teorico, [3, 10, 10])
+
+        for metodo in METODOS_NORMALIZACION:
+            resultado = normalizador.normalizar_lote(puntuaciones, grupos, metodo=metodo)
+            assert ((resultado >= 0) & (resultado <= 10)).all(), f"Fuera de escala con el método {metodo}"
+
+        with pytest.raises(ValueError):
+            normalizador.normalizar_lote(puntuaciones, grupos, metodo="otro")
+
+    def test_percentiles_por_grupo(self):
+        referencia = np.array([[1, 10], [2, 20], [3, np.nan], [4, 40], [5, 50], [100, 0]], dtype=float)
+        grupos_referencia = ["A"] * 5 + ["B"]
+
+        percentiles = percentiles_por_grupo(referencia, grupos_referencia, referencia[[1, 5]], ["A", "B"])
+
+        assert np.allclose(percentiles[0], [40, 50]), "Los NaN de la referencia no deben contar"
+        assert np.allclose(percentiles[1], [100, 20]), "Un grupo con pocos jugadores debe usar toda la referencia"
+        assert np.isnan(percentiles_por_grupo(referencia, grupos_referencia, [[np.nan, 1]], ["A"])[0, 0])
@@ -9,6 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.main import evaluar_con_agente, calcular_matrices_flpr
 from src.core.logica_consenso import calcular_matriz_similitud, calcular_cr
+import src.core.logica_ranking as logica_ranking
 from src.core.logica_ranking import calcular_ranking_jugadores
 
 class TestRendimiento:
@@ -37,7 +38,9 @@ class TestRendimiento:
             "consenso_minimo": 0.7
         }
 
-    def test_rendimiento_evaluacion(self, agentes_simulados, datos_prueba):
+    def test_rendimiento_evaluacion(self, agentes_simulados, datos_prueba, tmp_path, monkeypatch):
+        # Las tablas de puntuaciones se guardan en un directorio temporal, no en data/cache
+        monkeypatch.setattr(logica_ranking, "CARPETA_CACHE", str(tmp_path))
         jugadores = datos_prueba["jugadores"]
         criterios = datos_prueba["criterios"]
         valores_linguisticos = datos_prueba["valores_linguisticos"]
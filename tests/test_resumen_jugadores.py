@@ -0,0 +1,103 @@
+import pytest
+import os
+import sys
+import json
+import importlib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core import resumen_jugadores
+from src.core.resumen_jugadores import (resumir_jugador, columnas_relevantes, componer_respuesta, mensaje_json,
+                                        invalidar_cache_resumenes)
+from src.core.logica_ranking import PESOS_POSICION
+
+herramientas = importlib.import_module("src.core.herramientas_análisis")
+
+
+class TestResumenJugadores:
+    """
+    Pruebas de los resúmenes compactos de jugadores que reciben los agentes
+    """
+
+    @pytest.fixture
+    def fila(self):
+        invalidar_cache_resumenes()
+        estadisticas = {stat: 1.23456 for stats in PESOS_POSICION.values() for stat in stats}
+        return pd.Series({
+            "Player": "Rodri", "Squad": "Manchester City", "Comp": "eng Premier League", "Pos": "MF",
+            "position_group": "Defensive-Midfielders", "Age_Years": np.int64(28), "90s": 1.0,
+            **estadisticas, "xG": np.nan, "Touches": 80, "Carries": 45,
+        })
+
+    def test_estadisticas_relevantes(self, fila):
+        resumen = json.loads(resumir_jugador(fila, "2024-2025"))
+
+        assert resumen["jugador"] == "Rodri" and resumen["grupo"] == "Defensive-Midfielders"
+        assert resumen["edad"] == 28 and resumen["90s"] == 1, "Los decimales enteros deben enviarse como enteros"
+        assert list(resumen["stats"]) == list(PESOS_POSICION["Defensive-Midfielders"]), \
+            "Sin criterios solo deben enviarse las estadísticas que puntúan en su posición"
+        assert resumen["stats"]["Recov"] == 1.23, "Los decimales deben redondearse"
+
+    def test_criterios_pedidos(self, fila):
+        resumen = json.loads(resumir_jugador(fila, criterios=["touches", "xG", "Inventada", "Carries"]))
+
+        assert resumen["stats"] == {"Touches": 80, "Carries": 45}, \
+            "Deben enviarse solo los criterios pedidos que existen y tienen valor"
+        assert columnas_relevantes(fila.index, "Forwards", ["Player", "Gls"]) == ("Gls",)
+
+    def test_compacto_y_en_cache(self, fila):
+        serializado = resumir_jugador(fila)
+        completo = json.dumps(fila.to_dict(), indent=2, default=str)
+
+        assert ", " not in serializado and ": " not in serializado and "\n" not in serializado, \
+            "El resumen no debe llevar sangría ni espacios entre separadores"
+        assert len(serializado) < len(completo) / 2, "El resumen debe ocupar bastante menos que la fila completa"
+        assert resumir_jugador(fila) is serializado, "Repetir la consulta debe reutilizar el resumen"
+        assert len(resumen_jugadores._resumenes) == 1
+        invalidar_cache_resumenes()
+        assert not resumen_jugadores._resumenes
+
+    def test_componer_respuesta(self, fila):
+        respuesta = json.loads(componer_respuesta({"Rodri": resumir_jugador(fila),
+                                                   "Pedri": mensaje_json("Datos no disponibles")}))
+
+        assert list(respuesta) == ["Rodri", "Pedri"]
+        assert respuesta["Pedri"] == "Datos no disponibles"
+        assert respuesta["Rodri"]["equipo"] == "Manchester City"
+
+    def test_temporada_de_la_fila(self, fila):
+        anterior = fila.copy()
+        anterior["Season"] = "2022-2023"
+        anterior["Recov"] = 9.0
+        actual = fila.copy()
+        actual["temporada"] = "2425"
+
+        resumen_anterior = json.loads(resumir_jugador(anterior))
+        resumen_actual = json.loads(resumir_jugador(actual))
+
+        assert resumen_anterior["temporada"] == "2223", "La temporada debe tomarse de la fila y enviarse"
+        assert resumen_actual["temporada"] == "2425"
+        assert resumen_actual["stats"]["Recov"] == 1.23, \
+            "Las filas de otra temporada del mismo jugador y equipo no deben compartir resumen"
+        assert json.loads(resumir_jugador(fila, "2023-2024"))["temporada"] == "2324"
+
+    def test_info_en_todas_las_temporadas(self, monkeypatch):
+        cargas = []
+        df = pd.DataFrame({"Player": ["Joselu", "Rodri"], "Season": ["2022-2023", "2024-2025"],
+                           "position_group": ["Forwards", "Defensive-Midfielders"], "Gls": [10, 2]})
+
+        def cargar(temporada=None):
+            cargas.append(temporada)
+            return df
+
+        monkeypatch.setattr(herramientas, "cargar_estadisticas_jugadores", cargar)
+
+        resumen = json.loads(herramientas.obtener_info_jugador("Joselu"))
+        assert cargas == [None], "Por defecto deben buscarse los jugadores en todas las temporadas"
+        assert resumen["temporada"] == "2223"
+
+        herramientas.obtener_info_jugadores(["Rodri"], temporada="2024-2025")
+        assert cargas[-1] == "2425"
+        assert "no válida" in herramientas.obtener_info_jugador("Joselu", temporada="2030")
@@ -0,0 +1,87 @@
+import pytest
+import os
+import sys
+import json
+import importlib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core import similitud_jugadores
+from src.core.similitud_jugadores import IndiceSimilitud, buscar_jugadores_similares, ESTADISTICAS_SIMILITUD
+
+herramientas = importlib.import_module("src.core.herramientas_análisis")
+
+
+def temporada_sintetica(semilla, n=30):
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        "Player": [f"Delantero {i}" for i in range(n)],
+        "Squad": ["Equipo"] * n,
+        "position_group": ["Forwards"] * n,
+        "90s": rng.uniform(5, 30, n),
+        "Age_Years": rng.integers(18, 34, n),
+        "market_value_in_eur": rng.integers(1, 80, n) * 1e6,
+    })
+    for stat in ESTADISTICAS_SIMILITUD["Forwards"]:
+        df[stat] = rng.random(n) * 100 if stat.endswith("%") else rng.random(n) * df["90s"]
+    return df
+
+
+class TestSimilitudJugadores:
+    """
+    Pruebas del índice de jugadores similares
+    """
+
+    @pytest.fixture
+    def datos(self):
+        datos = {"2324": temporada_sintetica(1), "2425": temporada_sintetica(2)}
+        # El mismo perfil que "Delantero 0" (por 90 minutos) con otro nombre y la mitad de minutos
+        clon = datos["2425"].iloc[[0]].copy()
+        clon["Player"] = "Clon"
+        clon["market_value_in_eur"] = 5e6
+        for stat in ESTADISTICAS_SIMILITUD["Forwards"]:
+            if not stat.endswith("%") and stat not in ("G/Sh", "npxG/Sh"):
+                clon[stat] = clon[stat] / 2
+        clon["90s"] = clon["90s"] / 2
+        datos["2324"] = pd.concat([datos["2324"], clon], ignore_index=True)
+        return datos
+
+    def test_vecinos_y_filtros(self, datos):
+        indice = IndiceSimilitud(datos)
+
+        similares = indice.similares("2425", 0, k=5)
+        assert similares[0][:2] == ("2324", 30), "El jugador con el mismo perfil por 90 minutos debe ser el más parecido"
+        assert np.isclose(similares[0][2], 1.0)
+        assert all(a[2] >= b[2] for a, b in zip(similares, similares[1:]))
+        assert ("2324", 0) not in [s[:2] for s in similares], "El propio jugador no debe aparecer en otras temporadas"
+
+        filtrados = indice.similares("2425", 0, k=5, precio_max=20e6, edad_max=25)
+        for temporada, fila, _ in filtrados:
+            jugador = indice.datos[temporada].iloc[fila]
+            assert jugador["market_value_in_eur"] <= 20e6 and jugador["Age_Years"] <= 25
+        assert {s[0] for s in indice.similares("2425", 0, k=10, temporadas=["2023-2024"])} == {"2324"}
+
+    def test_arbol_y_busqueda_directa(self, datos, monkeypatch):
+        con_arbol = IndiceSimilitud(datos)
+        monkeypatch.setattr(similitud_jugadores, "cKDTree", None)
+        sin_arbol = IndiceSimilitud(datos)
+
+        for fila in range(0, 30, 7):
+            a = con_arbol.similares("2425", fila, k=6, edad_max=30)
+            b = sin_arbol.similares("2425", fila, k=6, edad_max=30)
+            assert [s[:2] for s in a] == [s[:2] for s in b], "Sin scipy debe obtenerse el mismo resultado"
+            assert np.allclose([s[2] for s in a], [s[2] for s in b])
+
+    def test_herramienta(self, datos, monkeypatch):
+        indice = IndiceSimilitud(datos)
+        monkeypatch.setattr(similitud_jugadores, "obtener_indice_similitud", lambda: indice)
+
+        respuesta = json.loads(herramientas.listar_jugadores_similares("Delantero 0", k=3, precio_max=10))
+
+        assert respuesta["jugador"] == "Delantero 0" and respuesta["temporada"] == "2425"
+        assert respuesta["similares"][0]["jugador"] == "Clon", "El precio máximo se indica en millones"
+        assert all(similar["valor"] <= 10e6 for similar in respuesta["similares"])
+        assert "Datos no disponibles" in herramientas.listar_jugadores_similares("Inventado")
+        assert "No hay datos de la temporada" in buscar_jugadores_similares("Delantero 0", "2122")
@@ -0,0 +1,52 @@
+import pytest
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.simulacion_consenso import simular_consenso, calcular_cr_simulaciones
+from src.core.fuzzy_matrices import calcular_matrices_flpr, obtener_conjunto_terminos
+from src.core.logica_consenso import calcular_similitudes_por_pares, calcular_cr
+
+
+class TestSimulacionConsenso:
+    """
+    Pruebas del simulador de consenso sin interacción
+    """
+
+    def test_cr_simulaciones_coincide_con_calcular_cr(self):
+        conjunto = obtener_conjunto_terminos(5)
+        rng = np.random.default_rng(4)
+        codigos = rng.integers(0, 5, size=(6, 3, 8, 4), dtype=np.int8)
+        criterios = ["Técnica", "Físico", "Táctico", "Mental"]
+
+        cr_lote = calcular_cr_simulaciones(codigos, conjunto)
+
+        for s in range(len(codigos)):
+            matrices = {f"Experto{e}": [[conjunto.etiquetas[c] for c in fila] for fila in codigos[s, e]]
+                        for e in range(codigos.shape[1])}
+            flpr_matrices = calcular_matrices_flpr(matrices, criterios, conjunto)
+            cr, _ = calcular_cr(calcular_similitudes_por_pares(list(flpr_matrices.values())))
+            assert cr_lote[s] == cr
+
+    def test_simulacion_reproducible_y_convergente(self):
+        resultado = simular_consenso(500, umbrales=(0.8, 0.9), max_rondas=4, tamano_bloque=32,
+                                     n_procesos=1, semilla=21, granularidad=5)
+
+        assert resultado == simular_consenso(500, umbrales=(0.8, 0.9), max_rondas=4, tamano_bloque=32,
+                                             n_procesos=2, semilla=21, granularidad=5), \
+            "Con la misma semilla el resultado no debe depender del número de procesos"
+        assert resultado["simulaciones"] == 500
+        assert len(resultado["cr_por_ronda"]) == 5
+
+        cr_medios = [fila["cr_medio"] for fila in resultado["cr_por_ronda"]]
+        assert cr_medios == sorted(cr_medios), "El CR medio debe crecer con las rondas de discusión"
+
+        for datos in resultado["convergencia"].values():
+            tasas = datos["tasa_por_max_rondas"]
+            assert tasas == sorted(tasas)
+            assert np.isclose(tasas[-1] + datos["sin_converger"], 1)
+
+        with pytest.raises(ValueError):
+            simular_consenso(10, n_expertos=1)
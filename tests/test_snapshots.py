@@ -0,0 +1,63 @@
+import pytest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.data_management.snapshots as snapshots
+from src.data_management.snapshots import tipar_estadisticas, construir_snapshot, cargar_snapshot, snapshot_vigente
+
+
+class TestSnapshots:
+    """
+    Pruebas de los snapshots columnares de estadísticas
+    """
+
+    @pytest.fixture
+    def csv_temporada(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(snapshots, "DATA_FOLDER", str(tmp_path))
+        monkeypatch.setattr(snapshots, "CARPETA_SNAPSHOTS", str(tmp_path / "snapshots"))
+        ruta = tmp_path / "fbref_full_stats_9900.csv"
+        pd.DataFrame({
+            "Player": ["Pedri", "Lamine Yamal", "Martín Zubimendi"],
+            "Squad": ["Barcelona", "Barcelona", "Real Sociedad"],
+            "position_group": ["Central Midfielders", "Forwards", "Defensive-Midfielders"],
+            "Gls": [4, 7, 1],
+            "KP": [40.0, 55.0, np.nan],
+            "Succ%": [55.3, 48.1, 60.0],
+        }).to_csv(ruta, index=False)
+        return str(ruta)
+
+    def test_tipos_compactos(self, csv_temporada):
+        original = pd.read_csv(csv_temporada)
+        tipado = tipar_estadisticas(original)
+
+        assert tipado["Gls"].dtype == np.int32
+        assert tipado["KP"].dtype == np.float32, "Los conteos con huecos se guardan como float32"
+        assert tipado["Succ%"].dtype == np.float64, "Los decimales se mantienen exactos"
+        assert isinstance(tipado["Squad"].dtype, pd.CategoricalDtype)
+        assert tipado["normalized_name"].tolist() == ["pedri", "lamine yamal", "martin zubimendi"]
+        assert np.allclose(tipado["KP"], original["KP"], equal_nan=True)
+
+    def test_sin_snapshot_se_usa_csv(self, csv_temporada):
+        assert not snapshot_vigente("9900")
+        assert cargar_snapshot("9900") is None
+
+    def test_snapshot_y_caducidad(self, csv_temporada):
+        pytest.importorskip("pyarrow")
+
+        construir_snapshot(csv_temporada)
+        assert snapshot_vigente("9900")
+
+        df = cargar_snapshot("9900", columnas=["Player", "Gls", "Inexistente"])
+        assert list(df.columns) == ["Player", "Gls"], "Solo deben leerse las columnas pedidas"
+        assert df["Gls"].tolist() == [4, 7, 1]
+        assert cargar_snapshot("9900")["Succ%"].tolist() == [55.3, 48.1, 60.0]
+
+        # Si cambia el CSV, el snapshot queda desactualizado y el cargador vuelve al CSV
+        with open(csv_temporada, "a") as fichero:
+            fichero.write("Rodri,Manchester City,Defensive-Midfielders,0,5.0,70.0\n")
+        assert not snapshot_vigente("9900")
+        assert cargar_snapshot("9900") is None